@@ -3,9 +3,11 @@ Advanced Banner Templates for Apega Desapega
 More sophisticated designs for special campaigns
 """
 
-from html2image import Html2Image
 from pathlib import Path
 
+from renderer import render_html
+from text_fit import fit_size
+
 OUTPUT_DIR = Path(__file__).parent / "output"
 OUTPUT_DIR.mkdir(exist_ok=True)
 
@@ -17,11 +19,14 @@ def generate_product_showcase(
     sale_price: str,
     discount_percent: str,
     image_url: str = None,
-    filename: str = "product_showcase.png"
+    filename: str = "product_showcase.png",
+    product_name_size: int = None,
+    gradient_colors: tuple = ("#D4A574", "#C49660")
 ):
     """Generate a product showcase banner with before/after pricing"""
 
-    hti = Html2Image(output_path=str(OUTPUT_DIR), size=(800, 500))
+    if product_name_size is None:
+        product_name_size = fit_size("product_showcase.product_name", product_name)
 
     product_img = f'<img src="{image_url}" style="width: 100%; height: 100%; object-fit: cover;" />' if image_url else '''
         <div style="
@@ -98,7 +103,7 @@ def generate_product_showcase(
                 <!-- Product name -->
                 <h2 style="
                     font-family: 'Playfair Display', serif;
-                    font-size: 32px;
+                    font-size: {product_name_size}px;
                     font-weight: 600;
                     color: #2D2D2D;
                     margin: 0 0 24px 0;
@@ -128,7 +133,7 @@ def generate_product_showcase(
                     font-size: 14px;
                     font-weight: 600;
                     color: white;
-                    background: linear-gradient(135deg, #D4A574 0%, #C49660 100%);
+                    background: linear-gradient(135deg, {gradient_colors[0]} 0%, {gradient_colors[1]} 100%);
                     border: none;
                     padding: 18px 40px;
                     border-radius: 30px;
@@ -171,9 +176,7 @@ def generate_product_showcase(
     </html>
     """
 
-    hti.screenshot(html_str=html, save_as=filename)
-    print(f"Generated: {OUTPUT_DIR / filename}")
-    return str(OUTPUT_DIR / filename)
+    return render_html(html, filename, size=(800, 500))
 
 
 def generate_testimonial_banner(
@@ -182,11 +185,13 @@ def generate_testimonial_banner(
     author_location: str = "São Paulo, SP",
     rating: int = 5,
     avatar_url: str = None,
-    filename: str = "testimonial.png"
+    filename: str = "testimonial.png",
+    quote_size: int = None
 ):
     """Generate a customer testimonial banner"""
 
-    hti = Html2Image(output_path=str(OUTPUT_DIR), size=(800, 350))
+    if quote_size is None:
+        quote_size = fit_size("testimonial.quote", quote)
 
     stars = "⭐" * rating
 
@@ -251,7 +256,7 @@ def generate_testimonial_banner(
                 <!-- Quote -->
                 <p style="
                     font-family: 'Playfair Display', serif;
-                    font-size: 24px;
+                    font-size: {quote_size}px;
                     font-style: italic;
                     color: #2D2D2D;
                     margin: 0 0 30px 0;
@@ -297,9 +302,7 @@ def generate_testimonial_banner(
     </html>
     """
 
-    hti.screenshot(html_str=html, save_as=filename)
-    print(f"Generated: {OUTPUT_DIR / filename}")
-    return str(OUTPUT_DIR / filename)
+    return render_html(html, filename, size=(800, 350))
 
 
 def generate_collection_banner(
@@ -308,11 +311,13 @@ def generate_collection_banner(
     description: str,
     gradient_colors: tuple = ("#2D2D2D", "#4A4A4A"),
     accent_color: str = "#D4A574",
-    filename: str = "collection.png"
+    filename: str = "collection.png",
+    collection_name_size: int = None
 ):
     """Generate a collection showcase banner"""
 
-    hti = Html2Image(output_path=str(OUTPUT_DIR), size=(800, 400))
+    if collection_name_size is None:
+        collection_name_size = fit_size("collection.collection_name", collection_name)
 
     html = f"""
     <!DOCTYPE html>
@@ -373,7 +378,7 @@ def generate_collection_banner(
                 <!-- Collection name -->
                 <h1 style="
                     font-family: 'Playfair Display', serif;
-                    font-size: 56px;
+                    font-size: {collection_name_size}px;
                     font-weight: 700;
                     color: white;
                     margin: 0 0 16px 0;
@@ -421,9 +426,7 @@ def generate_collection_banner(
     </html>
     """
 
-    hti.screenshot(html_str=html, save_as=filename)
-    print(f"Generated: {OUTPUT_DIR / filename}")
-    return str(OUTPUT_DIR / filename)
+    return render_html(html, filename, size=(800, 400))
 
 
 def generate_flash_sale_banner(
@@ -435,8 +438,6 @@ def generate_flash_sale_banner(
 ):
     """Generate a flash sale countdown banner"""
 
-    hti = Html2Image(output_path=str(OUTPUT_DIR), size=(800, 300))
-
     html = f"""
     <!DOCTYPE html>
     <html>
@@ -576,9 +577,7 @@ def generate_flash_sale_banner(
     </html>
     """
 
-    hti.screenshot(html_str=html, save_as=filename)
-    print(f"Generated: {OUTPUT_DIR / filename}")
-    return str(OUTPUT_DIR / filename)
+    return render_html(html, filename, size=(800, 300))
 
 
 def generate_seller_spotlight(
@@ -587,12 +586,11 @@ def generate_seller_spotlight(
     sales_count: int = 234,
     items_count: int = 45,
     avatar_url: str = None,
-    filename: str = "seller_spotlight.png"
+    filename: str = "seller_spotlight.png",
+    gradient_colors: tuple = ("#FAF8F5", "#F0EBE3")
 ):
     """Generate a seller spotlight banner"""
 
-    hti = Html2Image(output_path=str(OUTPUT_DIR), size=(800, 350))
-
     avatar = f'<img src="{avatar_url}" style="width: 100%; height: 100%; object-fit: cover;" />' if avatar_url else f'''
         <div style="
             width: 100%;
@@ -618,7 +616,7 @@ def generate_seller_spotlight(
         <div style="
             width: 800px;
             height: 350px;
-            background: linear-gradient(135deg, #FAF8F5 0%, #F0EBE3 100%);
+            background: linear-gradient(135deg, {gradient_colors[0]} 0%, {gradient_colors[1]} 100%);
             display: flex;
             align-items: center;
             padding: 50px 60px;
@@ -741,9 +739,7 @@ def generate_seller_spotlight(
     </html>
     """
 
-    hti.screenshot(html_str=html, save_as=filename)
-    print(f"Generated: {OUTPUT_DIR / filename}")
-    return str(OUTPUT_DIR / filename)
+    return render_html(html, filename, size=(800, 350))
 
 
 def generate_advanced_banners():
@@ -0,0 +1,225 @@
+"""
+Streaming campaign export for Apega Desapega banners
+Writes banners into a ZIP or tar stream as they finish rendering, to a
+file or an HTTP response, with an index.json describing every entry and
+every banner that failed
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import shutil
+import sys
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import Image
+
+from manifest import MANIFEST_PATH, load_manifest
+
+# Configuration
+OUTPUT_DIR = Path(__file__).parent / "output"
+CHUNK = 256 * 1024
+
+
+class ArchiveStream:
+    """Append-only ZIP/tar writer that never seeks or buffers whole files"""
+
+    def __init__(self, fileobj, fmt: str = "zip"):
+        self.fmt = fmt
+        self.index = []
+        self.errors = []
+        if fmt == "zip":
+            # PNGs are already compressed; storing them keeps CPU and memory flat
+            self.archive = zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_STORED)
+        elif fmt == "tar":
+            self.archive = tarfile.open(fileobj=fileobj, mode="w|")
+        else:
+            raise ValueError(f"Unknown archive format: {fmt}")
+
+    def add_file(self, path, arcname: str = None, meta: dict = None):
+        """Stream one file into the archive and record it in the index"""
+
+        path = Path(path)
+        arcname = arcname or path.name
+        size = path.stat().st_size
+        with Image.open(path) as img:
+            width, height = img.size
+
+        with open(path, "rb") as src:
+            if self.fmt == "zip":
+                info = zipfile.ZipInfo(arcname, time.localtime(path.stat().st_mtime)[:6])
+                info.file_size = size
+                with self.archive.open(info, "w") as dest:
+                    shutil.copyfileobj(src, dest, CHUNK)
+            else:
+                info = tarfile.TarInfo(arcname)
+                info.size = size
+                info.mtime = int(path.stat().st_mtime)
+                self.archive.addfile(info, src)
+
+        self.index.append({"file": arcname, "width": width, "height": height, "bytes": size, **(meta or {})})
+
+    def add_error(self, job: dict, exc: Exception):
+        """Record a banner left out of the archive"""
+
+        print(f"[!] {job['params'].get('filename')}: {exc}")
+        self.errors.append({"file": job["params"].get("filename"), "template": job["template"],
+                            "error": repr(exc)})
+
+    def close(self):
+        """Write index.json and finish the archive"""
+
+        data = json.dumps({"created": time.time(), "banners": self.index, "errors": self.errors},
+                          ensure_ascii=False, indent=2).encode()
+        if self.fmt == "zip":
+            self.archive.writestr("index.json", data)
+        else:
+            info = tarfile.TarInfo("index.json")
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self.archive.addfile(info, io.BytesIO(data))
+        self.archive.close()
+
+
+def stream_jobs(jobs: list, fileobj, fmt: str = "zip", workers: int = 2, render=None) -> int:
+    """Render jobs in parallel and add each to the archive as soon as it is done"""
+
+    if render is None:
+        from render_queue import render_template as render
+
+    archive = ArchiveStream(fileobj, fmt)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(render, job["template"], job["params"]): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    archive.add_file(future.result(), meta={"template": job["template"], "params": job["params"]})
+                except Exception as exc:
+                    # One bad banner is skipped and listed; the archive stays valid
+                    archive.add_error(job, exc)
+    finally:
+        archive.close()
+    return len(archive.index)
+
+
+def stream_existing(jobs: list, fileobj, fmt: str = "zip", output_dir=OUTPUT_DIR) -> int:
+    """Archive already rendered outputs of a manifest without re-rendering"""
+
+    archive = ArchiveStream(fileobj, fmt)
+    try:
+        for job in jobs:
+            path = Path(output_dir) / job["params"]["filename"]
+            if not path.exists():
+                continue
+            try:
+                archive.add_file(path, meta={"template": job["template"], "params": job["params"]})
+            except Exception as exc:
+                archive.add_error(job, exc)
+    finally:
+        archive.close()
+    return len(archive.index)
+
+
+class ChunkedWriter:
+    """File-like wrapper sending HTTP/1.1 chunked transfer encoding"""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, data):
+        if data:
+            self.wfile.write(f"{len(data):X}\r\n".encode() + bytes(data) + b"\r\n")
+        return len(data)
+
+    def flush(self):
+        self.wfile.flush()
+
+    def close(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class _ArchiveHandler(BaseHTTPRequestHandler):
+    """GET /campaign.zip or /campaign.tar, ?render=1 to render first"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        fmt = Path(url.path).suffix.lstrip(".")
+        if fmt not in ("zip", "tar"):
+            self.send_error(404)
+            return
+        query = parse_qs(url.query)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/zip" if fmt == "zip" else "application/x-tar")
+        self.send_header("Content-Disposition", f'attachment; filename="{Path(url.path).name}"')
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        out = ChunkedWriter(self.wfile)
+        jobs = load_manifest(self.server.manifest)
+        try:
+            if query.get("render") == ["1"]:
+                stream_jobs(jobs, out, fmt)
+            else:
+                stream_existing(jobs, out, fmt)
+        except Exception as exc:
+            # The 200 is already sent: drop the connection without the final
+            # chunk so the client sees an incomplete body, not a valid archive
+            print(f"[!] Archive stream aborted: {exc}")
+            self.close_connection = True
+            return
+        out.close()
+
+
+def serve(manifest=MANIFEST_PATH, host: str = "127.0.0.1", port: int = 8766) -> ThreadingHTTPServer:
+    """HTTP endpoint streaming campaign archives; call serve_forever() on it"""
+
+    server = ThreadingHTTPServer((host, port), _ArchiveHandler)
+    server.manifest = manifest
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a banner set into a ZIP or tar archive")
+    parser.add_argument("dest", help="archive path, '-' for stdout, or 'serve'")
+    parser.add_argument("--format", choices=["zip", "tar"])
+    parser.add_argument("--manifest", default=str(MANIFEST_PATH))
+    parser.add_argument("--render", action="store_true", help="render the manifest while archiving")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    if args.dest == "serve":
+        print(f"[+] Serving archives on http://127.0.0.1:{args.port}/campaign.zip")
+        serve(args.manifest, port=args.port).serve_forever()
+        return
+
+    fmt = args.format or ("tar" if args.dest.endswith(".tar") else "zip")
+    jobs = load_manifest(args.manifest)
+    out = sys.stdout.buffer if args.dest == "-" else open(args.dest, "wb")
+    try:
+        # Keep render progress messages out of an archive written to stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            if args.render:
+                count = stream_jobs(jobs, out, fmt, args.workers)
+            else:
+                count = stream_existing(jobs, out, fmt)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    print(f"[+] Archived {count} banners", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Mobile byte and decode budgets for Apega Desapega banners
+Reports each output's encoded size, decoded memory and over/under-sizing
+against where the app displays it, and fails when a slot budget is exceeded
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from PIL import Image
+
+from manifest import MANIFEST_PATH, load_manifest
+
+# Configuration
+OUTPUT_DIR = Path(__file__).parent / "output"
+DENSITIES = (1, 2, 3)
+# Low-end Android phones are ~360dp wide at xhdpi
+TARGET_DENSITY = 2
+SCREEN_WIDTH = 360
+# Asset pixels allowed per pixel actually shown at the target density
+MAX_OVERSIZE = 2.0
+# Encoded bytes allowed per pixel shown at the target density (4 bits per
+# pixel, a well-optimized PNG of flat or gradient art); the byte budget of
+# an asset follows from the pixels its slot needs, not from a fixed size
+BYTES_PER_PIXEL = 0.5
+
+# Where the app shows each kind of banner (dp) and how much decoded memory
+# it may take there. A None height means the image keeps its aspect ratio.
+SLOTS = {
+    "hero": {
+        "templates": ["generate_hero_banner"],
+        "where": "HomeScreen hero carousel (eager, ImageBackground cover)",
+        "display": (SCREEN_WIDTH, 420), "max_decoded": 2_000_000,
+    },
+    "promo": {
+        "templates": ["generate_promo_banner", "generate_cashback_banner",
+                      "generate_flash_sale_banner", "generate_sustainability_banner"],
+        "where": "HomeScreen promo banner / PromoBanner",
+        "display": (SCREEN_WIDTH - 32, 200), "max_decoded": 1_500_000,
+    },
+    "category": {
+        "templates": ["generate_category_card"],
+        "where": "CategoryStory / HomeScreen category circles",
+        "display": (80, 80), "max_decoded": 300_000,
+    },
+    "collection": {
+        "templates": ["generate_collection_banner"],
+        "where": "HomeScreen collection cards",
+        "display": (160, 200), "max_decoded": 1_500_000,
+    },
+    "card": {
+        "templates": ["generate_feature_banner", "generate_brand_highlight"],
+        "where": "feature and brand cards",
+        "display": (SCREEN_WIDTH // 2, None), "max_decoded": 600_000,
+    },
+    "showcase": {
+        "templates": ["generate_product_showcase", "generate_testimonial_banner", "generate_seller_spotlight"],
+        "where": "full-width content banners",
+        "display": (SCREEN_WIDTH, None), "max_decoded": 2_000_000,
+    },
+}
+
+_SLOT_OF = {t: name for name, slot in SLOTS.items() for t in slot["templates"]}
+
+
+def display_size(slot: dict, width: int, height: int) -> tuple:
+    dw, dh = slot["display"]
+    return dw, dh if dh is not None else round(dw * height / width)
+
+
+def needed_pixels(slot: dict, width: int, height: int, density: float) -> tuple:
+    """Image pixels actually shown when scaled to cover the slot at a density"""
+
+    dw, dh = display_size(slot, width, height)
+    scale = max(dw / width, dh / height) * density
+    return round(width * scale), round(height * scale)
+
+
+def max_bytes(slot: dict, width: int, height: int) -> int:
+    """Encoded byte budget: BYTES_PER_PIXEL for every pixel shown at the target density"""
+
+    nw, nh = needed_pixels(slot, width, height, TARGET_DENSITY)
+    return round(nw * nh * BYTES_PER_PIXEL)
+
+
+def inspect_asset(path, template: str) -> dict:
+    """Budget figures for one output image"""
+
+    path = Path(path)
+    slot_name = _SLOT_OF.get(template, "showcase")
+    slot = SLOTS[slot_name]
+    with Image.open(path) as img:
+        width, height = img.size
+
+    encoded = path.stat().st_size
+    decoded = width * height * 4
+    per_density = {}
+    for density in DENSITIES:
+        nw, nh = needed_pixels(slot, width, height, density)
+        per_density[f"{density}x"] = {"pixels": [nw, nh], "decoded": nw * nh * 4}
+    nw, nh = needed_pixels(slot, width, height, TARGET_DENSITY)
+    ratio = (width * height) / (nw * nh)
+
+    byte_budget = max_bytes(slot, width, height)
+    problems = []
+    if encoded > byte_budget:
+        problems.append(f"{encoded / 1024:.0f} KB encoded > {byte_budget / 1024:.0f} KB")
+    if decoded > slot["max_decoded"]:
+        problems.append(f"{decoded / 1e6:.2f} MB decoded > {slot['max_decoded'] / 1e6:.2f} MB")
+    if ratio > MAX_OVERSIZE:
+        problems.append(f"{ratio:.1f}x the pixels shown at {TARGET_DENSITY}x")
+
+    return {
+        "file": path.name, "template": template, "slot": slot_name, "where": slot["where"],
+        "size": [width, height], "display": list(display_size(slot, width, height)),
+        "bytes": encoded, "max_bytes": byte_budget, "decoded": decoded, "densities": per_density,
+        "ratio": ratio, "undersized": ratio < 1.0, "problems": problems,
+    }
+
+
+def report(jobs: list, output_dir=OUTPUT_DIR) -> list:
+    """Inspect every rendered output of a manifest"""
+
+    rows = []
+    for job in jobs:
+        path = Path(output_dir) / job["params"]["filename"]
+        if path.exists():
+            rows.append(inspect_asset(path, job["template"]))
+    return rows
+
+
+def print_report(rows: list):
+    print("=" * 50)
+    print(f"[*] Asset budgets ({TARGET_DENSITY}x target, {SCREEN_WIDTH}dp screen)")
+    print("=" * 50)
+    print(f"  {'file':34} {'slot':10} {'size':>9} {'KB':>6} {'decoded MB':>10} {'ratio':>6}")
+    for r in rows:
+        flag = "[!]" if r["problems"] else "   "
+        size = f"{r['size'][0]}x{r['size'][1]}"
+        print(f"{flag}{r['file'][:34]:34} {r['slot']:10} {size:>9} {r['bytes'] / 1024:6.0f} "
+              f"{r['decoded'] / 1e6:10.2f} {r['ratio']:6.2f}{'  (blurry)' if r['undersized'] else ''}")
+        for problem in r["problems"]:
+            print(f"      - {problem}")
+    total = sum(r["bytes"] for r in rows)
+    print(f"\n  {len(rows)} assets, {total / 1024:.0f} KB encoded, "
+          f"{sum(r['decoded'] for r in rows) / 1e6:.1f} MB decoded")
+
+
+def failures(rows: list) -> list:
+    return [r for r in rows if r["problems"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check banners against mobile byte and decode budgets")
+    parser.add_argument("--manifest", default=str(MANIFEST_PATH))
+    parser.add_argument("--output-dir", default=str(OUTPUT_DIR))
+    parser.add_argument("--json", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    rows = report(load_manifest(args.manifest), args.output_dir)
+    print_report(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+
+    failed = failures(rows)
+    if failed:
+        print(f"[!] {len(failed)} assets over budget")
+        raise SystemExit(1)
+    print("[OK] All assets within budget")
+
+
+if __name__ == "__main__":
+    main()
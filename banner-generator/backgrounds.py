@@ -0,0 +1,265 @@
+"""
+Vectorized background primitives for Apega Desapega banners
+NumPy rasterizers for the decorative layers the templates draw with CSS
+(135deg gradients, repeating stripes, 40px grids, translucent circles and
+rings) with anti-aliasing and alpha, at any device scale
+"""
+
+import argparse
+import base64
+import io
+import re
+import time
+
+import numpy as np
+from PIL import Image
+
+# Canvases are float32 (H, W, 4) premultiplied RGBA in 0..1; all geometry is
+# in CSS pixels and `scale` is device pixels per CSS pixel
+
+_RGBA_RE = re.compile(r"rgba?\(([^)]*)\)")
+
+
+def parse_color(color) -> np.ndarray:
+    """'#RGB', '#RRGGBB', '#RRGGBBAA', 'rgb()/rgba()' or 'transparent' -> RGBA floats"""
+
+    if isinstance(color, (tuple, list, np.ndarray)):
+        rgba = np.asarray(color, dtype=np.float32)
+        return rgba if len(rgba) == 4 else np.append(rgba, 1.0).astype(np.float32)
+    color = color.strip()
+    if color == "transparent":
+        return np.zeros(4, dtype=np.float32)
+    if color.startswith("#"):
+        hex_digits = color[1:]
+        if len(hex_digits) in (3, 4):
+            hex_digits = "".join(c * 2 for c in hex_digits)
+        channels = [int(hex_digits[i:i + 2], 16) / 255 for i in range(0, len(hex_digits), 2)]
+        return np.array(channels + [1.0] * (4 - len(channels)), dtype=np.float32)
+    match = _RGBA_RE.fullmatch(color)
+    if match:
+        parts = [float(p) for p in match.group(1).split(",")]
+        return np.array([p / 255 for p in parts[:3]] + [parts[3] if len(parts) > 3 else 1.0], dtype=np.float32)
+    raise ValueError(f"Unsupported color: {color}")
+
+
+def _premultiplied(color) -> np.ndarray:
+    rgba = parse_color(color)
+    return np.append(rgba[:3] * rgba[3], rgba[3]).astype(np.float32)
+
+
+def canvas(width: int, height: int, scale: float = 1.0, color="transparent") -> np.ndarray:
+    """Blank canvas of a CSS size at a device scale"""
+
+    shape = (round(height * scale), round(width * scale), 4)
+    return np.broadcast_to(_premultiplied(color), shape).copy()
+
+
+def _coords(arr: np.ndarray, scale: float) -> tuple:
+    """CSS-pixel coordinates of pixel centers, shaped for broadcasting"""
+
+    h, w = arr.shape[:2]
+    x = ((np.arange(w, dtype=np.float32) + 0.5) / scale)[None, :]
+    y = ((np.arange(h, dtype=np.float32) + 0.5) / scale)[:, None]
+    return x, y
+
+
+def _band(p: np.ndarray, start: float, end: float, pixel: float) -> np.ndarray:
+    """Fraction of a one-pixel box around p that falls inside [start, end]"""
+
+    lo = np.maximum(p - pixel / 2, start)
+    hi = np.minimum(p + pixel / 2, end)
+    return np.clip((hi - lo) / pixel, 0.0, 1.0)
+
+
+def composite(arr: np.ndarray, color, coverage=1.0) -> np.ndarray:
+    """Source-over a solid color (or per-pixel RGBA layer) through a coverage mask"""
+
+    if isinstance(color, np.ndarray) and color.ndim == 3:
+        src = color * np.asarray(coverage, dtype=np.float32)[..., None] if np.ndim(coverage) else color * coverage
+    else:
+        src = _premultiplied(color) * np.asarray(coverage, dtype=np.float32)[..., None]
+    arr *= 1.0 - src[..., 3:4]
+    arr += src
+    return arr
+
+
+def linear_gradient(arr: np.ndarray, colors, angle: float = 135, scale: float = 1.0) -> np.ndarray:
+    """CSS linear-gradient(angle, c0, c1, ...) with evenly spaced stops
+
+    Stops may also be (color, position) pairs with positions in 0..1.
+    Interpolation is in premultiplied sRGB, as browsers do.
+    """
+
+    x, y = _coords(arr, scale)
+    h, w = arr.shape[0] / scale, arr.shape[1] / scale
+    rad = np.radians(angle)
+    dx, dy = np.sin(rad), -np.cos(rad)
+    # Gradient line length so the corners land exactly on 0% and 100%
+    length = abs(w * dx) + abs(h * dy)
+    t = ((x - w / 2) * dx + (y - h / 2) * dy) / length + 0.5
+
+    stops = [c if isinstance(c, (tuple, list)) and len(c) == 2 and not isinstance(c[0], (int, float))
+             else (c, i / max(len(colors) - 1, 1)) for i, c in enumerate(colors)]
+    positions = np.array([p for _, p in stops], dtype=np.float32)
+    values = np.stack([_premultiplied(c) for c, _ in stops])
+    # Piecewise lerp between neighbouring stops, in float32 throughout
+    t = np.clip(t, positions[0], positions[-1]).astype(np.float32)
+    seg = np.clip(np.searchsorted(positions, t, side="right") - 1, 0, len(stops) - 2)
+    span = np.maximum(positions[seg + 1] - positions[seg], 1e-6)
+    frac = ((t - positions[seg]) / span)[..., None]
+    layer = values[seg] + (values[seg + 1] - values[seg]) * frac
+    return composite(arr, np.broadcast_to(layer, arr.shape).astype(np.float32, copy=False))
+
+
+def stripes(arr: np.ndarray, color, angle: float = 45, start: float = 35, end: float = 70,
+            period: float = 70, scale: float = 1.0) -> np.ndarray:
+    """repeating-linear-gradient with a solid band [start, end) every period px"""
+
+    x, y = _coords(arr, scale)
+    h, w = arr.shape[0] / scale, arr.shape[1] / scale
+    rad = np.radians(angle)
+    dx, dy = np.sin(rad), -np.cos(rad)
+    # Repeating gradients start at the 0% point of the gradient line
+    origin = -(abs(w * dx) + abs(h * dy)) / 2
+    d = (x - w / 2) * dx + (y - h / 2) * dy - origin
+    p = np.mod(d, period)
+    pixel = 1.0 / scale
+    coverage = sum(_band(p, start + k * period, end + k * period, pixel) for k in (-1, 0, 1))
+    return composite(arr, color, np.clip(coverage, 0, 1))
+
+
+def grid(arr: np.ndarray, color, spacing: float = 40, line_width: float = 1,
+         scale: float = 1.0) -> np.ndarray:
+    """Two tiled 1px line gradients (horizontal then vertical), as the CSS grid"""
+
+    x, y = _coords(arr, scale)
+    pixel = 1.0 / scale
+    for axis in (y, x):
+        p = np.mod(axis, spacing)
+        coverage = _band(p, 0, line_width, pixel) + _band(p, spacing, spacing + line_width, pixel)
+        composite(arr, color, np.broadcast_to(np.clip(coverage, 0, 1), arr.shape[:2]))
+    return arr
+
+
+def _clip_box(arr: np.ndarray, cx: float, cy: float, extent: float, scale: float) -> tuple:
+    """View of arr covering a square around (cx, cy), with its CSS-pixel coordinates"""
+
+    h, w = arr.shape[:2]
+    x0, x1 = max(int((cx - extent) * scale), 0), min(int(np.ceil((cx + extent) * scale)), w)
+    y0, y1 = max(int((cy - extent) * scale), 0), min(int(np.ceil((cy + extent) * scale)), h)
+    view = arr[y0:max(y0, y1), x0:max(x0, x1)]
+    x, y = _coords(view, scale)
+    return view, x + x0 / scale, y + y0 / scale
+
+
+def circle(arr: np.ndarray, cx: float, cy: float, radius: float, color,
+           blur: float = 0, scale: float = 1.0) -> np.ndarray:
+    """Filled circle with anti-aliased (or blurred) edge"""
+
+    softness = max(blur, 1.0 / scale)
+    view, x, y = _clip_box(arr, cx, cy, radius + softness, scale)
+    if view.size:
+        dist = np.hypot(x - cx, y - cy)
+        composite(view, color, np.clip((radius - dist) / softness + 0.5, 0, 1))
+    return arr
+
+
+def ring(arr: np.ndarray, cx: float, cy: float, radius: float, color,
+         width: float = 1, scale: float = 1.0) -> np.ndarray:
+    """Circle outline drawn outside the radius, like a CSS border around a round content box"""
+
+    view, x, y = _clip_box(arr, cx, cy, radius + width + 1.0 / scale, scale)
+    if view.size:
+        dist = np.hypot(x - cx, y - cy)
+        composite(view, color, _band(dist, radius, radius + width, 1.0 / scale))
+    return arr
+
+
+def to_image(arr: np.ndarray) -> Image.Image:
+    """Un-premultiply into an 8-bit RGBA image"""
+
+    alpha = arr[..., 3:4]
+    rgb = np.divide(arr[..., :3], alpha, out=np.zeros_like(arr[..., :3]), where=alpha > 0)
+    out = np.concatenate([rgb, alpha], axis=-1)
+    return Image.fromarray(np.round(np.clip(out, 0, 1) * 255).astype(np.uint8), "RGBA")
+
+
+def data_uri(arr: np.ndarray) -> str:
+    """PNG data URI, to hand the browser one pre-made background image"""
+
+    buf = io.BytesIO()
+    to_image(arr).save(buf, "PNG", compress_level=1)
+    return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def background_css(arr: np.ndarray) -> str:
+    """CSS declaration replacing a template's layered background"""
+
+    return f"background: url({data_uri(arr)}) 0 0 / 100% 100% no-repeat;"
+
+
+# Template backgrounds, matching the decorative layers in the template CSS
+
+def hero_background(gradient_colors=("#D4A574", "#8B7355"), scale: float = 1.0) -> np.ndarray:
+    arr = canvas(800, 400, scale)
+    linear_gradient(arr, gradient_colors, 135, scale)
+    circle(arr, 800 + 50 - 150, -100 + 150, 150, "rgba(255,255,255,0.1)", scale=scale)
+    circle(arr, -40 + 100, 400 + 80 - 100, 100, "rgba(255,255,255,0.08)", scale=scale)
+    return arr
+
+
+def promo_background(bg_color="#1A1A1A", accent_color="#D4A574", scale: float = 1.0) -> np.ndarray:
+    arr = canvas(800, 400, scale, bg_color)
+    stripes(arr, "rgba(255,255,255,0.02)", 45, 35, 70, 70, scale)
+    ring(arr, 400, 200, 200, accent_color + "20", 1, scale)
+    ring(arr, 400, 200, 250, accent_color + "10", 1, scale)
+    return arr
+
+
+def cashback_background(scale: float = 1.0) -> np.ndarray:
+    arr = canvas(800, 400, scale)
+    linear_gradient(arr, ("#4CAF50", "#2E7D32"), 135, scale)
+    circle(arr, 800 - 100 - 100, -60 + 100, 100, "rgba(255,255,255,0.1)", scale=scale)
+    circle(arr, 800 - 200 - 50, 400 - 40 - 50, 50, "rgba(255,255,255,0.08)", scale=scale)
+    return arr
+
+
+def collection_background(gradient_colors=("#2D2D2D", "#4A4A4A"), scale: float = 1.0) -> np.ndarray:
+    arr = canvas(800, 400, scale)
+    linear_gradient(arr, gradient_colors, 135, scale)
+    grid(arr, "rgba(255,255,255,0.03)", 40, 1, scale)
+    return arr
+
+
+BACKGROUNDS = {
+    "hero": hero_background,
+    "promo": promo_background,
+    "cashback": cashback_background,
+    "collection": collection_background,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rasterize template backgrounds with NumPy")
+    parser.add_argument("name", choices=list(BACKGROUNDS))
+    parser.add_argument("-o", "--output", help="PNG path (default: output/bg_<name>@<scale>x.png)")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--bench", type=int, default=0, help="time N rasterizations")
+    args = parser.parse_args()
+
+    draw = BACKGROUNDS[args.name]
+    started = time.perf_counter()
+    arr = draw(scale=args.scale)
+    for _ in range(args.bench):
+        draw(scale=args.scale)
+    elapsed = (time.perf_counter() - started) / (args.bench + 1)
+
+    from renderer import output_dir
+
+    output = args.output or output_dir() / f"bg_{args.name}@{args.scale:g}x.png"
+    to_image(arr).save(output)
+    print(f"[+] {args.name} {arr.shape[1]}x{arr.shape[0]} in {elapsed * 1000:.1f} ms -> {output}")
+
+
+if __name__ == "__main__":
+    main()
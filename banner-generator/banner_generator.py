@@ -4,10 +4,11 @@ Uses HTML/CSS to create beautiful, designer-quality banners
 """
 
 import os
-from html2image import Html2Image
 from pathlib import Path
 import json
 
+from renderer import render_html
+
 # Configuration
 OUTPUT_DIR = Path(__file__).parent / "output"
 ASSETS_DIR = Path(__file__).parent / "assets"
@@ -33,8 +34,12 @@ COLORS = {
     "lavender": "#B8A9C9",
 }
 
-# Initialize html2image
-hti = Html2Image(output_path=str(OUTPUT_DIR), size=(800, 400))
+
+def format_brl(value) -> str:
+    """1234.5 -> 'R$ 1.234,50'"""
+
+    text = f"{float(value):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    return f"R$ {text}"
 
 
 def generate_hero_banner(
@@ -127,9 +132,7 @@ def generate_hero_banner(
     </html>
     """
 
-    hti.screenshot(html_str=html, save_as=filename)
-    print(f"Generated: {OUTPUT_DIR / filename}")
-    return str(OUTPUT_DIR / filename)
+    return render_html(html, filename, size=(800, 400))
 
 
 def generate_promo_banner(
@@ -249,9 +252,7 @@ def generate_promo_banner(
     </html>
     """
 
-    hti.screenshot(html_str=html, save_as=filename)
-    print(f"Generated: {OUTPUT_DIR / filename}")
-    return str(OUTPUT_DIR / filename)
+    return render_html(html, filename, size=(800, 400))
 
 
 def generate_category_card(
@@ -263,8 +264,6 @@ def generate_category_card(
 ):
     """Generate a category card"""
 
-    hti_small = Html2Image(output_path=str(OUTPUT_DIR), size=(300, 200))
-
     html = f"""
     <!DOCTYPE html>
     <html>
@@ -324,9 +323,7 @@ def generate_category_card(
     </html>
     """
 
-    hti_small.screenshot(html_str=html, save_as=filename)
-    print(f"Generated: {OUTPUT_DIR / filename}")
-    return str(OUTPUT_DIR / filename)
+    return render_html(html, filename, size=(300, 200))
 
 
 def generate_feature_banner(
@@ -339,8 +336,6 @@ def generate_feature_banner(
 ):
     """Generate a feature/benefit banner"""
 
-    hti_feature = Html2Image(output_path=str(OUTPUT_DIR), size=(400, 300))
-
     html = f"""
     <!DOCTYPE html>
     <html>
@@ -399,9 +394,7 @@ def generate_feature_banner(
     </html>
     """
 
-    hti_feature.screenshot(html_str=html, save_as=filename)
-    print(f"Generated: {OUTPUT_DIR / filename}")
-    return str(OUTPUT_DIR / filename)
+    return render_html(html, filename, size=(400, 300))
 
 
 def generate_cashback_banner(
@@ -509,9 +502,7 @@ def generate_cashback_banner(
     </html>
     """
 
-    hti.screenshot(html_str=html, save_as=filename)
-    print(f"Generated: {OUTPUT_DIR / filename}")
-    return str(OUTPUT_DIR / filename)
+    return render_html(html, filename, size=(800, 400))
 
 
 def generate_brand_highlight(
@@ -524,8 +515,6 @@ def generate_brand_highlight(
 ):
     """Generate a brand highlight card"""
 
-    hti_brand = Html2Image(output_path=str(OUTPUT_DIR), size=(350, 200))
-
     logo_html = f'<img src="{logo_url}" style="width: 60px; height: 60px; object-fit: contain; margin-bottom: 16px;" />' if logo_url else f'''
         <div style="
             width: 60px;
@@ -583,9 +572,7 @@ def generate_brand_highlight(
     </html>
     """
 
-    hti_brand.screenshot(html_str=html, save_as=filename)
-    print(f"Generated: {OUTPUT_DIR / filename}")
-    return str(OUTPUT_DIR / filename)
+    return render_html(html, filename, size=(350, 200))
 
 
 def generate_sustainability_banner(
@@ -687,9 +674,7 @@ def generate_sustainability_banner(
     </html>
     """
 
-    hti.screenshot(html_str=html, save_as=filename)
-    print(f"Generated: {OUTPUT_DIR / filename}")
-    return str(OUTPUT_DIR / filename)
+    return render_html(html, filename, size=(800, 400))
 
 
 def generate_all_banners():
@@ -0,0 +1,155 @@
+"""
+Batch executor for Apega Desapega banners
+Runs a manifest across parallel workers, longest predicted job first
+"""
+
+import argparse
+import heapq
+import queue
+import threading
+import time
+
+from cost_model import CostModel
+from manifest import MANIFEST_PATH, load_manifest
+
+
+def lpt_schedule(jobs: list, workers: int, model: CostModel):
+    """Longest-processing-time-first assignment of jobs to workers
+
+    Returns (order, lanes, makespan): the jobs sorted by predicted cost,
+    the per-worker assignment and the predicted wall-clock time.
+    """
+
+    costs = [(model.predict(job), i, job) for i, job in enumerate(jobs)]
+    costs.sort(key=lambda item: (-item[0], item[1]))
+
+    lanes = [[] for _ in range(workers)]
+    loads = [(0.0, w) for w in range(workers)]
+    for cost, _, job in costs:
+        load, w = heapq.heappop(loads)
+        lanes[w].append((cost, job))
+        heapq.heappush(loads, (load + cost, w))
+
+    makespan = max(load for load, _ in loads) if jobs else 0.0
+    return [job for _, _, job in costs], lanes, makespan
+
+
+def run_batch(jobs: list, workers: int = 4, model: CostModel = None, render=None) -> dict:
+    """Render jobs on a worker pool pulling from an LPT-ordered queue
+
+    Every viewport renderer is shared across workers, so ordering by cost
+    does not give up the renderer reuse of scheduler.plan_batch.
+    """
+
+    if render is None:
+        from render_queue import render_template as render
+    model = model or CostModel()
+
+    order, _, predicted = lpt_schedule(jobs, workers, model)
+    predictions = {id(job): model.predict(job) for job in order}
+
+    pending = queue.Queue()
+    for job in order:
+        pending.put(job)
+
+    timings = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            try:
+                job = pending.get_nowait()
+            except queue.Empty:
+                return
+            started = time.perf_counter()
+            try:
+                render(job["template"], job["params"])
+            except Exception as exc:
+                with lock:
+                    errors.append((job, exc))
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                model.record(job, elapsed)
+                timings.append((job, predictions[id(job)], elapsed))
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, name=f"batch-{i}") for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    actual = time.perf_counter() - started
+
+    model.save()
+    return {"predicted": predicted, "actual": actual, "timings": timings, "errors": errors}
+
+
+def print_report(stats: dict):
+    """Print predicted vs actual times per template and for the whole run"""
+
+    per_template = {}
+    for job, predicted, elapsed in stats["timings"]:
+        row = per_template.setdefault(job["template"], [0, 0.0, 0.0])
+        row[0] += 1
+        row[1] += predicted
+        row[2] += elapsed
+
+    print("\n" + "=" * 50)
+    print(f"{'template':34} {'n':>3} {'pred':>6} {'actual':>6}")
+    for template, (n, predicted, elapsed) in sorted(per_template.items(), key=lambda kv: -kv[1][2]):
+        print(f"{template:34} {n:>3} {predicted:>6.1f} {elapsed:>6.1f}")
+    print("-" * 50)
+    print(f"[>] Makespan predicted {stats['predicted']:.1f}s, actual {stats['actual']:.1f}s")
+    for job, exc in stats["errors"]:
+        print(f"[!] {job['params'].get('filename')}: {exc}")
+    print("=" * 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a manifest longest-job-first")
+    parser.add_argument("--manifest", default=str(MANIFEST_PATH))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--dry-run", action="store_true", help="print the prediction only")
+    parser.add_argument("--shm", action="store_true",
+                        help="render and post-process in separate processes sharing frame memory")
+    parser.add_argument("--post-workers", type=int, default=2)
+    parser.add_argument("--profile", nargs="?", const="*", metavar="GLOB",
+                        help="profile matching renders (Python + browser trace) instead of running the batch")
+    args = parser.parse_args()
+
+    jobs = load_manifest(args.manifest)
+    if args.profile:
+        import fnmatch
+
+        import profiling
+
+        selected = [j for j in jobs if fnmatch.fnmatch(j["params"]["filename"], args.profile)]
+        profiling.print_summary(profiling.profile_jobs(selected))
+        return
+    model = CostModel()
+    order, lanes, predicted = lpt_schedule(jobs, args.workers, model)
+
+    print("=" * 50)
+    print(f"[*] {len(jobs)} jobs on {args.workers} workers")
+    print("=" * 50)
+    for w, lane in enumerate(lanes):
+        print(f"  worker {w}: {len(lane)} jobs, {sum(cost for cost, _ in lane):.1f}s")
+    print(f"[>] Predicted run time: {predicted:.1f}s")
+
+    if args.dry_run:
+        return
+    if args.shm:
+        import frame_ring
+
+        stats = frame_ring.run_batch(order, args.workers, args.post_workers)
+        print(f"[OK] {len(stats['outputs'])} banners rendered and optimized")
+        for name, error in stats["errors"]:
+            print(f"[!] {name}: {error}")
+    else:
+        print_report(run_batch(jobs, args.workers, model))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Content-addressed storage for Apega Desapega banners
+Stores each unique output once under its hash; builds are manifests of
+name -> hash and output names are hardlinks into the store
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+# Configuration
+STORE_DIR = Path(__file__).parent / ".store"
+OUTPUT_DIR = Path(__file__).parent / "output"
+
+
+def file_hash(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def link_or_copy(src, dest):
+    """Hardlink src to dest, falling back to a symlink and then a copy"""
+
+    dest = Path(dest)
+    # rename() between two links to one inode is a no-op, so check first
+    if dest.exists() and os.path.samefile(src, dest):
+        return
+    tmp = dest.with_name(f".{dest.name}.link")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        try:
+            os.symlink(os.path.abspath(src), tmp)
+        except OSError:
+            shutil.copy2(src, tmp)
+    os.replace(tmp, dest)
+
+
+class BlobStore:
+    """Hash-named blobs plus named manifests that reference them"""
+
+    def __init__(self, root=STORE_DIR):
+        self.root = Path(root)
+        self.blobs = self.root / "blobs"
+        self.manifests = self.root / "manifests"
+        self.blobs.mkdir(parents=True, exist_ok=True)
+        self.manifests.mkdir(parents=True, exist_ok=True)
+
+    def blob_path(self, digest: str, suffix: str = ".png") -> Path:
+        return self.blobs / digest[:2] / f"{digest}{suffix}"
+
+    def put(self, path, move: bool = False) -> str:
+        """Add a file to the store and return its hash; duplicates cost nothing"""
+
+        path = Path(path)
+        digest = file_hash(path)
+        blob = self.blob_path(digest, path.suffix)
+        if blob.exists():
+            return digest
+
+        blob.parent.mkdir(exist_ok=True)
+        tmp = blob.with_name(f".{blob.name}.{os.getpid()}.tmp")
+        if move:
+            os.replace(path, tmp)
+        else:
+            shutil.copy2(path, tmp)
+        os.replace(tmp, blob)
+        return digest
+
+    def commit(self, name: str, source_dir=OUTPUT_DIR, pattern: str = "*.png") -> dict:
+        """Record every file in source_dir as manifest `name`
+
+        Each file is moved into the store (or dropped if its content is
+        already there) and replaced by a hardlink to the blob. Blobs stay
+        writable so the linked outputs do too; tools that rewrite an output
+        must write a temp file and os.replace() it, never write in place.
+        """
+
+        files = {}
+        for path in sorted(Path(source_dir).glob(pattern)):
+            if path.name.startswith("."):
+                continue
+            digest = self.put(path, move=True)
+            link_or_copy(self.blob_path(digest, path.suffix), path)
+            files[path.name] = digest
+
+        manifest = {"name": name, "created": time.time(), "files": files}
+        tmp = self.manifests / f".{name}.json.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.manifests / f"{name}.json")
+        return manifest
+
+    def load(self, name: str) -> dict:
+        with open(self.manifests / f"{name}.json", encoding="utf-8") as f:
+            return json.load(f)
+
+    def names(self) -> list:
+        return sorted(p.stem for p in self.manifests.glob("*.json"))
+
+    def checkout(self, name: str, dest_dir) -> int:
+        """Materialise a manifest's human-readable names in dest_dir"""
+
+        dest_dir = Path(dest_dir)
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        files = self.load(name)["files"]
+        for filename, digest in files.items():
+            link_or_copy(self.blob_path(digest, Path(filename).suffix), dest_dir / filename)
+        return len(files)
+
+    def drop(self, name: str):
+        """Forget a manifest; its blobs go at the next gc()"""
+
+        (self.manifests / f"{name}.json").unlink()
+
+    def refcounts(self) -> dict:
+        """Number of manifest entries pointing at each blob"""
+
+        counts = {}
+        for name in self.names():
+            for digest in self.load(name)["files"].values():
+                counts[digest] = counts.get(digest, 0) + 1
+        return counts
+
+    def gc(self) -> tuple:
+        """Delete blobs no manifest references; returns (files, bytes) freed"""
+
+        live = self.refcounts()
+        freed = [0, 0]
+        for blob in self.blobs.glob("*/*"):
+            if blob.name.startswith("."):
+                continue
+            if blob.name.split(".", 1)[0] not in live:
+                freed[0] += 1
+                freed[1] += blob.stat().st_size
+                blob.unlink()
+        return tuple(freed)
+
+    def stats(self) -> dict:
+        """Unique vs logical bytes across all manifests"""
+
+        sizes = {
+            blob.name.split(".", 1)[0]: blob.stat().st_size
+            for blob in self.blobs.glob("*/*")
+            if not blob.name.startswith(".")
+        }
+        refs = self.refcounts()
+        return {
+            "manifests": len(self.names()),
+            "blobs": len(sizes),
+            "unique_bytes": sum(sizes.values()),
+            "logical_bytes": sum(sizes.get(d, 0) * n for d, n in refs.items()),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed banner store")
+    parser.add_argument("--store", default=str(STORE_DIR))
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_commit = sub.add_parser("commit", help="store a directory as a named manifest")
+    p_commit.add_argument("name")
+    p_commit.add_argument("--dir", default=str(OUTPUT_DIR))
+
+    p_checkout = sub.add_parser("checkout", help="link a manifest's files into a directory")
+    p_checkout.add_argument("name")
+    p_checkout.add_argument("dest")
+
+    p_drop = sub.add_parser("drop", help="forget a manifest")
+    p_drop.add_argument("name")
+
+    sub.add_parser("gc", help="delete unreferenced blobs")
+    sub.add_parser("stats", help="show dedupe statistics")
+
+    args = parser.parse_args()
+    store = BlobStore(args.store)
+
+    if args.command == "commit":
+        manifest = store.commit(args.name, args.dir)
+        print(f"[+] {args.name}: {len(manifest['files'])} files")
+    elif args.command == "checkout":
+        print(f"[+] Linked {store.checkout(args.name, args.dest)} files into {args.dest}")
+    elif args.command == "drop":
+        store.drop(args.name)
+        print(f"[+] Dropped {args.name}")
+    elif args.command == "gc":
+        files, size = store.gc()
+        print(f"[+] Removed {files} blobs, {size / 1024:.0f} KB")
+    else:
+        print(store.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Catalog aggregation for Apega Desapega banners
+Streams a catalog or orders export (JSONL or CSV, optionally gzipped) once
+to count live items per category and collection and pieces given a second
+life, then writes the numbers into the manifest and re-renders only the
+banners whose numbers changed
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import time
+import unicodedata
+from pathlib import Path
+
+from manifest import MANIFEST_PATH, load_manifest, save_manifest
+
+# Configuration
+# Product rows (as in the app's Product type) count by status; order rows
+# (anything with an order_id) count their quantity as reused pieces.
+LIVE_STATUSES = {"active", "reserved"}
+REUSED_STATUSES = {"sold"}
+CATEGORY_FIELDS = ("category_name", "category")
+COLLECTION_FIELDS = ("collections", "collection")
+
+# Manifest params fed by each counter
+COUNT_PARAMS = {
+    "generate_category_card": ("category", "item_count", "categories"),
+    "generate_collection_banner": ("collection_name", "item_count", "collections"),
+}
+
+
+def normalize(name: str) -> str:
+    """Match key for names: case, accents and spacing ignored"""
+
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode("ascii")
+    return " ".join(text.casefold().replace("_", " ").split())
+
+
+def _open_text(path: Path):
+    if path.suffix == ".gz":
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def iter_rows(path):
+    """Rows of a .jsonl/.csv export (optionally .gz), one at a time"""
+
+    path = Path(path)
+    kind = Path(path.stem).suffix if path.suffix == ".gz" else path.suffix
+    with _open_text(path) as f:
+        if kind == ".csv":
+            yield from csv.DictReader(f)
+        elif kind in (".jsonl", ".ndjson"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            raise ValueError(f"Unsupported export format: {path.name}")
+
+
+def _first(row: dict, fields: tuple):
+    for field in fields:
+        value = row.get(field)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _collections(row: dict) -> list:
+    value = _first(row, COLLECTION_FIELDS)
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split("|") if "|" in value else value.split(",")
+    return [v for v in (str(v).strip() for v in value) if v]
+
+
+class CatalogStats:
+    """Running counters; memory grows with categories and collections, not rows"""
+
+    def __init__(self):
+        self.rows = 0
+        self.skipped = 0
+        self.categories = {}
+        self.collections = {}
+        self.reused = 0
+        self.reused_by_condition = {}
+        self.labels = {}
+
+    def _count(self, counter: dict, name: str):
+        key = normalize(name)
+        self.labels.setdefault(key, name)
+        counter[key] = counter.get(key, 0) + 1
+
+    def add(self, row: dict):
+        self.rows += 1
+        if row.get("order_id") not in (None, ""):
+            try:
+                quantity = int(row.get("quantity") or 1)
+            except ValueError:
+                self.skipped += 1
+                return
+            self.reused += quantity
+            condition = row.get("condition") or "unknown"
+            self.reused_by_condition[condition] = self.reused_by_condition.get(condition, 0) + quantity
+            return
+
+        status = row.get("status")
+        if status in REUSED_STATUSES:
+            self.reused += 1
+            condition = row.get("condition") or "unknown"
+            self.reused_by_condition[condition] = self.reused_by_condition.get(condition, 0) + 1
+        elif status in LIVE_STATUSES:
+            category = _first(row, CATEGORY_FIELDS)
+            if category:
+                self._count(self.categories, category)
+            for collection in _collections(row):
+                self._count(self.collections, collection)
+        elif status is None:
+            self.skipped += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "rows": self.rows, "skipped": self.skipped, "reused": self.reused,
+            "reused_by_condition": self.reused_by_condition,
+            "categories": {self.labels[k]: v for k, v in sorted(self.categories.items())},
+            "collections": {self.labels[k]: v for k, v in sorted(self.collections.items())},
+        }
+
+
+def aggregate(paths) -> CatalogStats:
+    """One pass over every export file"""
+
+    stats = CatalogStats()
+    for path in paths:
+        for row in iter_rows(path):
+            stats.add(row)
+    return stats
+
+
+def reuse_label(count: int) -> str:
+    """Round a reused-pieces count down for display: 534 -> "530+", 12840 -> "12.000+" """
+
+    if count < 10:
+        return str(count)
+    step = 10 ** (len(str(count)) - 2)
+    return f"{count // step * step:,}+".replace(",", ".")
+
+
+def apply_stats(jobs: list, stats: CatalogStats) -> tuple:
+    """Jobs with live counts filled in, and the filenames whose params changed
+
+    Names missing from the export keep their manifest value so a partial
+    export cannot zero out a banner.
+    """
+
+    updated, changed = [], []
+    for job in jobs:
+        params = dict(job["params"])
+        template = job["template"]
+        if template in COUNT_PARAMS:
+            name_param, count_param, counter = COUNT_PARAMS[template]
+            count = getattr(stats, counter).get(normalize(params.get(name_param, "")))
+            if count is not None:
+                params[count_param] = count
+        elif template == "generate_sustainability_banner" and stats.reused:
+            params["stat_number"] = reuse_label(stats.reused)
+        if params != job["params"]:
+            changed.append(params["filename"])
+        updated.append(dict(job, params=params))
+    return updated, changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feed live catalog counts into the banner manifest")
+    parser.add_argument("exports", nargs="+", help="catalog/orders exports (.jsonl, .csv, optionally .gz)")
+    parser.add_argument("--manifest", default=str(MANIFEST_PATH))
+    parser.add_argument("--write", action="store_true", help="save the updated manifest")
+    parser.add_argument("--render", action="store_true", help="re-render the banners whose numbers changed")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--json", help="also write the aggregated stats as JSON")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    stats = aggregate(args.exports)
+    elapsed = time.perf_counter() - started
+
+    print("=" * 50)
+    print(f"[*] {stats.rows} rows in {elapsed:.2f}s ({stats.rows / max(elapsed, 1e-9):,.0f} rows/s)")
+    print("=" * 50)
+    summary = stats.to_dict()
+    for section in ("categories", "collections"):
+        print(f"\n[>] {section}")
+        for name, count in summary[section].items():
+            print(f"  {name:30} {count:>8}")
+    print(f"\n[>] reused pieces: {stats.reused} ({reuse_label(stats.reused)})")
+    if stats.skipped:
+        print(f"[!] {stats.skipped} rows without status or with a bad quantity")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    jobs, changed = apply_stats(load_manifest(args.manifest), stats)
+    if not changed:
+        print("\n[OK] Manifest numbers are up to date")
+        return
+    print(f"\n[+] {len(changed)} banners changed: {', '.join(changed)}")
+    if args.write or args.render:
+        save_manifest(jobs, args.manifest)
+        print(f"[OK] Updated {args.manifest}")
+    if args.render:
+        from batch_executor import print_report, run_batch
+
+        print_report(run_batch([j for j in jobs if j["params"]["filename"] in changed], args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Change detection for Apega Desapega banners
+Compares fresh renders with the previous build and keeps the old bytes
+and mtime when a banner differs only by antialiasing noise, so downstream
+copies, CDN uploads and app bundles do not churn
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Configuration
+OUTPUT_DIR = Path(__file__).parent / "output"
+BASELINE_DIR = Path(__file__).parent / ".cache" / "previous"
+
+# Renders are the same if no channel of any pixel moves more than
+# PIXEL_TOLERANCE (antialiasing/GPU noise). Anything larger, even on a few
+# pixels, is a real edit: a price digit or one letter of text.
+PIXEL_TOLERANCE = 2
+
+
+def file_hash(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_pixels(path) -> np.ndarray:
+    with Image.open(path) as img:
+        return np.asarray(img.convert("RGBA"))
+
+
+def compare(new_path, old_path) -> str:
+    """Classify a render against its previous version
+
+    Returns one of: new, identical-bytes, identical-pixels,
+    visually-identical, changed.
+    """
+
+    if not Path(old_path).exists():
+        return "new"
+    if file_hash(new_path) == file_hash(old_path):
+        return "identical-bytes"
+
+    new, old = load_pixels(new_path), load_pixels(old_path)
+    if new.shape != old.shape:
+        return "changed"
+    if np.array_equal(new, old):
+        return "identical-pixels"
+    if np.abs(new.astype(np.int16) - old.astype(np.int16)).max() > PIXEL_TOLERANCE:
+        return "changed"
+    return "visually-identical"
+
+
+def restore(old_path, new_path):
+    """Put the previous bytes and mtime back in place of a fresh render"""
+
+    new_path = Path(new_path)
+    tmp = new_path.with_name(f".{new_path.name}.prev")
+    shutil.copy2(old_path, tmp)
+    os.replace(tmp, new_path)
+
+
+def snapshot(output_dir=OUTPUT_DIR, baseline_dir=BASELINE_DIR) -> int:
+    """Copy the current outputs aside as the baseline for the next run"""
+
+    baseline_dir = Path(baseline_dir)
+    baseline_dir.mkdir(parents=True, exist_ok=True)
+    count = 0
+    for path in Path(output_dir).glob("*.png"):
+        # Replace rather than overwrite: the old baseline may share an inode
+        # with a blob store entry
+        tmp = baseline_dir / f".{path.name}.tmp"
+        shutil.copy2(path, tmp)
+        os.replace(tmp, baseline_dir / path.name)
+        count += 1
+    return count
+
+
+def settle(path, baseline_dir=BASELINE_DIR) -> str:
+    """Compare one output with the baseline, restoring it if unchanged"""
+
+    path = Path(path)
+    old = Path(baseline_dir) / path.name
+    verdict = compare(path, old)
+    if verdict not in ("new", "changed"):
+        restore(old, path)
+    return verdict
+
+
+def change_stage(baseline_dir=BASELINE_DIR):
+    """Pipeline stage that drops banners which did not change"""
+
+    def detect(job: dict):
+        verdict = settle(job["path"], baseline_dir)
+        if verdict in ("new", "changed"):
+            return {**job, "change": verdict}
+        return None
+
+    return detect
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Skip banners that did not change")
+    parser.add_argument("command", choices=["snapshot", "settle"])
+    parser.add_argument("--output-dir", default=str(OUTPUT_DIR))
+    parser.add_argument("--baseline-dir", default=str(BASELINE_DIR))
+    args = parser.parse_args()
+
+    if args.command == "snapshot":
+        count = snapshot(args.output_dir, args.baseline_dir)
+        print(f"[+] Saved {count} banners as baseline")
+        return
+
+    counts = {}
+    for path in sorted(Path(args.output_dir).glob("*.png")):
+        verdict = settle(path, args.baseline_dir)
+        counts[verdict] = counts.get(verdict, 0) + 1
+        if verdict in ("new", "changed"):
+            print(f"[+] {verdict:8} {path.name}")
+    print(f"[>] {counts}")
+
+
+if __name__ == "__main__":
+    main()
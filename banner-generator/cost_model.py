@@ -0,0 +1,113 @@
+"""
+Render cost model for Apega Desapega banners
+Predicts how long a job takes from historical timings and template features
+"""
+
+import json
+import os
+from pathlib import Path
+
+import template_registry
+from scheduler import viewport_of
+
+# Configuration
+CACHE_DIR = Path(__file__).parent / ".cache"
+TIMINGS_PATH = CACHE_DIR / "render_timings.json"
+
+# Weight given to the newest timing in the moving average
+SMOOTHING = 0.3
+
+# Prior used before any timing exists: base + per-megapixel + per-effect + per-remote-image
+PRIOR_BASE = 1.0
+PRIOR_PER_MEGAPIXEL = 2.0
+PRIOR_PER_EFFECT = 0.05
+PRIOR_PER_REMOTE = 0.8
+
+
+def effect_count(template: str) -> int:
+    """Paint-heavy CSS effects declared for a template in the registry"""
+
+    return template_registry.spec(template)["effects"]
+
+
+def remote_assets(job: dict) -> int:
+    """Number of remote images a job pulls in"""
+
+    params = job["params"]
+    return sum(
+        1 for name in template_registry.remote_params(job["template"])
+        if str(params.get(name) or "").startswith(("http://", "https://"))
+    )
+
+
+def features(job: dict) -> dict:
+    """Pixel area, effect count and remote asset count of a job"""
+
+    width, height = viewport_of(job)
+    return {
+        "megapixels": width * height / 1e6,
+        "effects": effect_count(job["template"]),
+        "remote": remote_assets(job),
+    }
+
+
+def history_key(job: dict) -> str:
+    """Timings are kept per template, split by whether remote images load"""
+
+    return job["template"] + ("+remote" if remote_assets(job) else "")
+
+
+class CostModel:
+    """Per-template moving average of render seconds with a feature prior"""
+
+    def __init__(self, path=TIMINGS_PATH):
+        self.path = Path(path)
+        self.timings = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                self.timings = json.load(f)
+
+    def prior(self, job: dict) -> float:
+        """Feature-based estimate in seconds, before calibration"""
+
+        f = features(job)
+        return (
+            PRIOR_BASE
+            + PRIOR_PER_MEGAPIXEL * f["megapixels"]
+            + PRIOR_PER_EFFECT * f["effects"]
+            + PRIOR_PER_REMOTE * f["remote"]
+        )
+
+    def calibration(self) -> float:
+        """Ratio of observed to prior seconds across known templates"""
+
+        ratios = [entry["mean"] / entry["prior"] for entry in self.timings.values() if entry["prior"]]
+        return sum(ratios) / len(ratios) if ratios else 1.0
+
+    def predict(self, job: dict) -> float:
+        """Expected render seconds for a job"""
+
+        entry = self.timings.get(history_key(job))
+        if entry:
+            return entry["mean"]
+        return self.prior(job) * self.calibration()
+
+    def record(self, job: dict, seconds: float):
+        """Fold an observed render time into the model"""
+
+        key = history_key(job)
+        entry = self.timings.get(key)
+        if entry is None:
+            self.timings[key] = {"mean": seconds, "n": 1, "prior": self.prior(job)}
+        else:
+            entry["mean"] += SMOOTHING * (seconds - entry["mean"])
+            entry["n"] += 1
+
+    def save(self):
+        """Persist timings atomically"""
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.timings, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
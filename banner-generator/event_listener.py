@@ -0,0 +1,291 @@
+"""
+Event-driven banner regeneration for Apega Desapega
+Listens for product price and promo change events (webhook or spool
+directory), debounces bursts per product and re-renders only the
+showcase/promo banners they affect
+"""
+
+import argparse
+import heapq
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from banner_generator import format_brl
+from render_queue import PRIORITY_INTERACTIVE, RenderQueue
+
+# Configuration
+CACHE_DIR = Path(__file__).parent / ".cache"
+SPOOL_DIR = CACHE_DIR / "events"
+STATE_PATH = CACHE_DIR / "event_state.json"
+QUIET_SECONDS = 1.0
+MAX_WAIT_SECONDS = 5.0
+TARGET_LATENCY = 10.0
+
+
+def showcase_job(product_id: str, product: dict) -> dict:
+    """generate_product_showcase job for a product's current state"""
+
+    price = float(product["price"])
+    original = float(product.get("original_price") or price)
+    discount = round(100 * (1 - price / original)) if original > price else 0
+    return {
+        "template": "generate_product_showcase",
+        "params": {
+            "product_name": product.get("title", ""),
+            "brand": str(product.get("brand", "")).upper(),
+            "original_price": format_brl(original),
+            "sale_price": format_brl(price),
+            "discount_percent": f"{discount}%",
+            "image_url": product.get("image_url"),
+            "filename": f"product_showcase_{product_id}.png",
+        },
+    }
+
+
+def promo_job(promo_id: str, promo: dict) -> dict:
+    """generate_promo_banner job for a promotion's current state"""
+
+    params = {
+        key: promo[key]
+        for key in ("discount", "title", "subtitle", "badge_text", "bg_color", "accent_color")
+        if key in promo
+    }
+    params["filename"] = f"promo_{promo_id}.png"
+    return {"template": "generate_promo_banner", "params": params}
+
+
+JOB_BUILDERS = {"product": showcase_job, "promo": promo_job}
+
+
+def validate_event(event) -> dict:
+    """Raise ValueError unless event has a string type, an id and object fields"""
+
+    if not isinstance(event, dict):
+        raise ValueError(f"event must be an object, got {type(event).__name__}")
+    if not isinstance(event.get("type"), str):
+        raise ValueError("event type must be a string")
+    if event.get("id") is None:
+        raise ValueError("event id is required")
+    if not isinstance(event.get("fields", {}), dict):
+        raise ValueError("event fields must be an object")
+    return event
+
+
+class Debouncer:
+    """Coalesces events per key and fires once a key has been quiet
+
+    A key fires QUIET_SECONDS after its last event, but never later than
+    MAX_WAIT_SECONDS after its first, so a steady stream still renders.
+    """
+
+    def __init__(self, fire, quiet: float = QUIET_SECONDS, max_wait: float = MAX_WAIT_SECONDS):
+        self.fire = fire
+        self.quiet = quiet
+        self.max_wait = max_wait
+        self.pending = {}
+        self.heap = []
+        self.cond = threading.Condition()
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name="debouncer", daemon=True)
+        self.thread.start()
+
+    def add(self, key, fields: dict):
+        now = time.monotonic()
+        with self.cond:
+            entry = self.pending.setdefault(key, {"first": now, "fields": {}, "events": 0})
+            entry["fields"].update(fields)
+            entry["events"] += 1
+            entry["due"] = min(now + self.quiet, entry["first"] + self.max_wait)
+            heapq.heappush(self.heap, (entry["due"], id(entry), key))
+            self.cond.notify()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            for entry in self.pending.values():
+                entry["due"] = 0
+            self.cond.notify()
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while True:
+                    if self.closed and not self.pending:
+                        return
+                    if self.heap:
+                        due, _, key = self.heap[0]
+                        entry = self.pending.get(key)
+                        # Heap slots go stale when a later event moves the deadline
+                        if entry is None or entry["due"] != due and not self.closed:
+                            heapq.heappop(self.heap)
+                            continue
+                        wait = due - time.monotonic()
+                        if wait <= 0 or self.closed:
+                            heapq.heappop(self.heap)
+                            del self.pending[key]
+                            break
+                        self.cond.wait(wait)
+                    else:
+                        self.cond.wait()
+            try:
+                self.fire(key, entry)
+            except Exception as exc:
+                # A failing key must not stop the thread that fires all the others
+                print(f"[!] {key}: event handling failed: {exc!r}")
+
+
+class BannerListener:
+    """Applies change events to known state and re-renders affected banners"""
+
+    def __init__(self, queue: RenderQueue, quiet: float = QUIET_SECONDS,
+                 max_wait: float = MAX_WAIT_SECONDS, target: float = TARGET_LATENCY,
+                 state_path=STATE_PATH):
+        self.queue = queue
+        self.target = target
+        self.state_path = Path(state_path)
+        self.state = {"product": {}, "promo": {}}
+        if self.state_path.exists():
+            with open(self.state_path, encoding="utf-8") as f:
+                self.state.update(json.load(f))
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.debouncer = Debouncer(self._fire, quiet, max_wait)
+
+    def handle(self, event: dict):
+        """Accept {"type": "product.updated"|"promo.updated", "id": ..., "fields": {...}}"""
+
+        kind = validate_event(event)["type"].split(".", 1)[0]
+        if kind not in JOB_BUILDERS:
+            return
+        self.debouncer.add((kind, str(event["id"])), event.get("fields", {}))
+
+    def _fire(self, key, entry):
+        kind, item_id = key
+        with self.lock:
+            current = self.state[kind].setdefault(item_id, {})
+            current.update(entry["fields"])
+            snapshot = dict(current)
+            self._save_state()
+
+        try:
+            job = JOB_BUILDERS[kind](item_id, snapshot)
+        except (KeyError, TypeError, ValueError, ZeroDivisionError) as exc:
+            print(f"[!] {kind} {item_id}: not enough data to render ({exc!r})")
+            return
+
+        future = self.queue.submit(job["template"], PRIORITY_INTERACTIVE, **job["params"])
+        future.add_done_callback(lambda f: self._done(key, entry, f))
+
+    def _done(self, key, entry, future):
+        latency = time.monotonic() - entry["first"]
+        if future.exception():
+            print(f"[!] {key[0]} {key[1]}: render failed: {future.exception()}")
+            return
+        with self.lock:
+            self.latencies.append(latency)
+        flag = "" if latency <= self.target else f"  (over {self.target:.0f}s target)"
+        print(f"[+] {key[0]} {key[1]}: {entry['events']} events -> 1 render in {latency:.2f}s{flag}")
+
+    def _save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.state_path)
+
+    def close(self):
+        self.debouncer.close()
+
+
+def poll_spool(listener: BannerListener, spool_dir=SPOOL_DIR, interval: float = 0.2, stop=None):
+    """Consume *.json event files dropped (atomically) into a spool directory"""
+
+    spool_dir = Path(spool_dir)
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        for path in sorted(spool_dir.glob("*.json")):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    payload = json.load(f)
+            except (OSError, ValueError) as exc:
+                print(f"[!] Bad event file {path.name}: {exc}")
+            else:
+                for event in payload if isinstance(payload, list) else [payload]:
+                    try:
+                        listener.handle(event)
+                    except ValueError as exc:
+                        print(f"[!] Bad event in {path.name}: {exc}")
+            path.unlink(missing_ok=True)
+        stop.wait(interval)
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    """POST /events with one event object or a list of them"""
+
+    def do_POST(self):
+        if self.path != "/events":
+            self.send_error(404)
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            events = payload if isinstance(payload, list) else [payload]
+            # Reject the whole batch before applying any of it
+            for event in events:
+                validate_event(event)
+            for event in events:
+                self.server.listener.handle(event)
+        except (ValueError, KeyError) as exc:
+            self.send_error(400, str(exc))
+            return
+        self.send_response(202)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_webhook(listener: BannerListener, host: str = "127.0.0.1", port: int = 8767) -> ThreadingHTTPServer:
+    """Webhook endpoint feeding the listener; call serve_forever() on it"""
+
+    server = ThreadingHTTPServer((host, port), _WebhookHandler)
+    server.listener = listener
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-render banners on price and promo changes")
+    parser.add_argument("--port", type=int, default=8767, help="webhook port (0 to disable)")
+    parser.add_argument("--spool", default=str(SPOOL_DIR), help="event spool directory")
+    parser.add_argument("--quiet", type=float, default=QUIET_SECONDS)
+    parser.add_argument("--max-wait", type=float, default=MAX_WAIT_SECONDS)
+    parser.add_argument("--target", type=float, default=TARGET_LATENCY)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    queue = RenderQueue(workers=args.workers)
+    listener = BannerListener(queue, args.quiet, args.max_wait, args.target)
+
+    if args.port:
+        server = serve_webhook(listener, port=args.port)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"[+] Webhook on http://127.0.0.1:{args.port}/events")
+    print(f"[+] Watching spool {args.spool}")
+
+    try:
+        poll_spool(listener, args.spool)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
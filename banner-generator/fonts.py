@@ -0,0 +1,106 @@
+"""
+Font loading for in-process Apega Desapega rendering
+Maps the CSS font families used by the templates to TrueType files in
+assets/fonts, with one cached FreeType face per family, weight and size and
+glyph-advance tables cached on disk for measuring text without rendering
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+from pathlib import Path
+
+from PIL import ImageFont
+
+# Configuration
+FONTS_DIR = Path(__file__).parent / "assets" / "fonts"
+METRICS_PATH = Path(__file__).parent / ".cache" / "font_metrics.json"
+FONT_FILES = {
+    ("Inter", 400, False): "Inter-Regular.ttf",
+    ("Inter", 500, False): "Inter-Medium.ttf",
+    ("Inter", 600, False): "Inter-SemiBold.ttf",
+    ("Inter", 700, False): "Inter-Bold.ttf",
+    ("Inter", 800, False): "Inter-ExtraBold.ttf",
+    ("Playfair Display", 400, False): "PlayfairDisplay-Regular.ttf",
+    ("Playfair Display", 600, False): "PlayfairDisplay-SemiBold.ttf",
+    ("Playfair Display", 700, False): "PlayfairDisplay-Bold.ttf",
+    ("Playfair Display", 400, True): "PlayfairDisplay-Italic.ttf",
+    ("Playfair Display", 700, True): "PlayfairDisplay-BoldItalic.ttf",
+}
+
+_warned = set()
+_metrics = None
+_metrics_lock = threading.Lock()
+_metrics_dirty = False
+
+
+def font_path(family: str, weight: int = 400, italic: bool = False):
+    """TrueType file for a family/weight/style, nearest match if exact is missing"""
+
+    candidates = sorted(
+        (it != italic, abs(w - weight), name)
+        for (fam, w, it), name in FONT_FILES.items() if fam == family
+    )
+    for *_, name in candidates:
+        path = FONTS_DIR / name
+        if path.exists():
+            return path
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def load_font(family: str, weight: int = 400, size: int = 16, italic: bool = False):
+    """Cached FreeType font; falls back to Pillow's bundled face when missing"""
+
+    path = font_path(family, weight, italic)
+    if path is not None:
+        return ImageFont.truetype(str(path), size)
+    if family not in _warned:
+        _warned.add(family)
+        print(f"[!] No font files for {family} in {FONTS_DIR}, using Pillow default")
+    return ImageFont.load_default(size)
+
+
+def _metrics_table(family: str, weight: int, size: int, italic: bool) -> dict:
+    global _metrics
+    if _metrics is None:
+        _metrics = {}
+        if METRICS_PATH.exists():
+            with open(METRICS_PATH, encoding="utf-8") as f:
+                _metrics = json.load(f)
+    path = font_path(family, weight, italic)
+    key = f"{path.name if path else 'default'}|{size}"
+    return _metrics.setdefault(key, {})
+
+
+def advances(text: str, family: str, weight: int = 400, size: int = 16, italic: bool = False) -> list:
+    """Advance width of every character, from the cached per-font/size table"""
+
+    global _metrics_dirty
+    with _metrics_lock:
+        table = _metrics_table(family, weight, size, italic)
+        missing = set(text) - table.keys()
+        if missing:
+            font = load_font(family, weight, size, italic)
+            for ch in missing:
+                table[ch] = font.getlength(ch)
+            _metrics_dirty = True
+        return [table[ch] for ch in text]
+
+
+@atexit.register
+def save_metrics():
+    """Persist advance tables measured in this process"""
+
+    global _metrics_dirty
+    with _metrics_lock:
+        if not _metrics_dirty:
+            return
+        METRICS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = METRICS_PATH.with_name(f".{METRICS_PATH.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_metrics, f, ensure_ascii=False)
+        os.replace(tmp, METRICS_PATH)
+        _metrics_dirty = False
@@ -0,0 +1,291 @@
+"""
+Shared-memory frame ring for Apega Desapega banners
+Hands raw RGBA screenshots from render processes to post-processing
+processes through reusable shared memory slots instead of pickling them
+"""
+
+import multiprocessing
+import os
+from multiprocessing import connection, shared_memory
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Largest template viewport is 800x500 RGBA
+SLOT_BYTES = 800 * 500 * 4
+SLOTS = 4
+# How often the parent checks worker liveness while waiting for results
+RESULT_POLL = 1.0
+
+
+class FrameRing:
+    """Fixed pool of frame slots in one shared memory block
+
+    Producers block in put_image() until a consumer releases a slot, so at
+    most `slots` frames are ever in flight and memory stays bounded.
+    """
+
+    def __init__(self, slots: int = SLOTS, slot_bytes: int = SLOT_BYTES, ctx=None, _attach=None):
+        if _attach is not None:
+            name, self.slots, self.slot_bytes, self.free, self.ready = _attach
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+            return
+
+        ctx = ctx or multiprocessing.get_context()
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        self.owner = True
+        # SimpleQueue writes synchronously: a frame is in the pipe before
+        # put_image() returns, even if the producer dies right after
+        self.free = ctx.SimpleQueue()
+        self.ready = ctx.SimpleQueue()
+        for slot in range(slots):
+            self.free.put(slot)
+
+    def spec(self) -> tuple:
+        """Picklable handle for attaching from another process"""
+
+        return (self.shm.name, self.slots, self.slot_bytes, self.free, self.ready)
+
+    @classmethod
+    def attach(cls, spec: tuple) -> "FrameRing":
+        return cls(_attach=spec)
+
+    def view(self, slot: int, width: int, height: int) -> np.ndarray:
+        """HxWx4 uint8 array backed directly by a slot"""
+
+        return np.ndarray(
+            (height, width, 4), dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.slot_bytes
+        )
+
+    def reserve(self) -> int:
+        """Take a free slot, blocking until a consumer releases one"""
+
+        return self.free.get()
+
+    def write(self, slot: int, img: Image.Image) -> tuple:
+        """Copy a decoded screenshot into a reserved slot; returns its size"""
+
+        img = img.convert("RGBA")
+        width, height = img.size
+        if width * height * 4 > self.slot_bytes:
+            raise ValueError(f"{width}x{height} frame does not fit a {self.slot_bytes} byte slot")
+        self.view(slot, width, height)[...] = np.asarray(img)
+        return width, height
+
+    def publish(self, slot: int, width: int, height: int, meta: dict):
+        """Hand a written slot to the consumers"""
+
+        self.ready.put((slot, width, height, meta))
+
+    def put_image(self, img: Image.Image, meta: dict):
+        """Copy a decoded screenshot into a free slot and publish it"""
+
+        slot = self.reserve()
+        try:
+            width, height = self.write(slot, img)
+        except BaseException:
+            self.release(slot)
+            raise
+        self.publish(slot, width, height, meta)
+
+    def get(self):
+        """Next published frame as (slot, width, height, meta), or None at end"""
+
+        return self.ready.get()
+
+    def image(self, slot: int, width: int, height: int) -> Image.Image:
+        """Zero-copy Pillow image over a slot; invalid once the slot is released"""
+
+        start = slot * self.slot_bytes
+        buf = self.shm.buf[start:start + width * height * 4]
+        return Image.frombuffer("RGBA", (width, height), buf, "raw", "RGBA", 0, 1)
+
+    def release(self, slot: int):
+        """Return a slot to the pool for reuse"""
+
+        self.free.put(slot)
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def save_optimized(img: Image.Image, path: Path):
+    """Default post-processing: lossless optimized PNG written atomically"""
+
+    tmp = path.with_name(f".{path.name}.tmp")
+    img.save(tmp, format="PNG", optimize=True)
+    os.replace(tmp, path)
+
+
+# Job states in the shared progress array
+QUEUED, RENDERING, FRAMED, POSTING = 0, 1, 2, 3
+
+
+def _render_worker(spec, tasks, results, worker, current, states, holding):
+    from render_queue import render_template
+
+    ring = FrameRing.attach(spec)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+            index, job = task
+            # Shared memory, not a queue: survives the process dying right after
+            current[worker], states[index] = index, RENDERING
+            params = dict(job["params"])
+            filename = params["filename"]
+            params["filename"] = f".shm-{os.getpid()}-{filename}"
+            try:
+                temp_path = Path(render_template(job["template"], params))
+                with Image.open(temp_path) as img:
+                    img.load()
+                temp_path.unlink(missing_ok=True)
+                slot = ring.reserve()
+                holding[worker] = slot
+                width, height = ring.write(slot, img)
+            except Exception as exc:
+                if holding[worker] >= 0:
+                    ring.release(holding[worker])
+                    holding[worker] = -1
+                results.send((index, "error", repr(exc)))
+                continue
+            # FRAMED hands reporting to the post worker: if this process dies
+            # from here on, the parent waits for the frame instead of failing it
+            states[index] = FRAMED
+            ring.publish(slot, width, height, {"index": index, "path": str(temp_path.with_name(filename))})
+            holding[worker], current[worker] = -1, -1
+    finally:
+        ring.close()
+
+
+def _post_worker(spec, post_process, results, worker, current, states, holding):
+    ring = FrameRing.attach(spec)
+    try:
+        while True:
+            frame = ring.get()
+            if frame is None:
+                return
+            slot, width, height, meta = frame
+            index = meta["index"]
+            current[worker], states[index], holding[worker] = index, POSTING, slot
+            try:
+                img = ring.image(slot, width, height)
+                post_process(img, Path(meta["path"]))
+                del img
+                results.send((index, "ok", meta["path"]))
+            except Exception as exc:
+                results.send((index, "error", repr(exc)))
+            finally:
+                holding[worker] = -1
+                ring.release(slot)
+    finally:
+        ring.close()
+
+
+def run_batch(jobs: list, render_procs: int = 2, post_procs: int = 2, slots: int = SLOTS,
+              post_process=save_optimized) -> dict:
+    """Render in some processes and post-process in others via the ring
+
+    Every job is reported exactly once: by the worker that finished it, or
+    as failed here when the process holding it dies. A render worker that
+    dies while publishing a frame leaves it FRAMED; it is failed only once
+    no post worker has picked it up after the ring has drained twice.
+    """
+
+    ctx = multiprocessing.get_context()
+    ring = FrameRing(slots=slots, ctx=ctx)
+    tasks = ctx.Queue()
+    # One pipe per worker: a process killed mid-send cannot wedge the others
+    pipes = [ctx.Pipe(duplex=False) for _ in range(render_procs + post_procs)]
+    current = ctx.Array("i", [-1] * (render_procs + post_procs), lock=False)
+    states = ctx.Array("b", [QUEUED] * len(jobs), lock=False)
+    holding = ctx.Array("i", [-1] * (render_procs + post_procs), lock=False)
+    for index, job in enumerate(jobs):
+        tasks.put((index, job))
+    for _ in range(render_procs):
+        tasks.put(None)
+
+    renderers = [ctx.Process(target=_render_worker,
+                             args=(ring.spec(), tasks, pipes[w][1], w, current, states, holding))
+                 for w in range(render_procs)]
+    posts = [ctx.Process(target=_post_worker,
+                         args=(ring.spec(), post_process, pipes[render_procs + w][1], render_procs + w,
+                               current, states, holding))
+             for w in range(post_procs)]
+    outputs, errors = [], []
+    pending = set(range(len(jobs)))
+    reaped = set()
+    # Frames whose render worker died around publishing: index -> (worker, ring seen empty)
+    orphans = {}
+
+    def finish(index, status, detail):
+        if index not in pending:
+            return
+        pending.discard(index)
+        if status == "ok":
+            outputs.append(detail)
+        else:
+            errors.append((jobs[index]["params"]["filename"], detail))
+
+    try:
+        for proc in renderers + posts:
+            proc.start()
+        for _, sender in pipes:
+            sender.close()
+        readers = [receiver for receiver, _ in pipes]
+        while pending:
+            ready = connection.wait(readers, timeout=RESULT_POLL)
+            for receiver in ready:
+                try:
+                    finish(*receiver.recv())
+                except EOFError:
+                    readers.remove(receiver)
+            if ready:
+                continue
+            for worker, proc in enumerate(renderers + posts):
+                if proc.exitcode not in (None, 0) and worker not in reaped:
+                    reaped.add(worker)
+                    index = current[worker]
+                    if index >= 0 and states[index] == FRAMED:
+                        orphans[index] = (worker, False)
+                        continue
+                    if index >= 0:
+                        finish(index, "error", f"worker exited with code {proc.exitcode}")
+                    if holding[worker] >= 0:
+                        ring.release(holding[worker])
+            for index, (worker, seen_empty) in list(orphans.items()):
+                if index not in pending or states[index] != FRAMED:
+                    # A post worker took the frame; it reports the job
+                    del orphans[index]
+                elif ring.ready.empty():
+                    if not seen_empty:
+                        orphans[index] = (worker, True)
+                        continue
+                    # Never published: nothing else will report it
+                    del orphans[index]
+                    finish(index, "error", "render worker died before publishing its frame")
+                    if holding[worker] >= 0:
+                        ring.release(holding[worker])
+            if not any(proc.is_alive() for proc in renderers):
+                for index in [i for i in pending if states[i] == QUEUED]:
+                    finish(index, "error", "no render worker left")
+            if not any(proc.is_alive() for proc in posts):
+                for index in sorted(pending):
+                    finish(index, "error", "no post-processing worker left")
+        for _ in range(post_procs):
+            ring.ready.put(None)
+        for proc in renderers + posts:
+            proc.join(timeout=30)
+            if proc.is_alive():
+                proc.terminate()
+    finally:
+        ring.close()
+
+    return {"outputs": outputs, "errors": errors}
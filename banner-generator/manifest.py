@@ -0,0 +1,27 @@
+"""
+Batch manifest for Apega Desapega banners
+Declarative list of template + params jobs shared by the batch tools
+"""
+
+import json
+import os
+from pathlib import Path
+
+MANIFEST_PATH = Path(__file__).parent / "manifest.json"
+
+
+def load_manifest(path=MANIFEST_PATH) -> list:
+    """Load the job list from a manifest file"""
+
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["jobs"]
+
+
+def save_manifest(jobs: list, path=MANIFEST_PATH):
+    """Replace a manifest file atomically with a new job list"""
+
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"jobs": jobs}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
@@ -0,0 +1,212 @@
+"""
+Mobile asset export for Apega Desapega banners
+Copies chosen outputs into apega-mobile/assets with content-hashed names,
+optionally packs small cards into a sprite atlas, and writes a TypeScript
+manifest the app can require() from
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import re
+import unicodedata
+from pathlib import Path
+
+from PIL import Image
+
+# Configuration
+OUTPUT_DIR = Path(__file__).parent / "output"
+MOBILE_DIR = Path(__file__).parent.parent / "apega-mobile"
+EXPORT_DIR = MOBILE_DIR / "assets" / "bundle"
+MANIFEST_TS = MOBILE_DIR / "src" / "generated" / "bannerAssets.ts"
+
+# Small cards worth packing into one atlas
+ATLAS_PREFIXES = ("category_", "brand_", "feature_")
+ATLAS_MAX_WIDTH = 2048
+ATLAS_PADDING = 2
+
+HASH_LENGTH = 10
+_HASHED = re.compile(rf"\.[0-9a-f]{{{HASH_LENGTH}}}\.png$")
+
+
+def asset_key(filename: str) -> str:
+    """ASCII identifier for an output, e.g. category_acessórios.png -> category_acessorios
+
+    Keys are bare TypeScript property names, so one starting with a digit
+    (or left empty) gets a leading underscore: 2x1_promo.png -> _2x1_promo.
+    """
+
+    stem = Path(filename).stem
+    ascii_stem = unicodedata.normalize("NFKD", stem).encode("ascii", "ignore").decode()
+    key = re.sub(r"[^0-9a-zA-Z_]", "_", ascii_stem).lower()
+    if not key or key[0].isdigit():
+        key = f"_{key}"
+    return key
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def write_hashed(data: bytes, key: str, export_dir: Path) -> str:
+    """Write bytes as <key>.<hash>.png unless already present; returns the name"""
+
+    name = f"{key}.{content_hash(data)}.png"
+    dest = export_dir / name
+    if not dest.exists():
+        tmp = dest.with_name(f".{name}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, dest)
+    return name
+
+
+def pack_atlas(images: dict, max_width: int = ATLAS_MAX_WIDTH, padding: int = ATLAS_PADDING):
+    """Shelf-pack images into one sheet
+
+    Returns (atlas image, {key: (x, y, w, h)}). Images are placed tallest
+    first, left to right, starting a new shelf when a row is full.
+    """
+
+    order = sorted(images, key=lambda k: (-images[k].height, -images[k].width, k))
+    frames = {}
+    x = y = shelf = width = 0
+    for key in order:
+        w, h = images[key].size
+        if x and x + w > max_width:
+            x, y, shelf = 0, y + shelf + padding, 0
+        frames[key] = (x, y, w, h)
+        x += w + padding
+        shelf = max(shelf, h)
+        width = max(width, x - padding)
+
+    atlas = Image.new("RGBA", (max(width, 1), max(y + shelf, 1)), (0, 0, 0, 0))
+    for key, (fx, fy, _, _) in frames.items():
+        atlas.paste(images[key].convert("RGBA"), (fx, fy))
+    return atlas, frames
+
+
+def _require(export_dir: Path, name: str, manifest_dir: Path) -> str:
+    rel = os.path.relpath(export_dir / name, manifest_dir).replace(os.sep, "/")
+    return f"require('{rel}')"
+
+
+def render_manifest(assets: dict, atlas_name: str, atlas_size: tuple, frames: dict,
+                    export_dir: Path, manifest_dir: Path) -> str:
+    """TypeScript module exposing every exported asset"""
+
+    lines = [
+        "// Generated by banner-generator/mobile_export.py - do not edit by hand.",
+        "import { ImageSourcePropType } from 'react-native';",
+        "",
+        "export interface BannerAsset {",
+        "  source: ImageSourcePropType;",
+        "  width: number;",
+        "  height: number;",
+        "}",
+        "",
+        "export interface AtlasFrame {",
+        "  x: number;",
+        "  y: number;",
+        "  width: number;",
+        "  height: number;",
+        "}",
+        "",
+        "export const bannerAssets: Record<string, BannerAsset> = {",
+    ]
+    for key in sorted(assets):
+        name, (w, h) = assets[key]
+        lines.append(f"  {key}: {{ source: {_require(export_dir, name, manifest_dir)}, width: {w}, height: {h} }},")
+    lines.append("};")
+    lines.append("")
+
+    if atlas_name:
+        lines.append("export const bannerAtlas: BannerAsset = {")
+        lines.append(f"  source: {_require(export_dir, atlas_name, manifest_dir)},")
+        lines.append(f"  width: {atlas_size[0]},")
+        lines.append(f"  height: {atlas_size[1]},")
+        lines.append("};")
+    else:
+        lines.append("export const bannerAtlas: BannerAsset | null = null;")
+    lines.append("")
+    lines.append("export const atlasFrames: Record<string, AtlasFrame> = {")
+    for key in sorted(frames):
+        x, y, w, h = frames[key]
+        lines.append(f"  {key}: {{ x: {x}, y: {y}, width: {w}, height: {h} }},")
+    lines.append("};")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def export(
+    filenames: list = None,
+    output_dir=OUTPUT_DIR,
+    export_dir=EXPORT_DIR,
+    manifest_path=MANIFEST_TS,
+    atlas: bool = False,
+) -> dict:
+    """Export outputs to the app and regenerate the TypeScript manifest"""
+
+    output_dir, export_dir, manifest_path = Path(output_dir), Path(export_dir), Path(manifest_path)
+    export_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if filenames is None:
+        filenames = sorted(p.name for p in output_dir.glob("*.png") if not p.name.startswith("."))
+
+    keys = {}
+    for filename in filenames:
+        key = asset_key(filename)
+        if key in keys:
+            raise ValueError(f"{keys[key]} and {filename} both map to asset key '{key}'; rename one of them")
+        keys[key] = filename
+
+    assets, small = {}, {}
+    for key, filename in keys.items():
+        path = output_dir / filename
+        if atlas and filename.startswith(ATLAS_PREFIXES):
+            small[key] = Image.open(path)
+            continue
+        with Image.open(path) as img:
+            size = img.size
+        assets[key] = (write_hashed(path.read_bytes(), key, export_dir), size)
+
+    atlas_name, atlas_size, frames = None, (0, 0), {}
+    if small:
+        sheet, frames = pack_atlas(small)
+        buf = io.BytesIO()
+        sheet.save(buf, format="PNG", optimize=True)
+        atlas_name, atlas_size = write_hashed(buf.getvalue(), "atlas", export_dir), sheet.size
+        for img in small.values():
+            img.close()
+
+    # Drop hashed files from earlier exports that nothing references now
+    keep = {name for name, _ in assets.values()} | {atlas_name}
+    for stale in export_dir.glob("*.png"):
+        if _HASHED.search(stale.name) and stale.name not in keep:
+            stale.unlink()
+
+    source = render_manifest(assets, atlas_name, atlas_size, frames, export_dir, manifest_path.parent)
+    tmp = manifest_path.with_name(f".{manifest_path.name}.tmp")
+    tmp.write_text(source, encoding="utf-8")
+    os.replace(tmp, manifest_path)
+
+    return {"files": len(assets) + (1 if atlas_name else 0), "atlas_frames": len(frames)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export banners into the mobile app")
+    parser.add_argument("files", nargs="*", help="output filenames (default: all)")
+    parser.add_argument("--atlas", action="store_true", help="pack category/brand/feature cards into an atlas")
+    parser.add_argument("--output-dir", default=str(OUTPUT_DIR))
+    parser.add_argument("--export-dir", default=str(EXPORT_DIR))
+    parser.add_argument("--manifest", default=str(MANIFEST_TS))
+    args = parser.parse_args()
+
+    stats = export(args.files or None, args.output_dir, args.export_dir, args.manifest, args.atlas)
+    print(f"[+] Exported {stats['files']} files ({stats['atlas_frames']} cards in atlas)")
+    print(f"[>] Manifest: {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+Dominant colors for Apega Desapega banners
+Extracts palettes from product and avatar images in batches (downsampled,
+k-means over many images at once in NumPy), caches them per image hash and
+snaps them to brand tones to drive showcase and seller gradients
+"""
+
+import argparse
+import glob
+import hashlib
+import io
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from banner_generator import COLORS
+from manifest import MANIFEST_PATH, load_manifest, save_manifest
+
+# Configuration
+CACHE_PATH = Path(__file__).parent / ".cache" / "palettes.json"
+THUMB_SIZE = 32
+CLUSTERS = 5
+ITERATIONS = 8
+BATCH_SIZE = 256
+# Near-white/near-black, low-chroma pixels are usually studio backgrounds;
+# they still count but are not picked as the dominant tone when others exist
+MIN_CHROMA = 12.0
+# Brand tones a palette may snap to (text, white and black are excluded)
+BRAND_TONES = ["primary", "primaryDark", "secondary", "accent", "rose", "sage", "lavender", "success", "error", "gold"]
+LIGHT_BASE = "#FAF8F5"
+
+# Which image and gradient role each template takes
+IMAGE_PARAMS = {
+    "generate_product_showcase": ("image_url", "accent"),
+    "generate_seller_spotlight": ("avatar_url", "light"),
+}
+
+_cache_lock = threading.Lock()
+
+
+def _hex_to_rgb(value: str) -> tuple:
+    value = value.lstrip("#")
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def _rgb_to_hex(rgb) -> str:
+    return "#" + "".join(f"{int(round(c)):02X}" for c in np.clip(rgb, 0, 255))
+
+
+def to_lab(rgb: np.ndarray) -> np.ndarray:
+    """sRGB (..., 3) in 0-255 to CIELAB (D65)"""
+
+    c = rgb.astype(np.float32) / 255
+    c = np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+    xyz = c @ np.array([[0.4124, 0.2126, 0.0193],
+                        [0.3576, 0.7152, 0.1192],
+                        [0.1805, 0.0722, 0.9505]], dtype=np.float32)
+    xyz /= np.array([0.95047, 1.0, 1.08883], dtype=np.float32)
+    f = np.where(xyz > 0.008856, np.cbrt(xyz), 7.787 * xyz + 16 / 116)
+    return np.stack([116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+_BRAND_RGB = np.array([_hex_to_rgb(COLORS[name]) for name in BRAND_TONES], dtype=np.float32)
+_BRAND_LAB = to_lab(_BRAND_RGB)
+
+
+def read_source(source: str) -> bytes:
+    """Image bytes from a local path or an http(s)/file URL"""
+
+    if "://" in source:
+        with urllib.request.urlopen(source, timeout=30) as response:
+            return response.read()
+    return Path(source).read_bytes()
+
+
+def thumbnail(data: bytes, size: int = THUMB_SIZE) -> tuple:
+    """(pixels (size*size, 3) uint8, weights (size*size,) float32) of an image"""
+
+    with Image.open(io.BytesIO(data)) as img:
+        # JPEG decodes straight to a reduced scale, which is most of the speedup
+        img.draft("RGB", (size * 2, size * 2))
+        img = img.convert("RGBA").resize((size, size), Image.BILINEAR)
+        rgba = np.asarray(img).reshape(-1, 4)
+    weights = (rgba[:, 3] >= 128).astype(np.float32)
+    if not weights.any():
+        # Fully (or almost) transparent image: use its color channels as they are
+        weights[:] = 1
+    return rgba[:, :3], weights
+
+
+def kmeans_batch(pixels: np.ndarray, weights: np.ndarray, k: int = CLUSTERS,
+                 iterations: int = ITERATIONS) -> tuple:
+    """Weighted k-means on every image of a batch at once
+
+    pixels is (N, P, 3), weights (N, P). Returns centers (N, k, 3) and the
+    share of weight in each cluster (N, k).
+    """
+
+    x = pixels.astype(np.float32)
+    # Deterministic start: pixels at evenly spaced luminance ranks
+    luma = x @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    ranks = np.argsort(luma, axis=1)
+    picks = ranks[:, np.linspace(0, x.shape[1] - 1, k).astype(int)]
+    centers = np.take_along_axis(x, picks[..., None], axis=1)
+
+    x_sq = (x * x).sum(-1)[:, :, None]
+    for _ in range(iterations):
+        distances = x_sq - 2 * x @ centers.transpose(0, 2, 1) + (centers * centers).sum(-1)[:, None, :]
+        onehot = (distances.argmin(-1)[..., None] == np.arange(k)).astype(np.float32) * weights[..., None]
+        counts = onehot.sum(1)
+        sums = onehot.transpose(0, 2, 1) @ x
+        # Empty clusters keep their previous center
+        centers = np.where(counts[..., None] > 0, sums / np.maximum(counts, 1)[..., None], centers)
+    totals = np.maximum(counts.sum(1, keepdims=True), 1)
+    return centers, counts / totals
+
+
+def snap(rgb: np.ndarray) -> np.ndarray:
+    """Index into BRAND_TONES of the perceptually nearest tone per color"""
+
+    lab = to_lab(np.asarray(rgb, dtype=np.float32))
+    return ((lab[..., None, :] - _BRAND_LAB) ** 2).sum(-1).argmin(-1)
+
+
+def _mix(color: str, base: str, amount: float) -> str:
+    return _rgb_to_hex(np.array(_hex_to_rgb(base)) * (1 - amount) + np.array(_hex_to_rgb(color)) * amount)
+
+
+def build_palette(centers: np.ndarray, shares: np.ndarray):
+    """Palette record for one image from its cluster centers, None if no cluster has any pixels"""
+
+    order = np.argsort(-shares)
+    centers, shares = centers[order], shares[order]
+    lab = to_lab(centers)
+    chroma = np.hypot(lab[:, 1], lab[:, 2])
+    used = [i for i in range(len(centers)) if shares[i] > 0]
+    if not used:
+        return None
+    colorful = [i for i in used if chroma[i] >= MIN_CHROMA]
+
+    tones = [BRAND_TONES[i] for i in snap(centers[colorful or used])]
+    first = tones[0]
+    second = next((t for t in tones[1:] if t != first), None)
+    if second is None:
+        # Monochrome image: pair with the brand tone closest to the first
+        distances = ((_BRAND_LAB - _BRAND_LAB[BRAND_TONES.index(first)]) ** 2).sum(-1)
+        distances[BRAND_TONES.index(first)] = np.inf
+        second = BRAND_TONES[int(distances.argmin())]
+    # Lighter tone first, as in the hand-picked 135deg gradients
+    pair = sorted((first, second), key=lambda t: -_BRAND_LAB[BRAND_TONES.index(t)][0])
+    accent = [COLORS[t] for t in pair]
+
+    return {
+        "colors": [_rgb_to_hex(c) for c in centers],
+        "shares": [round(float(s), 4) for s in shares],
+        "tones": pair,
+        "accent": accent,
+        "light": [_mix(COLORS[first], LIGHT_BASE, 0.08), _mix(COLORS[first], LIGHT_BASE, 0.2)],
+    }
+
+
+class PaletteCache:
+    """Palettes keyed by image content hash, persisted as JSON"""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = Path(path)
+        self.entries = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        self.dirty = False
+
+    def get(self, digest: str):
+        return self.entries.get(digest)
+
+    def put(self, digest: str, palette: dict):
+        with _cache_lock:
+            self.entries[digest] = palette
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        tmp.replace(self.path)
+        self.dirty = False
+
+
+def extract(sources: list, cache: PaletteCache = None, workers: int = 8,
+            batch_size: int = BATCH_SIZE) -> dict:
+    """Palette per source; decoding runs on a thread pool, clustering per batch"""
+
+    cache = cache or PaletteCache()
+    palettes = {}
+
+    def load(source):
+        try:
+            data = read_source(source)
+        except OSError as exc:
+            print(f"[!] {source}: {exc}")
+            return source, None, None
+        digest = hashlib.sha256(data).hexdigest()
+        if cache.get(digest) is not None:
+            return source, digest, None
+        try:
+            return source, digest, thumbnail(data)
+        except (OSError, ValueError) as exc:
+            print(f"[!] {source}: {exc}")
+            return source, None, None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(sources), batch_size):
+            loaded = list(pool.map(load, sources[start:start + batch_size]))
+            misses = [(source, digest, thumb) for source, digest, thumb in loaded if thumb is not None]
+            if misses:
+                centers, shares = kmeans_batch(np.stack([t[0] for _, _, t in misses]),
+                                               np.stack([t[1] for _, _, t in misses]))
+                for (source, digest, _), c, s in zip(misses, centers, shares):
+                    palette = build_palette(c, s)
+                    if palette is None:
+                        print(f"[!] {source}: no usable pixels")
+                        continue
+                    cache.put(digest, palette)
+            for source, digest, _ in loaded:
+                if digest is not None and cache.get(digest) is not None:
+                    palettes[source] = cache.get(digest)
+    cache.save()
+    return palettes
+
+
+def apply_palettes(jobs: list, palettes: dict) -> tuple:
+    """Jobs with gradient_colors taken from their image palette, and the filenames that changed"""
+
+    updated, changed = [], []
+    for job in jobs:
+        params = job["params"]
+        image_param, role = IMAGE_PARAMS.get(job["template"], (None, None))
+        palette = palettes.get(params.get(image_param)) if image_param else None
+        if palette is not None and params.get("gradient_colors") != palette[role]:
+            params = dict(params, gradient_colors=palette[role])
+            changed.append(params["filename"])
+        updated.append(dict(job, params=params))
+    return updated, changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dominant brand colors from product and avatar images")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_extract = sub.add_parser("extract", help="print palettes for images")
+    p_extract.add_argument("images", nargs="+", help="paths, globs or URLs")
+    p_apply = sub.add_parser("apply", help="set showcase/seller gradients in the manifest from their images")
+    p_apply.add_argument("--manifest", default=str(MANIFEST_PATH))
+    p_apply.add_argument("--write", action="store_true", help="save the updated manifest")
+    for p in (p_extract, p_apply):
+        p.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    if args.command == "extract":
+        sources = [m for pattern in args.images for m in (glob.glob(pattern) if "://" not in pattern else [pattern])]
+        started = time.perf_counter()
+        palettes = extract(sources, workers=args.workers)
+        elapsed = time.perf_counter() - started
+        for source, palette in list(palettes.items())[:20]:
+            print(f"  {Path(source).name[:32]:32} {' '.join(palette['colors'])}  -> {', '.join(palette['tones'])}")
+        print(f"[+] {len(palettes)} palettes in {elapsed:.2f}s ({len(palettes) / max(elapsed, 1e-9) * 60:,.0f}/min)")
+        return
+
+    jobs = load_manifest(args.manifest)
+    sources = sorted({j["params"][IMAGE_PARAMS[j["template"]][0]] for j in jobs
+                      if j["template"] in IMAGE_PARAMS and j["params"].get(IMAGE_PARAMS[j["template"]][0])})
+    jobs, changed = apply_palettes(jobs, extract(sources, workers=args.workers))
+    if not changed:
+        print("[OK] Gradients match their images")
+        return
+    print(f"[+] {len(changed)} banners changed: {', '.join(changed)}")
+    if args.write:
+        save_manifest(jobs, args.manifest)
+        print(f"[OK] Updated {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+Personalised Apega Desapega banners at request time
+Renders each template once in Chrome as a base layer with the personal text
+slots left empty, then draws name/cashback/category in-process with Pillow
+and keeps recent results in a byte-bounded LRU cache
+"""
+
+import argparse
+import io
+import math
+import random
+import statistics
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import Image, ImageDraw
+
+from banner_generator import format_brl
+from fonts import FONTS_DIR, font_path, load_font
+from render_queue import job_key, render_template
+
+# Configuration
+BASE_DIR = Path(__file__).parent / ".cache" / "personal_base"
+CACHE_BYTES = 64 * 1024 * 1024
+TARGET_MS = 50
+PNG_COMPRESS_LEVEL = 1
+
+# Base layers: template params with the personal slots blanked (&nbsp; keeps
+# the line box so the rest of the layout does not move) and where to draw
+# the personal lines on top. Positions follow the template CSS.
+PERSONAL_BANNERS = {
+    "hero": {
+        "template": "generate_hero_banner",
+        "params": {
+            "title": "&nbsp;",
+            "subtitle": "&nbsp;",
+            "cta_text": "VER AGORA",
+            "gradient_colors": ["#D4A574", "#8B7355"],
+        },
+        "slots": {
+            "title": {"xy": (400, 140), "anchor": "mm", "font": ("Playfair Display", 700, 48),
+                      "fill": (255, 255, 255, 255), "shadow": (0, 2), "max_width": 720},
+            "subtitle": {"xy": (400, 199), "anchor": "mm", "font": ("Inter", 400, 18),
+                         "fill": (255, 255, 255, 230), "max_width": 500},
+        },
+    },
+    "cashback": {
+        "template": "generate_cashback_banner",
+        "params": {"percentage": "5%", "title": "&nbsp;", "subtitle": "&nbsp;"},
+        "slots": {
+            "title": {"xy": (60, 209), "anchor": "lm", "font": ("Inter", 700, 32),
+                      "fill": (255, 255, 255, 255), "max_width": 470},
+            "subtitle": {"xy": (60, 246), "anchor": "lm", "font": ("Inter", 400, 16),
+                         "fill": (255, 255, 255, 204), "max_width": 470},
+        },
+    },
+}
+
+
+def parse_balance(value) -> float:
+    """Cashback balance as a finite, non-negative number; ValueError otherwise"""
+
+    if value is None or value == "":
+        raise ValueError("cashback_balance is required")
+    try:
+        balance = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"cashback_balance must be a number, got {value!r}") from None
+    if not math.isfinite(balance) or balance < 0:
+        raise ValueError(f"cashback_balance must be a non-negative amount, got {value!r}")
+    return balance
+
+
+def personal_text(kind: str, user: dict) -> dict:
+    """Slot texts for a user: first_name, cashback_balance, favorite_category"""
+
+    name = user.get("first_name") or "você"
+    category = user.get("favorite_category")
+    if kind == "hero":
+        return {
+            "title": f"Olá, {name}!",
+            "subtitle": f"Novidades em {category} separadas para você" if category
+            else "Peças novas separadas para você",
+        }
+    balance = parse_balance(user.get("cashback_balance"))
+    return {
+        "title": f"{name.upper()}, VOCÊ TEM {format_brl(balance)}",
+        "subtitle": f"Use seu cashback em {category}" if category
+        else "Use seu cashback na próxima compra",
+    }
+
+
+def missing_fonts() -> list:
+    """Families of the personal slots with no TrueType file in assets/fonts"""
+
+    return sorted({
+        slot["font"][0]
+        for spec in PERSONAL_BANNERS.values()
+        for slot in spec["slots"].values()
+        if font_path(slot["font"][0], slot["font"][1]) is None
+    })
+
+
+class ByteLRU:
+    """LRU mapping evicting by total value size rather than entry count"""
+
+    def __init__(self, max_bytes: int = CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key):
+        with self.lock:
+            value = self.items.get(key)
+            if value is None:
+                self.stats["misses"] += 1
+                return None
+            self.items.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def put(self, key, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        with self.lock:
+            old = self.items.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old)
+            self.items[key] = value
+            self.bytes += len(value)
+            while self.bytes > self.max_bytes:
+                _, evicted = self.items.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.stats["evictions"] += 1
+
+
+class Personalizer:
+    """Request-time personalisation on top of cached base layers"""
+
+    def __init__(self, cache_bytes: int = CACHE_BYTES, render=render_template, base_dir=BASE_DIR,
+                 allow_default_font: bool = False):
+        missing = missing_fonts()
+        if missing and not allow_default_font:
+            raise RuntimeError(f"No font files for {', '.join(missing)} in {FONTS_DIR}; "
+                               f"personalised text would be drawn in Pillow's default face")
+        if missing:
+            print(f"[!] Drawing personalised text in Pillow's default face instead of {', '.join(missing)}")
+        self.render = render
+        self.base_dir = Path(base_dir)
+        self.cache = ByteLRU(cache_bytes)
+        self.bases = {}
+        self.lock = threading.Lock()
+
+    def base_layer(self, kind: str) -> Image.Image:
+        """RGBA base for a banner kind, rendered in Chrome only on first use"""
+
+        base = self.bases.get(kind)
+        if base is not None:
+            return base
+        with self.lock:
+            if kind in self.bases:
+                return self.bases[kind]
+            spec = PERSONAL_BANNERS[kind]
+            params = dict(spec["params"], filename=f"{kind}_{job_key(spec['template'], spec['params'])[:16]}.png")
+            path = self.base_dir / params["filename"]
+            if not path.exists():
+                from renderer import output_to
+
+                with output_to(self.base_dir):
+                    self.render(spec["template"], params)
+            with Image.open(path) as img:
+                base = img.convert("RGBA")
+            self.bases[kind] = base
+            return base
+
+    def banner(self, kind: str, user: dict, fmt: str = "PNG") -> bytes:
+        """Encoded personalised banner for a user"""
+
+        texts = personal_text(kind, user)
+        # Keyed on what is drawn, so users with the same texts share an entry
+        key = (kind, fmt, tuple(sorted(texts.items())))
+        data = self.cache.get(key)
+        if data is None:
+            data = self._encode(self.compose(kind, texts), fmt)
+            self.cache.put(key, data)
+        return data
+
+    def compose(self, kind: str, texts: dict) -> Image.Image:
+        """Draw the slot texts over the base layer"""
+
+        img = self.base_layer(kind).copy()
+        draw = ImageDraw.Draw(img, "RGBA")
+        for slot, text in texts.items():
+            spec = PERSONAL_BANNERS[kind]["slots"][slot]
+            family, weight, size = spec["font"]
+            font = load_font(family, weight, size)
+            # Shrink long names until the line fits its box
+            while size > 10 and draw.textlength(text, font=font) > spec["max_width"]:
+                size -= 2
+                font = load_font(family, weight, size)
+            if "shadow" in spec:
+                dx, dy = spec["shadow"]
+                x, y = spec["xy"]
+                draw.text((x + dx, y + dy), text, font=font, anchor=spec["anchor"], fill=(0, 0, 0, 51))
+            draw.text(spec["xy"], text, font=font, anchor=spec["anchor"], fill=spec["fill"])
+        return img
+
+    def _encode(self, img: Image.Image, fmt: str) -> bytes:
+        buf = io.BytesIO()
+        if fmt == "PNG":
+            img.convert("RGB").save(buf, "PNG", compress_level=PNG_COMPRESS_LEVEL)
+        else:
+            img.convert("RGB").save(buf, fmt, quality=85)
+        return buf.getvalue()
+
+
+def benchmark(personalizer: Personalizer, users: int = 500, repeats: int = 2, fmt: str = "PNG") -> dict:
+    """Per-request latency over random users; first pass cold, later passes cached"""
+
+    rng = random.Random(42)
+    names = ["Ana", "Beatriz", "Camila", "Daniela", "Fernanda", "Juliana", "Mariana", "Patrícia", "Larissa"]
+    categories = ["Vestidos", "Blusas", "Calças", "Bolsas", "Calçados", "Acessórios", None]
+    population = [
+        {
+            "first_name": f"{rng.choice(names)} {i}",
+            "cashback_balance": round(rng.uniform(0, 300), 2),
+            "favorite_category": rng.choice(categories),
+            "kind": rng.choice(list(PERSONAL_BANNERS)),
+        }
+        for i in range(users)
+    ]
+    for kind in PERSONAL_BANNERS:
+        personalizer.base_layer(kind)
+
+    results = {}
+    for run in range(repeats):
+        timings = []
+        for user in population:
+            started = time.perf_counter()
+            personalizer.banner(user["kind"], user, fmt)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        results["cold" if run == 0 else f"warm{run}"] = {
+            "p50": statistics.median(timings),
+            "p95": timings[int(len(timings) * 0.95) - 1],
+            "max": timings[-1],
+        }
+    return results
+
+
+class _PersonalHandler(BaseHTTPRequestHandler):
+    """GET /hero.png?first_name=Ana&cashback_balance=12.5&favorite_category=Vestidos"""
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        kind = Path(url.path).stem
+        if kind not in PERSONAL_BANNERS:
+            self.send_error(404)
+            return
+        user = {k: v[0] for k, v in parse_qs(url.query).items()}
+        try:
+            data = self.server.personalizer.banner(kind, user)
+        except ValueError as exc:
+            self.send_error(400, str(exc))
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "private, max-age=300")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(personalizer: Personalizer, host: str = "127.0.0.1", port: int = 8768) -> ThreadingHTTPServer:
+    """HTTP endpoint for personalised banners; call serve_forever() on it"""
+
+    server = ThreadingHTTPServer((host, port), _PersonalHandler)
+    server.personalizer = personalizer
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Personalised hero and cashback banners")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_render = sub.add_parser("render", help="write one personalised banner")
+    p_render.add_argument("kind", choices=list(PERSONAL_BANNERS))
+    p_render.add_argument("output")
+    p_render.add_argument("--name")
+    p_render.add_argument("--balance", type=float, default=0)
+    p_render.add_argument("--category")
+
+    p_bench = sub.add_parser("bench", help="measure per-request latency")
+    p_bench.add_argument("--users", type=int, default=500)
+    p_bench.add_argument("--repeats", type=int, default=2)
+    p_bench.add_argument("--format", default="PNG")
+    p_bench.add_argument("--target-ms", type=float, default=TARGET_MS)
+    p_bench.add_argument("--cache-mb", type=float, default=CACHE_BYTES / 1024 / 1024)
+
+    p_serve = sub.add_parser("serve", help="serve personalised banners over HTTP")
+    p_serve.add_argument("--port", type=int, default=8768)
+
+    for p in (p_render, p_bench, p_serve):
+        p.add_argument("--allow-default-font", action="store_true",
+                       help="draw with Pillow's default face when the TTFs are missing")
+
+    args = parser.parse_args()
+
+    if args.command == "render":
+        user = {"first_name": args.name, "cashback_balance": args.balance, "favorite_category": args.category}
+        personalizer = Personalizer(allow_default_font=args.allow_default_font)
+        Path(args.output).write_bytes(personalizer.banner(args.kind, user))
+        print(f"[+] Wrote {args.output}")
+    elif args.command == "bench":
+        personalizer = Personalizer(cache_bytes=int(args.cache_mb * 1024 * 1024),
+                                    allow_default_font=args.allow_default_font)
+        results = benchmark(personalizer, args.users, args.repeats, args.format)
+        print("=" * 50)
+        print(f"Personalised banners: {args.users} users, {args.format}")
+        print("=" * 50)
+        for run, r in results.items():
+            print(f"  {run:6} p50 {r['p50']:6.1f} ms  p95 {r['p95']:6.1f} ms  max {r['max']:6.1f} ms")
+        cache = personalizer.cache
+        print(f"  cache  {len(cache.items)} entries, {cache.bytes / 1024 / 1024:.1f} MB, "
+              f"{cache.stats['evictions']} evictions")
+        if results["cold"]["p95"] > args.target_ms:
+            print(f"[!] Cold p95 {results['cold']['p95']:.1f} ms exceeds {args.target_ms:.0f} ms target")
+            raise SystemExit(1)
+        print(f"[OK] Cold p95 within {args.target_ms:.0f} ms target")
+    else:
+        print(f"[+] Serving on http://127.0.0.1:{args.port}/hero.png?first_name=Ana")
+        serve(Personalizer(allow_default_font=args.allow_default_font), port=args.port).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Streaming banner pipeline for Apega Desapega
+render -> optimize -> publish, connected by bounded queues so Chrome,
+Pillow and file copies overlap instead of running one banner at a time
+"""
+
+import argparse
+import os
+import queue
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from manifest import MANIFEST_PATH, load_manifest
+
+# Configuration
+MOBILE_ASSETS_DIR = Path(__file__).parent.parent / "apega-mobile" / "assets"
+PUBLISH_DIR = MOBILE_ASSETS_DIR / "generated"
+
+_DONE = object()
+
+
+class Stage:
+    """One pipeline step: fn(item) -> item, or None to drop the item"""
+
+    def __init__(self, name: str, fn, workers: int = 1):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.processed = 0
+        self.failed = 0
+        self.busy = 0.0
+        self.max_depth = 0
+        self.depth_total = 0
+        self.depth_samples = 0
+        self.errors = []
+
+
+class Pipeline:
+    """Runs stages concurrently; a full queue blocks the stage feeding it"""
+
+    def __init__(self, stages: list, queue_size: int = 8):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.seconds = 0.0
+
+    def run(self, items) -> list:
+        """Stream items through every stage and return what comes out"""
+
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results = []
+        lock = threading.Lock()
+        remaining = [stage.workers for stage in self.stages]
+
+        def emit(index, item):
+            if index == len(self.stages):
+                with lock:
+                    results.append(item)
+                return
+            stage = self.stages[index]
+            queues[index].put(item)
+            depth = queues[index].qsize()
+            with lock:
+                stage.max_depth = max(stage.max_depth, depth)
+                stage.depth_total += depth
+                stage.depth_samples += 1
+
+        def worker(index):
+            stage = self.stages[index]
+            inbox = queues[index]
+            while True:
+                item = inbox.get()
+                if item is _DONE:
+                    break
+                started = time.perf_counter()
+                try:
+                    out = stage.fn(item)
+                except Exception as exc:
+                    with lock:
+                        stage.failed += 1
+                        stage.errors.append((item, exc))
+                    continue
+                finally:
+                    with lock:
+                        stage.busy += time.perf_counter() - started
+                with lock:
+                    stage.processed += 1
+                if out is not None:
+                    emit(index + 1, out)
+
+            # Last worker out closes the next stage
+            with lock:
+                remaining[index] -= 1
+                last = remaining[index] == 0
+            if last and index + 1 < len(self.stages):
+                for _ in range(self.stages[index + 1].workers):
+                    queues[index + 1].put(_DONE)
+
+        threads = [
+            threading.Thread(target=worker, args=(i,), name=f"{stage.name}-{n}", daemon=True)
+            for i, stage in enumerate(self.stages)
+            for n in range(stage.workers)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for item in items:
+            emit(0, item)
+        for _ in range(self.stages[0].workers):
+            queues[0].put(_DONE)
+        for thread in threads:
+            thread.join()
+        self.seconds = time.perf_counter() - started
+        return results
+
+    def print_stats(self):
+        """Per-stage throughput, utilisation and queue depth"""
+
+        print("\n" + "=" * 66)
+        print(f"{'stage':10} {'workers':>7} {'done':>5} {'fail':>5} {'items/s':>8} "
+              f"{'busy%':>6} {'avg q':>6} {'max q':>6}")
+        for stage in self.stages:
+            rate = stage.processed / self.seconds if self.seconds else 0.0
+            util = 100 * stage.busy / (self.seconds * stage.workers) if self.seconds else 0.0
+            avg = stage.depth_total / stage.depth_samples if stage.depth_samples else 0.0
+            print(f"{stage.name:10} {stage.workers:>7} {stage.processed:>5} {stage.failed:>5} "
+                  f"{rate:>8.2f} {util:>6.0f} {avg:>6.1f} {stage.max_depth:>6}")
+        print(f"[>] Wall time {self.seconds:.1f}s")
+        for stage in self.stages:
+            for item, exc in stage.errors:
+                print(f"[!] {stage.name} {item['params'].get('filename')}: {exc}")
+        print("=" * 66)
+
+
+def render_stage(job: dict) -> dict:
+    """Render a job in Chrome and attach the output path"""
+
+    from render_queue import render_template
+
+    return {**job, "path": render_template(job["template"], job["params"])}
+
+
+def optimize_stage(job: dict) -> dict:
+    """Losslessly recompress the PNG with Pillow"""
+
+    from PIL import Image
+
+    path = Path(job["path"])
+    before = path.stat().st_size
+    tmp = path.with_name(f".{path.name}.opt")
+    with Image.open(path) as img:
+        img.save(tmp, format="PNG", optimize=True)
+    if tmp.stat().st_size < before:
+        os.replace(tmp, path)
+    else:
+        tmp.unlink()
+    return {**job, "bytes_saved": before - path.stat().st_size}
+
+
+def publish_stage(publish_dir=PUBLISH_DIR):
+    """Build a stage that copies finished banners into publish_dir"""
+
+    publish_dir = Path(publish_dir)
+    publish_dir.mkdir(parents=True, exist_ok=True)
+
+    def publish(job: dict) -> dict:
+        src = Path(job["path"])
+        dest = publish_dir / src.name
+        tmp = dest.with_name(f".{dest.name}.tmp")
+        shutil.copy2(src, tmp)
+        os.replace(tmp, dest)
+        return {**job, "published": str(dest)}
+
+    return publish
+
+
+def build_pipeline(
+    render_workers: int = 2,
+    optimize_workers: int = 2,
+    publish_workers: int = 4,
+    queue_size: int = 8,
+    publish_dir=PUBLISH_DIR,
+    skip_unchanged: bool = False,
+) -> Pipeline:
+    """Standard render -> optimize -> publish pipeline
+
+    With skip_unchanged, banners that match the baseline saved by
+    change_detect.snapshot() keep their old file and go no further.
+    """
+
+    stages = [Stage("render", render_stage, render_workers)]
+    if skip_unchanged:
+        from change_detect import change_stage
+
+        stages.append(Stage("detect", change_stage(), optimize_workers))
+    stages += [
+        Stage("optimize", optimize_stage, optimize_workers),
+        Stage("publish", publish_stage(publish_dir), publish_workers),
+    ]
+    return Pipeline(stages, queue_size=queue_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming render/optimize/publish pipeline")
+    parser.add_argument("--manifest", default=str(MANIFEST_PATH))
+    parser.add_argument("--render-workers", type=int, default=2)
+    parser.add_argument("--optimize-workers", type=int, default=2)
+    parser.add_argument("--publish-workers", type=int, default=4)
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--publish-dir", default=str(PUBLISH_DIR))
+    parser.add_argument("--skip-unchanged", action="store_true",
+                        help="keep and do not republish banners identical to the last build")
+    args = parser.parse_args()
+
+    if args.skip_unchanged:
+        from change_detect import snapshot
+
+        snapshot()
+
+    pipeline = build_pipeline(
+        args.render_workers, args.optimize_workers, args.publish_workers,
+        args.queue_size, args.publish_dir, args.skip_unchanged,
+    )
+    results = pipeline.run(load_manifest(args.manifest))
+    pipeline.print_stats()
+    print(f"[OK] Published {len(results)} banners to {args.publish_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Preview and watch mode for Apega Desapega banner design work
+Watches the template modules and manifest, re-renders only banners whose
+HTML changed at a reduced device scale, and serves them on a local page
+that refreshes itself
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import importlib
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import template_registry
+from manifest import MANIFEST_PATH, load_manifest
+from render_queue import resolve_template
+from renderer import capture_html, device_scale, output_to, render_html
+from warm_page import WarmBrowser, playwright_available
+
+# Configuration
+BASE_DIR = Path(__file__).parent
+PREVIEW_DIR = BASE_DIR / ".cache" / "preview"
+PREVIEW_SCALE = 0.5
+TEMPLATE_MODULES = ["text_fit", "banner_generator", "advanced_templates"]
+POLL_SECONDS = 0.3
+
+INDEX_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Banner preview</title>
+<style>
+body {{ font-family: sans-serif; background: #FAF8F5; margin: 24px; }}
+figure {{ display: inline-block; margin: 0 16px 16px 0; vertical-align: top; }}
+img {{ display: block; box-shadow: 0 2px 8px rgba(0,0,0,0.15); }}
+figcaption {{ font-size: 12px; color: #6B6B6B; margin-top: 4px; }}
+</style>
+</head>
+<body>
+{figures}
+<script>
+let version = "{version}";
+setInterval(async () => {{
+    const v = await (await fetch("/version")).text();
+    if (v !== version) location.reload();
+}}, 500);
+</script>
+</body>
+</html>
+"""
+
+
+class PreviewSession:
+    """Keeps the last rendered HTML per banner and re-renders only what changed"""
+
+    def __init__(self, manifest=MANIFEST_PATH, out_dir=PREVIEW_DIR, scale: float = PREVIEW_SCALE,
+                 only: str = None, browser: WarmBrowser = None):
+        self.manifest = Path(manifest)
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.scale = scale
+        self.only = only
+        self.browser = browser
+        self.pages = {}
+        self.hashes = {}
+        self.sizes = {}
+        self.version = 0
+        self.mtimes = {}
+
+    def watched(self) -> list:
+        return [BASE_DIR / f"{name}.py" for name in TEMPLATE_MODULES] + [self.manifest]
+
+    def changed_files(self) -> list:
+        changed = []
+        for path in self.watched():
+            mtime = path.stat().st_mtime if path.exists() else None
+            if self.mtimes.get(path) != mtime:
+                self.mtimes[path] = mtime
+                changed.append(path)
+        return changed
+
+    def reload_templates(self):
+        """Re-import template modules in dependency order"""
+
+        for name in TEMPLATE_MODULES:
+            if name in sys.modules:
+                importlib.reload(sys.modules[name])
+        template_registry.reset()
+
+    def jobs(self) -> list:
+        jobs = load_manifest(self.manifest)
+        if self.only:
+            jobs = [j for j in jobs if fnmatch.fnmatch(j["params"]["filename"], self.only)]
+        return jobs
+
+    def refresh(self) -> list:
+        """Build every job's HTML and render the ones that differ from last time"""
+
+        pending = []
+        for job in self.jobs():
+            with capture_html() as pages:
+                resolve_template(job["template"])(**job["params"])
+            html, filename, size = pages[0]
+            digest = hashlib.sha256(html.encode("utf-8")).hexdigest()
+            if self.hashes.get(filename) != digest:
+                pending.append((html, filename, size, digest))
+
+        for html, filename, size, digest in pending:
+            self.render(html, filename, size)
+            self.hashes[filename] = digest
+            self.sizes[filename] = size
+        if pending:
+            self.version += 1
+        return [filename for _, filename, _, _ in pending]
+
+    def render(self, html: str, filename: str, size: tuple):
+        if self.browser is None:
+            with output_to(self.out_dir), device_scale(self.scale):
+                render_html(html, filename, size)
+            return
+        page = self.pages.get(size)
+        if page is None:
+            page = self.pages[size] = self.browser.new_page(size, self.scale)
+        page.load(html)
+        page.screenshot(self.out_dir / filename)
+
+    def index(self) -> str:
+        figures = "\n".join(
+            f'<figure><img src="/img/{name}?v={self.hashes[name][:8]}" '
+            f'width="{self.sizes[name][0]}" height="{self.sizes[name][1]}">'
+            f"<figcaption>{name}</figcaption></figure>"
+            for name in sorted(self.hashes)
+        )
+        return INDEX_HTML.format(figures=figures, version=self.version)
+
+
+class _PreviewHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        session = self.server.session
+        path = self.path.split("?", 1)[0]
+        if path == "/":
+            body, ctype = session.index().encode("utf-8"), "text/html; charset=utf-8"
+        elif path == "/version":
+            body, ctype = str(session.version).encode(), "text/plain"
+        elif path.startswith("/img/") and Path(path[5:]).name == path[5:]:
+            file = session.out_dir / path[5:]
+            if not file.is_file():
+                self.send_error(404)
+                return
+            body, ctype = file.read_bytes(), "image/png"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(session: PreviewSession, host: str = "127.0.0.1", port: int = 8770) -> ThreadingHTTPServer:
+    """Preview page for a session; call serve_forever() on it"""
+
+    server = ThreadingHTTPServer((host, port), _PreviewHandler)
+    server.session = session
+    return server
+
+
+def watch(session: PreviewSession, stop: threading.Event = None):
+    """Poll watched files and re-render on change until stopped"""
+
+    stop = stop or threading.Event()
+    session.changed_files()
+    while not stop.is_set():
+        changed = session.changed_files()
+        if changed:
+            started = time.perf_counter()
+            try:
+                session.reload_templates()
+                rendered = session.refresh()
+            except Exception as exc:
+                # Half-saved edits are normal while watching; wait for the next save
+                print(f"[!] {', '.join(p.name for p in changed)}: {type(exc).__name__}: {exc}")
+            else:
+                print(f"[+] {', '.join(p.name for p in changed)} -> {len(rendered)} re-rendered "
+                      f"in {time.perf_counter() - started:.2f}s")
+        stop.wait(POLL_SECONDS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Low-resolution banner previews with hot re-render")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("watch", "serve previews and re-render on edits"),
+                            ("once", "render previews once and exit")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--manifest", default=str(MANIFEST_PATH))
+        p.add_argument("--scale", type=float, default=PREVIEW_SCALE)
+        p.add_argument("--only", help="filename glob, e.g. 'hero_*'")
+        if name == "watch":
+            p.add_argument("--port", type=int, default=8770)
+    args = parser.parse_args()
+
+    browser = WarmBrowser() if playwright_available() else None
+    if browser is None:
+        print("[!] Playwright not installed, previews use one Chrome launch per banner")
+    session = PreviewSession(args.manifest, scale=args.scale, only=args.only, browser=browser)
+
+    try:
+        started = time.perf_counter()
+        count = len(session.refresh())
+        print(f"[+] {count} previews at {args.scale:g}x in {time.perf_counter() - started:.1f}s")
+        if args.command == "watch":
+            server = serve(session, port=args.port)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            print(f"[OK] Preview on http://127.0.0.1:{args.port}/  (Ctrl+C to stop)")
+            watch(session)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if browser is not None:
+            browser.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Render profiling for Apega Desapega banners
+Captures a cProfile dump of the Python side (template/HTML building) and a
+DevTools performance trace of the browser side (style, layout, paint, image
+decode) for selected renders, with a summary of where the time went
+"""
+
+import argparse
+import cProfile
+import fnmatch
+import io
+import json
+import pstats
+import time
+from pathlib import Path
+
+from manifest import MANIFEST_PATH, load_manifest
+from render_queue import resolve_template
+from renderer import capture_html, output_to, render_html
+from warm_page import WarmBrowser, playwright_available
+
+# Configuration
+PROFILES_DIR = Path(__file__).parent / ".cache" / "profiles"
+TRACE_CATEGORIES = [
+    "devtools.timeline",
+    "disabled-by-default-devtools.timeline",
+    "disabled-by-default-devtools.timeline.frame",
+    "blink",
+    "cc",
+    "gpu",
+]
+
+# Trace event names per browser phase. Paint includes PaintImage, which is
+# also shown on its own so image-heavy banners stand out.
+BROWSER_PHASES = {
+    "style": ("UpdateLayoutTree", "RecalculateStyles", "ParseAuthorStyleSheet"),
+    "layout": ("Layout",),
+    "paint": ("Paint",),
+    "paint_image": ("PaintImage",),
+    "image_decode": ("Decode Image", "ImageDecodeTask", "Decode LazyPixelRef"),
+    "raster": ("RasterTask",),
+    "composite": ("CompositeLayers", "UpdateLayerTree"),
+    "script": ("EvaluateScript", "FunctionCall"),
+}
+
+
+def browser_phases(trace_path) -> dict:
+    """Milliseconds per browser phase from a Chrome trace file"""
+
+    with open(trace_path, encoding="utf-8") as f:
+        data = json.load(f)
+    events = data["traceEvents"] if isinstance(data, dict) else data
+    by_name = {name: phase for phase, names in BROWSER_PHASES.items() for name in names}
+
+    totals = dict.fromkeys(BROWSER_PHASES, 0.0)
+    open_events = {}
+    for event in events:
+        phase = by_name.get(event.get("name"))
+        if phase is None:
+            continue
+        if event.get("ph") == "X":
+            totals[phase] += event.get("dur", 0) / 1000
+        elif event.get("ph") == "B":
+            open_events[(event.get("tid"), event["name"])] = event["ts"]
+        elif event.get("ph") == "E":
+            started = open_events.pop((event.get("tid"), event["name"]), None)
+            if started is not None:
+                totals[phase] += (event["ts"] - started) / 1000
+    return totals
+
+
+def python_top(stats_path, limit: int = 5) -> list:
+    """Most expensive functions by own time as (function, calls, ms)"""
+
+    stats = pstats.Stats(str(stats_path), stream=io.StringIO())
+    rows = []
+    for (file, line, func), (_, calls, tottime, _, _) in stats.stats.items():
+        rows.append((f"{Path(file).name}:{line}({func})", calls, tottime * 1000))
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return rows[:limit]
+
+
+def profile_job(job: dict, run_dir: Path, browser: WarmBrowser = None) -> dict:
+    """Profile one job: Python HTML building, then the browser render"""
+
+    name = Path(job["params"]["filename"]).stem
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    with capture_html() as pages:
+        profiler.runcall(resolve_template(job["template"]), **job["params"])
+    python_ms = (time.perf_counter() - started) * 1000
+    stats_path = run_dir / f"{name}.pstats"
+    profiler.dump_stats(str(stats_path))
+    html, filename, size = pages[0]
+
+    result = {"job": filename, "template": job["template"], "python_ms": python_ms,
+              "python_top": python_top(stats_path), "pstats": stats_path.name}
+
+    started = time.perf_counter()
+    if browser is None:
+        with output_to(run_dir):
+            render_html(html, filename, size)
+        result["browser_ms"] = (time.perf_counter() - started) * 1000
+        result["phases"] = None
+        return result
+
+    trace_path = run_dir / f"{name}.trace.json"
+    page = browser.new_page(size)
+    browser.browser.start_tracing(page=page.page, path=str(trace_path), categories=TRACE_CATEGORIES)
+    try:
+        page.load(html)
+        page.screenshot(run_dir / filename)
+    finally:
+        browser.browser.stop_tracing()
+        page.close()
+        browser.pages.remove(page)
+    result["browser_ms"] = (time.perf_counter() - started) * 1000
+    result["phases"] = browser_phases(trace_path)
+    result["trace"] = trace_path.name
+    return result
+
+
+def profile_jobs(jobs: list, run_dir=None) -> dict:
+    """Profile jobs into a fresh run directory and write summary.json"""
+
+    run_dir = Path(run_dir or PROFILES_DIR / time.strftime("%Y%m%d-%H%M%S"))
+    run_dir.mkdir(parents=True, exist_ok=True)
+
+    browser = WarmBrowser() if playwright_available() else None
+    if browser is None:
+        print("[!] Playwright not installed, browser side is timed but not traced")
+    try:
+        results = [profile_job(job, run_dir, browser) for job in jobs]
+    finally:
+        if browser is not None:
+            browser.close()
+
+    # Everything measured, ranked, so the slowest thing is the first line
+    costs = []
+    for r in results:
+        costs.append((r["python_ms"], r["job"], "python"))
+        for phase, ms in (r["phases"] or {"browser (untraced)": r["browser_ms"]}).items():
+            costs.append((ms, r["job"], phase))
+    costs.sort(reverse=True)
+
+    summary = {"run_dir": str(run_dir), "jobs": results,
+               "top_costs": [{"ms": ms, "job": job, "phase": phase} for ms, job, phase in costs[:15]]}
+    with open(run_dir / "summary.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
+
+
+def print_summary(summary: dict):
+    print("=" * 50)
+    print(f"[*] Profile: {summary['run_dir']}")
+    print("=" * 50)
+    for r in summary["jobs"]:
+        print(f"\n  {r['job']}  python {r['python_ms']:.1f} ms, browser {r['browser_ms']:.0f} ms")
+        if r["phases"]:
+            phases = ", ".join(f"{p} {ms:.1f}" for p, ms in r["phases"].items() if ms >= 0.1)
+            print(f"    browser phases (ms): {phases}")
+        for func, calls, ms in r["python_top"][:3]:
+            print(f"    py {ms:7.2f} ms  {calls:>5}x  {func}")
+    print("\n[>] Top costs")
+    for c in summary["top_costs"][:10]:
+        print(f"  {c['ms']:8.1f} ms  {c['phase']:18} {c['job']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile selected banner renders")
+    parser.add_argument("pattern", nargs="?", default="*", help="filename glob, e.g. 'product_*'")
+    parser.add_argument("--manifest", default=str(MANIFEST_PATH))
+    parser.add_argument("--out", help="profile directory (default: .cache/profiles/<timestamp>)")
+    args = parser.parse_args()
+
+    jobs = [j for j in load_manifest(args.manifest) if fnmatch.fnmatch(j["params"]["filename"], args.pattern)]
+    if not jobs:
+        raise SystemExit(f"[!] No jobs match {args.pattern}")
+    print_summary(profile_jobs(jobs, args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Versioned publication of Apega Desapega banner sets
+Every build renders into a fresh directory under builds/ and goes live by
+atomically repointing the builds/current symlink; rollback works the same
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from manifest import MANIFEST_PATH, load_manifest
+
+# Configuration
+BUILDS_DIR = Path(__file__).parent / "builds"
+CURRENT_LINK = BUILDS_DIR / "current"
+HISTORY_PATH = BUILDS_DIR / "history.json"
+BUILD_INFO = "build.json"
+
+
+def atomic_write_bytes(path, data: bytes):
+    """Write a file via temp file, fsync and rename"""
+
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _write_json(path, data):
+    atomic_write_bytes(path, json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
+
+
+def _history() -> dict:
+    """Published builds in order, plus the index of the live entry"""
+
+    if not HISTORY_PATH.exists():
+        return {"position": -1, "entries": []}
+    with open(HISTORY_PATH, encoding="utf-8") as f:
+        history = json.load(f)
+    # Older history files were a bare list whose last entry was live
+    if isinstance(history, list):
+        history = {"position": len(history) - 1, "entries": history}
+    return history
+
+
+def _owner_alive(name: str) -> bool:
+    """Whether the process that started a build directory is still running"""
+
+    try:
+        pid = int(name.rsplit("-", 1)[1])
+    except (IndexError, ValueError):
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def current_build():
+    """Name of the live build, or None"""
+
+    if not CURRENT_LINK.is_symlink():
+        return None
+    return Path(os.readlink(CURRENT_LINK)).name
+
+
+def is_complete(build_dir) -> bool:
+    return (Path(build_dir) / BUILD_INFO).exists()
+
+
+def builds() -> list:
+    """Complete builds, oldest first"""
+
+    return sorted(
+        p.name for p in BUILDS_DIR.glob("*")
+        if p.is_dir() and not p.is_symlink() and is_complete(p)
+    )
+
+
+def build(jobs: list, workers: int = 2, render=None, budgets: bool = True) -> Path:
+    """Render every job into a new build directory and mark it complete
+
+    With budgets on, a build whose assets exceed the mobile byte/decode
+    budgets is deleted and never marked complete.
+    """
+
+    from renderer import output_to
+
+    if render is None:
+        from render_queue import render_template as render
+
+    name = time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+    build_dir = BUILDS_DIR / name
+    build_dir.mkdir(parents=True)
+
+    started = time.time()
+    try:
+        with output_to(build_dir), ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(lambda job: render(job["template"], job["params"]), jobs))
+    except BaseException:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+
+    if budgets:
+        import asset_budget
+
+        rows = asset_budget.report(jobs, build_dir)
+        failed = asset_budget.failures(rows)
+        if failed:
+            asset_budget.print_report(rows)
+            shutil.rmtree(build_dir, ignore_errors=True)
+            raise ValueError(f"{len(failed)} assets over budget, build {name} discarded")
+
+    # The info file is written last; only builds that have it can go live
+    _write_json(build_dir / BUILD_INFO, {
+        "name": name,
+        "started": started,
+        "finished": time.time(),
+        "files": sorted(job["params"]["filename"] for job in jobs),
+    })
+    return build_dir
+
+
+def _point_current(name: str):
+    target = BUILDS_DIR / name
+    if not is_complete(target):
+        raise ValueError(f"Build {name} is missing or incomplete")
+
+    tmp = BUILDS_DIR / f".current.{os.getpid()}.tmp"
+    tmp.unlink(missing_ok=True)
+    os.symlink(name, tmp)
+    os.replace(tmp, CURRENT_LINK)
+
+
+def switch(name: str):
+    """Atomically point builds/current at a complete build
+
+    Like a browser, publishing after a rollback drops the entries that were
+    rolled back over, so the next rollback returns to the build just left.
+    """
+
+    _point_current(name)
+
+    history = _history()
+    entries = history["entries"][:history["position"] + 1]
+    entries.append({"build": name, "at": time.time()})
+    _write_json(HISTORY_PATH, {"position": len(entries) - 1, "entries": entries})
+
+
+def rollback() -> str:
+    """Go back one history entry from the live one, skipping deleted builds
+
+    Repeated rollbacks keep walking back instead of flipping between two builds.
+    """
+
+    current = current_build()
+    history = _history()
+    for position in range(history["position"] - 1, -1, -1):
+        name = history["entries"][position]["build"]
+        if name != current and is_complete(BUILDS_DIR / name):
+            _point_current(name)
+            history["position"] = position
+            _write_json(HISTORY_PATH, history)
+            return name
+    raise ValueError("No earlier build to roll back to")
+
+
+def prune(keep: int = 5) -> list:
+    """Delete old builds, never the live one or the newest `keep`
+
+    Incomplete directories left by a killed or failed build are removed too,
+    unless the process that started them is still running.
+    """
+
+    current = current_build()
+    removed = []
+    for name in builds()[:-keep] if keep else builds():
+        if name != current:
+            shutil.rmtree(BUILDS_DIR / name)
+            removed.append(name)
+    for path in sorted(BUILDS_DIR.glob("*")):
+        if path.is_dir() and not path.is_symlink() and not is_complete(path) and not _owner_alive(path.name):
+            shutil.rmtree(path)
+            removed.append(path.name)
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Versioned, atomically published banner builds")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_build = sub.add_parser("build", help="render a manifest into a new build and publish it")
+    p_build.add_argument("--manifest", default=str(MANIFEST_PATH))
+    p_build.add_argument("--workers", type=int, default=2)
+    p_build.add_argument("--no-publish", action="store_true")
+    p_build.add_argument("--skip-budgets", action="store_true", help="do not enforce asset budgets")
+
+    p_switch = sub.add_parser("switch", help="publish an existing build")
+    p_switch.add_argument("name")
+
+    sub.add_parser("rollback", help="republish the previous build")
+    sub.add_parser("list", help="list complete builds")
+
+    p_prune = sub.add_parser("prune", help="delete old builds and abandoned incomplete ones")
+    p_prune.add_argument("--keep", type=int, default=5)
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build_dir = build(load_manifest(args.manifest), args.workers, budgets=not args.skip_budgets)
+        print(f"[+] Built {build_dir.name}")
+        if not args.no_publish:
+            switch(build_dir.name)
+            print(f"[OK] Live: {CURRENT_LINK} -> {build_dir.name}")
+    elif args.command == "switch":
+        switch(args.name)
+        print(f"[OK] Live: {args.name}")
+    elif args.command == "rollback":
+        print(f"[OK] Rolled back to {rollback()}")
+    elif args.command == "list":
+        current = current_build()
+        for name in builds():
+            print(f"{'*' if name == current else ' '} {name}")
+    else:
+        print(f"[+] Removed {len(prune(args.keep))} builds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Render Queue for Apega Desapega banners
+Coalesces identical in-flight render requests and serves them by priority
+"""
+
+import hashlib
+import heapq
+import itertools
+import json
+import threading
+from concurrent.futures import Future
+
+import template_registry
+
+# Priorities (lower runs first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DEFAULT = 5
+PRIORITY_BULK = 10
+
+
+def resolve_template(name: str):
+    """Look up a template function by name, loading its module on first use"""
+
+    return template_registry.load(name)
+
+
+def render_template(template: str, params: dict):
+    """Render a single job by calling its template function"""
+
+    return resolve_template(template)(**params)
+
+
+def job_key(template: str, params: dict) -> str:
+    """Content hash identifying a render job"""
+
+    payload = json.dumps(
+        {"template": template, "params": params},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=list,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RenderQueue:
+    """Priority queue in front of the templates with single-flight coalescing"""
+
+    def __init__(self, workers: int = 1, render=render_template):
+        self._render = render
+        self._heap = []
+        self._seq = itertools.count()
+        self._inflight = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self.stats = {"submitted": 0, "coalesced": 0, "rendered": 0, "failed": 0}
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"render-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, template: str, priority: int = PRIORITY_DEFAULT, **params) -> Future:
+        """Queue a render; identical in-flight jobs share one Future"""
+
+        key = job_key(template, params)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("RenderQueue is closed")
+            self.stats["submitted"] += 1
+
+            entry = self._inflight.get(key)
+            if entry is not None:
+                self.stats["coalesced"] += 1
+                # Promote a still-queued job if a more urgent caller joins it
+                if not entry["started"] and priority < entry["priority"]:
+                    entry["priority"] = priority
+                    heapq.heappush(self._heap, (priority, next(self._seq), key))
+                    self._cond.notify()
+                return entry["future"]
+
+            entry = {
+                "future": Future(),
+                "template": template,
+                "params": params,
+                "priority": priority,
+                "started": False,
+            }
+            self._inflight[key] = entry
+            heapq.heappush(self._heap, (priority, next(self._seq), key))
+            self._cond.notify()
+            return entry["future"]
+
+    def render(self, template: str, priority: int = PRIORITY_INTERACTIVE, **params):
+        """Queue a render and wait for its result"""
+
+        return self.submit(template, priority, **params).result()
+
+    def pending(self) -> int:
+        """Number of jobs queued or rendering"""
+
+        with self._cond:
+            return len(self._inflight)
+
+    def close(self, wait: bool = True):
+        """Stop accepting jobs; workers drain the queue before exiting"""
+
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _next_entry(self):
+        with self._cond:
+            while True:
+                while self._heap:
+                    _, _, key = heapq.heappop(self._heap)
+                    entry = self._inflight.get(key)
+                    # Skip stale heap slots left behind by promotions
+                    if entry is None or entry["started"]:
+                        continue
+                    entry["started"] = True
+                    return key, entry
+                if self._closed:
+                    return None, None
+                self._cond.wait()
+
+    def _worker(self):
+        while True:
+            key, entry = self._next_entry()
+            if entry is None:
+                return
+
+            future = entry["future"]
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = self._render(entry["template"], entry["params"])
+                except BaseException as exc:
+                    with self._cond:
+                        self.stats["failed"] += 1
+                    future.set_exception(exc)
+                else:
+                    with self._cond:
+                        self.stats["rendered"] += 1
+                    future.set_result(result)
+
+            with self._cond:
+                self._inflight.pop(key, None)
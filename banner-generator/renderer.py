@@ -0,0 +1,119 @@
+"""
+Shared renderer for Apega Desapega banners
+Reuses one Html2Image configuration per viewport size; html2image still
+launches Chrome per screenshot, so batches use warm pages where they can
+"""
+
+import contextlib
+import os
+import threading
+from pathlib import Path
+
+from html2image import Html2Image
+
+OUTPUT_DIR = Path(__file__).parent / "output"
+OUTPUT_DIR.mkdir(exist_ok=True)
+
+_renderers = {}
+_lock = threading.Lock()
+_output_dir = OUTPUT_DIR
+_scale = 1.0
+_capture = threading.local()
+
+
+def get_renderer(size: tuple, output_dir=None, scale: float = None) -> Html2Image:
+    """Return the shared Html2Image for a viewport, creating it on first use
+
+    This saves setting up the object, not the browser: every screenshot()
+    still starts a fresh Chrome process.
+    """
+
+    key = (tuple(size), str(output_dir or _output_dir), scale or _scale)
+    with _lock:
+        hti = _renderers.get(key)
+        if hti is None:
+            flags = ["--default-background-color=00000000", "--hide-scrollbars"]
+            if key[2] != 1:
+                flags.append(f"--force-device-scale-factor={key[2]}")
+            hti = Html2Image(output_path=key[1], size=key[0], custom_flags=flags)
+            _renderers[key] = hti
+        return hti
+
+
+def renderer_count() -> int:
+    """Number of viewport renderers set up so far"""
+
+    return len(_renderers)
+
+
+def output_dir() -> Path:
+    """Directory render_html currently writes into"""
+
+    return _output_dir
+
+
+@contextlib.contextmanager
+def output_to(path):
+    """Send every render in the block to another directory"""
+
+    global _output_dir
+    previous = _output_dir
+    _output_dir = Path(path)
+    _output_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        yield _output_dir
+    finally:
+        _output_dir = previous
+
+
+def current_scale() -> float:
+    """Device pixel ratio render_html currently screenshots at"""
+
+    return _scale
+
+
+@contextlib.contextmanager
+def device_scale(scale: float):
+    """Render every screenshot in the block at another device pixel ratio"""
+
+    global _scale
+    previous = _scale
+    _scale = scale
+    try:
+        yield scale
+    finally:
+        _scale = previous
+
+
+@contextlib.contextmanager
+def capture_html():
+    """Collect (html, filename, size) from template calls instead of rendering"""
+
+    previous = getattr(_capture, "pages", None)
+    pages = []
+    _capture.pages = pages
+    try:
+        yield pages
+    finally:
+        _capture.pages = previous
+
+
+def render_html(html: str, filename: str, size: tuple) -> str:
+    """Screenshot an HTML document into the output directory and return its path
+
+    The screenshot is taken under a private name and renamed into place,
+    so readers never see a half-written PNG and an existing output that is
+    a hardlink into the blob store is replaced rather than written through.
+    """
+
+    pages = getattr(_capture, "pages", None)
+    if pages is not None:
+        pages.append((html, filename, tuple(size)))
+        return filename
+
+    out = _output_dir
+    tmp = f".{os.getpid()}-{threading.get_ident()}-{filename}"
+    get_renderer(size, out).screenshot(html_str=html, save_as=tmp)
+    os.replace(out / tmp, out / filename)
+    print(f"Generated: {out / filename}")
+    return str(out / filename)
@@ -0,0 +1,152 @@
+"""
+Viewport-grouped batch scheduling for Apega Desapega banners
+Orders a batch so jobs sharing a viewport run back to back on one warm
+browser page (via Playwright, optional) instead of a Chrome launch per banner
+"""
+
+import argparse
+import tempfile
+import time
+
+from manifest import MANIFEST_PATH, load_manifest
+from renderer import capture_html, current_scale, output_dir, output_to
+from template_registry import TEMPLATES
+from warm_page import WarmBrowser, playwright_available
+
+# Viewport of every template, as passed to render_html
+VIEWPORTS = {name: spec["size"] for name, spec in TEMPLATES.items()}
+
+
+def viewport_of(job: dict) -> tuple:
+    """Viewport size a job renders at"""
+
+    return VIEWPORTS[job["template"]]
+
+
+def viewport_changes(jobs: list) -> int:
+    """How many times the viewport switches when running jobs in order"""
+
+    sizes = [viewport_of(job) for job in jobs]
+    return sum(1 for prev, cur in zip(sizes, sizes[1:]) if prev != cur)
+
+
+def plan_batch(jobs: list) -> list:
+    """Group jobs by viewport as [(size, jobs), ...]
+
+    Each size appears exactly once, so a full run sets up one page per
+    viewport and switches viewport (len(groups) - 1) times. Groups keep the
+    order in which their size first appears; jobs keep their manifest order.
+    """
+
+    groups = {}
+    for job in jobs:
+        groups.setdefault(viewport_of(job), []).append(job)
+    return list(groups.items())
+
+
+def ordered_jobs(jobs: list) -> list:
+    """Flatten a plan back into a single run order"""
+
+    return [job for _, group in plan_batch(jobs) for job in group]
+
+
+def run_batch(jobs: list, render=None, browser: WarmBrowser = None) -> dict:
+    """Render a batch group by group, on one warm page per viewport if given a browser
+
+    Without a browser every banner goes through render() and html2image,
+    which launches Chrome for each screenshot; grouping then only orders
+    the batch and saves nothing.
+    """
+
+    if render is None:
+        from render_queue import render_template as render
+
+    plan = plan_batch(jobs)
+    started = time.perf_counter()
+    outputs, timings = [], []
+
+    for size, group in plan:
+        print(f"\n[+] Viewport {size[0]}x{size[1]}: {len(group)} banners")
+        group_started = time.perf_counter()
+        page = browser.new_page(size, current_scale()) if browser else None
+        for job in group:
+            if page is None:
+                outputs.append(render(job["template"], job["params"]))
+                continue
+            with capture_html() as pages:
+                render(job["template"], job["params"])
+            html, filename, _ = pages[0]
+            page.load(html)
+            outputs.append(page.screenshot(output_dir() / filename))
+            print(f"Generated: {output_dir() / filename}")
+        timings.append({"size": size, "jobs": len(group), "seconds": time.perf_counter() - group_started})
+
+    return {
+        "outputs": outputs,
+        "groups": len(plan),
+        "viewport_changes": max(len(plan) - 1, 0),
+        "unplanned_viewport_changes": viewport_changes(jobs),
+        "timings": timings,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def compare_renderers(jobs: list, browser: WarmBrowser) -> dict:
+    """Seconds per banner for the jobs via html2image and via one warm page per viewport"""
+
+    result = {}
+    with tempfile.TemporaryDirectory() as tmp, output_to(tmp):
+        for name, warm in (("html2image", None), ("warm page", browser)):
+            stats = run_batch(jobs, browser=warm)
+            result[name] = stats["seconds"] / max(len(stats["outputs"]), 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a manifest grouped by viewport")
+    parser.add_argument("--manifest", default=str(MANIFEST_PATH))
+    parser.add_argument("--dry-run", action="store_true", help="print the plan only")
+    parser.add_argument("--compare", type=int, metavar="N",
+                        help="time N banners with html2image and with warm pages, then exit")
+    args = parser.parse_args()
+
+    jobs = load_manifest(args.manifest)
+    plan = plan_batch(jobs)
+
+    print("=" * 50)
+    print("[*] Viewport Plan")
+    print("=" * 50)
+    for size, group in plan:
+        print(f"  {size[0]}x{size[1]}: {len(group)} jobs")
+    print(f"  viewport changes: {viewport_changes(jobs)} in manifest order, "
+          f"{len(plan) - 1} planned")
+
+    if args.dry_run:
+        return
+
+    browser = WarmBrowser() if playwright_available() else None
+    if browser is None:
+        print("[!] Playwright not installed: html2image launches Chrome per banner, so grouping saves nothing")
+    try:
+        if args.compare:
+            if browser is None:
+                raise SystemExit("[!] --compare needs Playwright for the warm pages")
+            seconds = compare_renderers(jobs[:args.compare], browser)
+            print("\n" + "=" * 50)
+            for name, per_banner in seconds.items():
+                print(f"  {name:12} {per_banner * 1000:7.0f} ms/banner")
+            print(f"[+] Warm pages save {(1 - seconds['warm page'] / seconds['html2image']) * 100:.0f}%")
+            return
+        stats = run_batch(jobs, browser=browser)
+    finally:
+        if browser is not None:
+            browser.close()
+    print()
+    for t in stats["timings"]:
+        print(f"  {t['size'][0]}x{t['size'][1]}: {t['jobs']} banners, "
+              f"{t['seconds'] / t['jobs'] * 1000:.0f} ms/banner")
+    print(f"[OK] {len(stats['outputs'])} banners in {stats['seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
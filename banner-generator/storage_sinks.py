@@ -0,0 +1,306 @@
+"""
+Storage sinks for publishing Apega Desapega banners
+A filesystem sink and an HTTP object-store sink that uploads many files
+concurrently over pooled keep-alive connections, skipping unchanged ones
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import quote, unquote, urlsplit
+
+# Configuration
+OUTPUT_DIR = Path(__file__).parent / "output"
+HASH_HEADER = "x-content-sha256"
+# Keys are stable filenames that get overwritten, so caches must revalidate
+CACHE_CONTROL = "public, max-age=300"
+# Object metadata the stand-in store keeps and returns, like a real store
+STORED_HEADERS = ("Content-Type", "Cache-Control", HASH_HEADER)
+RETRIES = 3
+BACKOFF = 0.5
+
+
+def file_hash(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class StorageSink:
+    """Destination for finished banners"""
+
+    def remote_hash(self, key: str):
+        """Hash of what is stored under key, or None if absent/unknown"""
+
+        raise NotImplementedError
+
+    def upload(self, key: str, path: Path, digest: str):
+        raise NotImplementedError
+
+    def put(self, key: str, path, digest: str = None) -> bool:
+        """Store a file unless the same content is already there"""
+
+        digest = digest or file_hash(path)
+        if self.remote_hash(key) == digest:
+            return False
+        self.upload(key, Path(path), digest)
+        return True
+
+    def close(self):
+        pass
+
+
+class FilesystemSink(StorageSink):
+    """Copies files under a root directory"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def remote_hash(self, key: str):
+        dest = self.root / key
+        return file_hash(dest) if dest.exists() else None
+
+    def upload(self, key: str, path: Path, digest: str):
+        dest = self.root / key
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(f".{dest.name}.tmp")
+        shutil.copy2(path, tmp)
+        os.replace(tmp, dest)
+
+
+class HttpObjectStoreSink(StorageSink):
+    """PUT/HEAD object store client with a keep-alive connection pool
+
+    Objects are stored at <base_url>/<key> with their SHA-256 in the
+    x-content-sha256 header, which HEAD returns for skip-if-same checks.
+    """
+
+    def __init__(self, base_url: str, pool_size: int = 8, headers: dict = None,
+                 timeout: float = 30, retries: int = RETRIES, cache_control: str = CACHE_CONTROL):
+        url = urlsplit(base_url)
+        self.scheme = url.scheme
+        self.host = url.hostname
+        self.port = url.port
+        self.prefix = url.path.rstrip("/")
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.retries = retries
+        self.cache_control = cache_control
+        self.pool = queue.LifoQueue(maxsize=pool_size)
+        self.created = 0
+
+    def _connect(self):
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        self.created += 1
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def _request(self, method: str, key: str, body=None, headers: dict = None):
+        path = f"{self.prefix}/{quote(key)}"
+        headers = {**self.headers, **(headers or {})}
+        for attempt in range(self.retries + 1):
+            try:
+                conn = self.pool.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                if hasattr(body, "seek"):
+                    body.seek(0)
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                if attempt == self.retries:
+                    raise
+            else:
+                if resp.will_close:
+                    conn.close()
+                else:
+                    try:
+                        self.pool.put_nowait(conn)
+                    except queue.Full:
+                        conn.close()
+                if resp.status < 500 and resp.status != 429:
+                    return resp
+                if attempt == self.retries:
+                    return resp
+            time.sleep(BACKOFF * 2 ** attempt)
+
+    def remote_hash(self, key: str):
+        resp = self._request("HEAD", key)
+        return resp.getheader(HASH_HEADER) if resp.status == 200 else None
+
+    def upload(self, key: str, path: Path, digest: str):
+        with open(path, "rb") as body:
+            resp = self._request(
+                "PUT", key, body=body,
+                headers={
+                    "Content-Type": "image/png",
+                    "Content-Length": str(path.stat().st_size),
+                    "Cache-Control": self.cache_control,
+                    HASH_HEADER: digest,
+                },
+            )
+        if resp.status >= 300:
+            raise IOError(f"PUT {key} failed: HTTP {resp.status}")
+
+    def close(self):
+        while True:
+            try:
+                self.pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def publish(sink: StorageSink, paths: list, prefix: str = "", workers: int = 8) -> dict:
+    """Upload files concurrently; returns uploaded/skipped/failed counts"""
+
+    stats = {"uploaded": 0, "skipped": 0, "failed": 0, "bytes": 0, "errors": []}
+    lock = threading.Lock()
+
+    def one(path):
+        path = Path(path)
+        key = f"{prefix}/{path.name}" if prefix else path.name
+        try:
+            uploaded = sink.put(key, path)
+        except Exception as exc:
+            with lock:
+                stats["failed"] += 1
+                stats["errors"].append((key, exc))
+            return
+        with lock:
+            if uploaded:
+                stats["uploaded"] += 1
+                stats["bytes"] += path.stat().st_size
+            else:
+                stats["skipped"] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(one, paths))
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+class _LocalStoreHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _path(self):
+        rel = Path(unquote(urlsplit(self.path).path).lstrip("/"))
+        if ".." in rel.parts:
+            return None
+        return self.server.root / rel
+
+    def _meta_path(self, path):
+        return path.with_name(f".{path.name}.headers.json")
+
+    def _send_object_headers(self, path, length: int):
+        self.send_response(200)
+        self.send_header("Content-Length", str(length))
+        if self._meta_path(path).exists():
+            for name, value in json.loads(self._meta_path(path).read_text()).items():
+                self.send_header(name, value)
+        self.end_headers()
+
+    def do_HEAD(self):
+        path = self._path()
+        if path is None or not path.is_file():
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._send_object_headers(path, path.stat().st_size)
+
+    def do_GET(self):
+        path = self._path()
+        if path is None or not path.is_file():
+            self.do_HEAD()
+            return
+        data = path.read_bytes()
+        self._send_object_headers(path, len(data))
+        self.wfile.write(data)
+
+    def do_PUT(self):
+        path = self._path()
+        data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if path is None:
+            self.send_response(400)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+            meta = {name: self.headers[name] for name in STORED_HEADERS if self.headers.get(name)}
+            meta[HASH_HEADER] = hashlib.sha256(data).hexdigest()
+            self._meta_path(path).write_text(json.dumps(meta))
+            self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_local_store(root, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """Stand-in object store for development; call serve_forever() on it"""
+
+    server = ThreadingHTTPServer((host, port), _LocalStoreHandler)
+    server.root = Path(root)
+    server.root.mkdir(parents=True, exist_ok=True)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish banners to a storage sink")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_upload = sub.add_parser("upload", help="upload outputs to an HTTP object store")
+    p_upload.add_argument("url")
+    p_upload.add_argument("files", nargs="*")
+    p_upload.add_argument("--prefix", default="")
+    p_upload.add_argument("--workers", type=int, default=8)
+    p_upload.add_argument("--token", default=os.environ.get("BANNER_STORE_TOKEN"))
+
+    p_copy = sub.add_parser("copy", help="copy outputs into a directory")
+    p_copy.add_argument("dest")
+    p_copy.add_argument("files", nargs="*")
+    p_copy.add_argument("--prefix", default="")
+
+    p_serve = sub.add_parser("serve", help="run the local stand-in object store")
+    p_serve.add_argument("root")
+    p_serve.add_argument("--port", type=int, default=8765)
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        print(f"[+] Serving {args.root} on http://127.0.0.1:{args.port}")
+        serve_local_store(args.root, port=args.port).serve_forever()
+        return
+
+    files = args.files or sorted(p for p in OUTPUT_DIR.glob("*.png") if not p.name.startswith("."))
+    if args.command == "upload":
+        headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+        sink = HttpObjectStoreSink(args.url, pool_size=args.workers, headers=headers)
+        stats = publish(sink, files, args.prefix, args.workers)
+    else:
+        sink = FilesystemSink(args.dest)
+        stats = publish(sink, files, args.prefix, workers=4)
+    sink.close()
+
+    print(f"[+] Uploaded {stats['uploaded']}, skipped {stats['skipped']}, failed {stats['failed']} "
+          f"({stats['bytes'] / 1024:.0f} KB in {stats['seconds']:.2f}s)")
+    for key, exc in stats["errors"]:
+        print(f"[!] {key}: {exc}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+"""
+SVG export for the flat Apega Desapega templates
+Redraws category, feature, brand, cashback and promo banners as vector
+graphics that the app can rasterize at any density, with text outlined as
+paths (or embedded fonts) and a size comparison against the PNG pipeline
+"""
+
+import argparse
+import base64
+import gzip
+import io
+import math
+import re
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from backgrounds import parse_color
+from fonts import FONT_FILES, FONTS_DIR, font_path
+from manifest import MANIFEST_PATH, load_manifest
+from text_fit import measure
+
+# Configuration
+OUTPUT_DIR = Path(__file__).parent / "output"
+SVG_DIR = OUTPUT_DIR / "svg"
+# CSS "line-height: normal" of each face (hhea ascent + descent)
+LINE_HEIGHT = {"Inter": 1.21, "Playfair Display": 1.333, "emoji": 1.17}
+FALLBACKS = {"Inter": "Inter, sans-serif", "Playfair Display": "'Playfair Display', serif"}
+
+
+def _paint(color) -> tuple:
+    """CSS color -> (#rrggbb, opacity) for SVG attributes"""
+
+    r, g, b, a = parse_color(color)
+    return f"#{round(r * 255):02x}{round(g * 255):02x}{round(b * 255):02x}", round(float(a), 3)
+
+
+def _fill(color, attr: str = "fill") -> str:
+    hex_color, opacity = _paint(color)
+    return f'{attr}="{hex_color}"' + (f' {attr}-opacity="{opacity}"' if opacity < 1 else "")
+
+
+def _has_emoji(text: str) -> bool:
+    return any(ord(ch) > 0x2500 for ch in text)
+
+
+def _column(blocks: list, height: float, top: float = 0) -> list:
+    """Centers of vertically stacked (height, margin_top, margin_bottom) blocks in a centered column"""
+
+    total = sum(h + mt + mb for h, mt, mb in blocks)
+    y = top + (height - total) / 2
+    centers = []
+    for h, mt, mb in blocks:
+        y += mt
+        centers.append(y + h / 2)
+        y += h + mb
+    return centers
+
+
+def _line(family: str, size: float) -> float:
+    return size * LINE_HEIGHT[family]
+
+
+class SvgCanvas:
+    """Minimal SVG builder with CSS-like gradients and outlined or live text
+
+    mode is "outline" (glyphs as paths, needs fontTools and the TTFs),
+    "embed" (@font-face data URIs, subset when fontTools is available) or
+    "reference" (font-family names only).
+    """
+
+    def __init__(self, width: int, height: int, mode: str = "outline"):
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.defs = []
+        self.body = []
+        self.used = {}
+        self._ids = 0
+        self._faces = {}
+
+    def _id(self, prefix: str) -> str:
+        self._ids += 1
+        return f"{prefix}{self._ids}"
+
+    def gradient(self, colors, x: float, y: float, w: float, h: float, angle: float = 135) -> str:
+        """CSS linear-gradient(angle, ...) over a box, in user space"""
+
+        gid = self._id("g")
+        rad = math.radians(angle)
+        dx, dy = math.sin(rad), -math.cos(rad)
+        half = (abs(w * dx) + abs(h * dy)) / 2
+        cx, cy = x + w / 2, y + h / 2
+        stops = "".join(
+            f'<stop offset="{i / (len(colors) - 1):g}" {_fill(c, "stop-color")}/>'
+            for i, c in enumerate(colors)
+        )
+        self.defs.append(
+            f'<linearGradient id="{gid}" gradientUnits="userSpaceOnUse" '
+            f'x1="{cx - dx * half:.2f}" y1="{cy - dy * half:.2f}" x2="{cx + dx * half:.2f}" y2="{cy + dy * half:.2f}">'
+            f"{stops}</linearGradient>"
+        )
+        return f'fill="url(#{gid})"'
+
+    def shadow(self, dy: float, blur: float, color) -> str:
+        fid = self._id("f")
+        hex_color, opacity = _paint(color)
+        self.defs.append(
+            f'<filter id="{fid}" x="-20%" y="-20%" width="140%" height="160%">'
+            f'<feDropShadow dx="0" dy="{dy}" stdDeviation="{blur / 2}" flood-color="{hex_color}" '
+            f'flood-opacity="{opacity}"/></filter>'
+        )
+        return f'filter="url(#{fid})"'
+
+    def rect(self, x, y, w, h, paint: str, rx: float = 0, extra: str = ""):
+        self.body.append(f'<rect x="{x:g}" y="{y:g}" width="{w:g}" height="{h:g}" rx="{rx:g}" {paint} {extra}/>')
+
+    def circle(self, cx, cy, r, paint: str):
+        self.body.append(f'<circle cx="{cx:g}" cy="{cy:g}" r="{r:g}" {paint}/>')
+
+    def stripes(self, color, start: float, end: float, period: float):
+        """repeating-linear-gradient(45deg, transparent start, color start..end)"""
+
+        pid = self._id("p")
+        self.defs.append(
+            f'<pattern id="{pid}" patternUnits="userSpaceOnUse" width="{period:g}" height="{period:g}" '
+            f'patternTransform="rotate(-45)"><rect x="{start:g}" width="{end - start:g}" '
+            f'height="{period:g}" {_fill(color)}/></pattern>'
+        )
+        self.rect(0, 0, self.width, self.height, f'fill="url(#{pid})"')
+
+    def text(self, text: str, x: float, cy: float, family: str, weight: int, size: float, color,
+             anchor: str = "middle", letter_spacing: float = 0, extra: str = ""):
+        """One line of text vertically centered on cy"""
+
+        if not text:
+            return
+        if self.mode == "outline" and not _has_emoji(text):
+            path = _outline(text, x, cy, family, weight, size, anchor, letter_spacing)
+            if path is not None:
+                self.body.append(f'<path d="{path}" {_fill(color)} {extra}/>')
+                return
+        self.used.setdefault((family, weight), set()).update(text)
+        spacing = f' letter-spacing="{letter_spacing:g}"' if letter_spacing else ""
+        self.body.append(
+            f'<text x="{x:g}" y="{cy:g}" text-anchor="{anchor}" dominant-baseline="central" '
+            f'font-family="{FALLBACKS.get(family, family)}" font-weight="{weight}" font-size="{size:g}"'
+            f'{spacing} {_fill(color)} {extra}>{escape(text)}</text>'
+        )
+
+    def _font_faces(self) -> str:
+        if self.mode != "embed":
+            return ""
+        rules = []
+        for (family, weight), chars in self.used.items():
+            path = font_path(family, weight)
+            if path is None:
+                continue
+            data = _subset_font(path, chars)
+            rules.append(
+                f"@font-face{{font-family:'{family}';font-weight:{weight};"
+                f"src:url(data:font/ttf;base64,{base64.b64encode(data).decode('ascii')})}}"
+            )
+        return f"<style>{''.join(rules)}</style>" if rules else ""
+
+    def to_string(self) -> str:
+        defs = self._font_faces() + "".join(self.defs)
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{self.height}" '
+            f'viewBox="0 0 {self.width} {self.height}">'
+            + (f"<defs>{defs}</defs>" if defs else "")
+            + "".join(self.body)
+            + "</svg>"
+        )
+
+
+_tt_fonts = {}
+
+
+def _outline(text, x, cy, family, weight, size, anchor, letter_spacing):
+    """Glyph outlines of a text line as one SVG path, or None without fontTools/TTF"""
+
+    path = font_path(family, weight)
+    if path is None:
+        return None
+    try:
+        from fontTools.pens.svgPathPen import SVGPathPen
+        from fontTools.pens.transformPen import TransformPen
+        from fontTools.ttLib import TTFont
+    except ImportError:
+        return None
+
+    if path not in _tt_fonts:
+        _tt_fonts[path] = TTFont(str(path))
+    font = _tt_fonts[path]
+    glyphs = font.getGlyphSet()
+    cmap = font.getBestCmap()
+    scale = size / font["head"].unitsPerEm
+    names = [cmap.get(ord(ch), ".notdef") for ch in text]
+
+    width = sum(glyphs[n].width * scale + letter_spacing for n in names)
+    left = x - width / 2 if anchor == "middle" else x - width if anchor == "end" else x
+    hhea = font["hhea"]
+    baseline = cy + (hhea.ascent + hhea.descent) / 2 * scale
+
+    pen = SVGPathPen(glyphs, ntos=lambda v: f"{v:.1f}")
+    cursor = left
+    for name in names:
+        glyphs[name].draw(TransformPen(pen, (scale, 0, 0, -scale, cursor, baseline)))
+        cursor += glyphs[name].width * scale + letter_spacing
+    return pen.getCommands()
+
+
+def _subset_font(path: Path, chars: set) -> bytes:
+    """Font bytes limited to the characters used, when fontTools is available"""
+
+    try:
+        from fontTools import subset
+    except ImportError:
+        return path.read_bytes()
+    options = subset.Options()
+    font = subset.load_font(str(path), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(text="".join(chars))
+    subsetter.subset(font)
+    buf = io.BytesIO()
+    font.save(buf)
+    return buf.getvalue()
+
+
+def _slot(family: str, weight: int, letter_spacing: float = 0) -> dict:
+    return {"family": family, "weight": weight, "letter_spacing": letter_spacing, "width": 10 ** 6}
+
+
+# Vector versions of the flat templates; geometry follows the template CSS
+
+def category_card_svg(category: str, item_count: int, icon: str = "👗",
+                      gradient_colors: tuple = ("#E8D5C4", "#D4A574"), mode: str = "outline", **_) -> str:
+    svg = SvgCanvas(300, 200, mode)
+    clip = svg._id("c")
+    svg.defs.append(f'<clipPath id="{clip}"><rect width="300" height="200" rx="20"/></clipPath>')
+    svg.body.append(f'<g clip-path="url(#{clip})">')
+    svg.rect(0, 0, 300, 200, svg.gradient(gradient_colors, 0, 0, 300, 200))
+    svg.circle(255, 25, 75, _fill("rgba(255,255,255,0.15)"))
+    icon_y, name_y, count_y = _column(
+        [(_line("emoji", 48), 0, 12), (_line("Inter", 20), 0, 4), (_line("Inter", 14), 0, 0)], 200)
+    svg.text(icon, 150, icon_y, "emoji", 400, 48, "#FFFFFF")
+    svg.text(category.upper(), 150, name_y, "Inter", 700, 20, "#FFFFFF", letter_spacing=1)
+    svg.text(f"{item_count} peças", 150, count_y, "Inter", 400, 14, "rgba(255,255,255,0.8)")
+    svg.body.append("</g>")
+    return svg.to_string()
+
+
+def feature_banner_svg(icon: str, title: str, description: str, bg_color: str = "#FAF8F5",
+                       accent_color: str = "#D4A574", mode: str = "outline", **_) -> str:
+    from text_fit import wrap
+
+    svg = SvgCanvas(400, 300, mode)
+    svg.rect(0.5, 0.5, 399, 299, f'{_fill(bg_color)} {_fill("rgba(0,0,0,0.05)", "stroke")}', rx=24)
+    lines = wrap(description, dict(_slot("Inter", 400), width=300), 15) or [description]
+    blocks = [(80, 0, 20), (_line("Inter", 22), 0, 12)] + [(15 * 1.6, 0, 0)] * len(lines)
+    centers = _column(blocks, 300)
+    svg.circle(200, centers[0], 40, svg.gradient((accent_color + "20", accent_color + "40"), 160, centers[0] - 40, 80, 80))
+    svg.text(icon, 200, centers[0], "emoji", 400, 36, "#000000")
+    svg.text(title, 200, centers[1], "Inter", 700, 22, "#2D2D2D")
+    for line, cy in zip(lines, centers[2:]):
+        svg.text(line, 200, cy, "Inter", 400, 15, "#6B6B6B")
+    return svg.to_string()
+
+
+def brand_highlight_svg(brand_name: str, tagline: str = "Peças selecionadas", logo_url: str = None,
+                        bg_color: str = "#FFFFFF", text_color: str = "#2D2D2D", mode: str = "outline", **_) -> str:
+    if logo_url:
+        raise ValueError("brand highlights with a logo image stay PNG")
+    svg = SvgCanvas(350, 200, mode)
+    svg.rect(0.5, 0.5, 349, 199, f'{_fill(bg_color)} {_fill("rgba(0,0,0,0.08)", "stroke")}', rx=16)
+    logo_y, name_y, tag_y = _column([(60, 0, 16), (_line("Inter", 20), 0, 4), (_line("Inter", 13), 0, 0)], 200)
+    svg.rect(145, logo_y - 30, 60, 60, svg.gradient(("#D4A574", "#8B7355"), 145, logo_y - 30, 60, 60), rx=12)
+    svg.text(brand_name[0], 175, logo_y, "Inter", 700, 24, "#FFFFFF")
+    svg.text(brand_name, 175, name_y, "Inter", 700, 20, text_color)
+    svg.text(tagline, 175, tag_y, "Inter", 400, 13, "#6B6B6B")
+    return svg.to_string()
+
+
+def cashback_banner_svg(percentage: str = "5%", title: str = "CASHBACK EM TODAS AS COMPRAS",
+                        subtitle: str = "Ganhe de volta em cada compra", mode: str = "outline", **_) -> str:
+    svg = SvgCanvas(800, 400, mode)
+    svg.rect(0, 0, 800, 400, svg.gradient(("#4CAF50", "#2E7D32"), 0, 0, 800, 400))
+    svg.circle(600, 40, 100, _fill("rgba(255,255,255,0.1)"))
+    svg.circle(550, 310, 50, _fill("rgba(255,255,255,0.08)"))
+
+    badge_h = _line("Inter", 12) + 16
+    badge_y, title_y, sub_y = _column(
+        [(badge_h, 0, 16), (_line("Inter", 32), 0, 8), (_line("Inter", 16), 0, 0)], 400)
+    badge = "💰 CASHBACK"
+    badge_w = measure(badge, _slot("Inter", 600, 1), 12) + 32
+    svg.rect(60, badge_y - badge_h / 2, badge_w, badge_h, _fill("rgba(255,255,255,0.2)"), rx=badge_h / 2)
+    svg.text(badge, 60 + badge_w / 2, badge_y, "Inter", 600, 12, "#FFFFFF", letter_spacing=1)
+    svg.text(title, 60, title_y, "Inter", 700, 32, "#FFFFFF", anchor="start", letter_spacing=2)
+    svg.text(subtitle, 60, sub_y, "Inter", 400, 16, "rgba(255,255,255,0.8)", anchor="start")
+
+    column_w = max(measure(percentage, _slot("Playfair Display", 700), 100),
+                   measure("DE VOLTA", _slot("Inter", 400, 3), 14))
+    pct_y, label_y = _column([(100, 0, 8), (_line("Inter", 14), 0, 0)], 400)
+    cx = 740 - column_w / 2
+    svg.text(percentage, cx, pct_y, "Playfair Display", 700, 100, "#FFFFFF",
+             extra=svg.shadow(4, 20, "rgba(0,0,0,0.2)"))
+    svg.text("DE VOLTA", cx, label_y, "Inter", 400, 14, "rgba(255,255,255,0.8)", letter_spacing=3)
+    return svg.to_string()
+
+
+def promo_banner_svg(discount: str, title: str, subtitle: str = "", badge_text: str = "OFERTA ESPECIAL",
+                     bg_color: str = "#1A1A1A", accent_color: str = "#D4A574", mode: str = "outline", **_) -> str:
+    svg = SvgCanvas(800, 400, mode)
+    svg.rect(0, 0, 800, 400, _fill(bg_color))
+    svg.stripes("rgba(255,255,255,0.02)", 35, 70, 70)
+    svg.circle(400, 200, 199.5, f'fill="none" {_fill(accent_color + "20", "stroke")}')
+    svg.circle(400, 200, 249.5, f'fill="none" {_fill(accent_color + "10", "stroke")}')
+
+    badge_h = _line("Inter", 12) + 16
+    blocks = [(badge_h, 0, 20), (120, 0, 0), (_line("Inter", 24), 16, 8)]
+    if subtitle:
+        blocks.append((_line("Inter", 14), 0, 0))
+    centers = _column(blocks, 400)
+    badge_w = measure(badge_text, _slot("Inter", 600, 2), 12) + 40
+    svg.rect(400 - badge_w / 2, centers[0] - badge_h / 2, badge_w, badge_h, _fill(accent_color), rx=badge_h / 2)
+    svg.text(badge_text, 400, centers[0], "Inter", 600, 12, "#FFFFFF", letter_spacing=2)
+    svg.text(discount, 400, centers[1], "Playfair Display", 700, 120, accent_color,
+             extra=svg.shadow(4, 20, "rgba(212,165,116,0.3)"))
+    svg.text(title, 400, centers[2], "Inter", 600, 24, "#FFFFFF", letter_spacing=3)
+    if subtitle:
+        svg.text(subtitle, 400, centers[3], "Inter", 400, 14, "rgba(255,255,255,0.6)")
+    return svg.to_string()
+
+
+SVG_TEMPLATES = {
+    "generate_category_card": category_card_svg,
+    "generate_feature_banner": feature_banner_svg,
+    "generate_brand_highlight": brand_highlight_svg,
+    "generate_cashback_banner": cashback_banner_svg,
+    "generate_promo_banner": promo_banner_svg,
+}
+
+
+def default_mode() -> str:
+    try:
+        import fontTools  # noqa: F401
+    except ImportError:
+        return "reference"
+    return "outline" if font_path("Inter") else "reference"
+
+
+def export(jobs: list, svg_dir=SVG_DIR, mode: str = None) -> list:
+    """Write SVGs for every flat job; returns rows comparing them with the PNGs"""
+
+    mode = mode or default_mode()
+    svg_dir = Path(svg_dir)
+    svg_dir.mkdir(parents=True, exist_ok=True)
+    rows = []
+    for job in jobs:
+        draw = SVG_TEMPLATES.get(job["template"])
+        if draw is None:
+            continue
+        try:
+            data = draw(mode=mode, **job["params"]).encode("utf-8")
+        except ValueError as exc:
+            print(f"[!] {job['params']['filename']}: {exc}")
+            continue
+        png = OUTPUT_DIR / job["params"]["filename"]
+        svg_path = svg_dir / (Path(png.name).stem + ".svg")
+        svg_path.write_bytes(data)
+        densities = {}
+        for suffix in ("", "@2x", "@3x"):
+            variant = png.with_name(f"{png.stem}{suffix}{png.suffix}")
+            if variant.exists():
+                densities[suffix or "@1x"] = variant.stat().st_size
+        rows.append({"file": svg_path.name, "svg": len(data), "svg_gz": len(gzip.compress(data, 9)),
+                     "png": densities, "fonts": referenced_fonts(data.decode("utf-8"))})
+    return rows
+
+
+def referenced_fonts(svg: str) -> set:
+    """(family, weight) of every live text face an SVG needs at display time"""
+
+    families = {value: family for family, value in FALLBACKS.items()}
+    return {
+        (families.get(family, family), int(weight))
+        for family, weight in re.findall(r'<text [^>]*font-family="([^"]+)" font-weight="(\d+)"', svg)
+        if family != "emoji"
+    }
+
+
+def font_weight(fonts: set):
+    """Bytes of the TTFs behind a set of faces, None if any of them is missing"""
+
+    paths = {font_path(family, weight) for family, weight in fonts}
+    if None in paths:
+        return None
+    return sum(path.stat().st_size for path in paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export flat templates as SVG and compare with PNG")
+    parser.add_argument("--manifest", default=str(MANIFEST_PATH))
+    parser.add_argument("--out", default=str(SVG_DIR))
+    parser.add_argument("--mode", choices=["outline", "embed", "reference"],
+                        help="text as paths, embedded fonts or font names (default: outline if possible)")
+    args = parser.parse_args()
+
+    mode = args.mode or default_mode()
+    if mode == "reference" and not args.mode:
+        # The shipped tree has no TTFs, so this is what runs out of the box
+        print(f"[!] fontTools or the TTFs in {FONTS_DIR} are missing: falling back to reference mode, "
+              "where text names its font and the PNG size comparison needs those font files")
+    elif mode == "reference":
+        print("[!] Text references fonts by name; install fontTools and add TTFs to assets/fonts to outline it")
+    rows = export(load_manifest(args.manifest), args.out, mode)
+
+    # Reference-mode SVGs only render with the fonts installed in the app,
+    # so those fonts are part of what the SVG route ships
+    fonts = set().union(*(r["fonts"] for r in rows)) if mode == "reference" else set()
+    font_total = font_weight(fonts)
+    compare = font_total is not None
+
+    print("=" * 50)
+    print(f"[*] SVG export ({mode})" + (" vs PNG" if compare else ""))
+    print("=" * 50)
+    print(f"  {'file':30} {'svg':>8} {'svg.gz':>8}" + (f" {'png':>24}" if compare else ""))
+    for r in rows:
+        pngs = " ".join(f"{k} {v / 1024:.1f}K" for k, v in r["png"].items()) or "-"
+        print(f"  {r['file'][:30]:30} {r['svg'] / 1024:7.1f}K {r['svg_gz'] / 1024:7.1f}K"
+              + (f" {pngs:>24}" if compare else ""))
+    svg_total = sum(r["svg"] for r in rows)
+    png_total = sum(sum(r["png"].values()) for r in rows)
+    if not compare:
+        print(f"\n[+] {len(rows)} SVGs, {svg_total / 1024:.0f} KB without the {len(fonts)} fonts they reference")
+        needed = sorted({FONT_FILES.get((family, weight, False), f"{family} {weight}") for family, weight in fonts})
+        print(f"[!] No PNG comparison: the SVGs need {', '.join(needed)} in {FONTS_DIR} to be weighed")
+    elif fonts:
+        print(f"\n[+] {len(rows)} SVGs ({mode}), {svg_total / 1024:.0f} KB + {font_total / 1024:.0f} KB "
+              f"of fonts ({len(fonts)} faces) vs {png_total / 1024:.0f} KB of PNG")
+    else:
+        print(f"\n[+] {len(rows)} SVGs ({mode}), {svg_total / 1024:.0f} KB vs {png_total / 1024:.0f} KB of PNG")
+
+
+if __name__ == "__main__":
+    main()
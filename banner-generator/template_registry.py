@@ -0,0 +1,233 @@
+"""
+Template registry for Apega Desapega banners
+Declares every template's viewport, parameters, assets and cost hint as
+data, and imports the template code only when a template is actually used
+"""
+
+import argparse
+import importlib
+import threading
+
+from manifest import MANIFEST_PATH, load_manifest
+
+# Parameter types: str, int, float, color, colors (gradient pair), url, emoji.
+# A trailing "?" marks an optional parameter (it has a default).
+# effects: paint-heavy CSS effects (shadows, gradients, transforms, opacity),
+# the cost hint used by cost_model before timings exist.
+TEMPLATES = {
+    "generate_hero_banner": {
+        "module": "banner_generator",
+        "size": (800, 400),
+        "params": {"title": "str", "subtitle": "str", "cta_text": "str?", "image_url": "url?",
+                   "gradient_colors": "colors?"},
+        "assets": {"fonts": {"Playfair Display": [400, 600, 700], "Inter": [400, 500, 600]},
+                   "emoji": [], "remote": ["image_url"]},
+        "effects": 3,
+    },
+    "generate_promo_banner": {
+        "module": "banner_generator",
+        "size": (800, 400),
+        "params": {"discount": "str", "title": "str", "subtitle": "str?", "badge_text": "str?",
+                   "bg_color": "color?", "accent_color": "color?"},
+        "assets": {"fonts": {"Playfair Display": [700], "Inter": [400, 600, 700]},
+                   "emoji": [], "remote": []},
+        "effects": 4,
+    },
+    "generate_category_card": {
+        "module": "banner_generator",
+        "size": (300, 200),
+        "params": {"category": "str", "item_count": "int", "icon": "emoji?", "gradient_colors": "colors?"},
+        "assets": {"fonts": {"Inter": [500, 600, 700]}, "emoji": ["icon"], "remote": []},
+        "effects": 2,
+    },
+    "generate_feature_banner": {
+        "module": "banner_generator",
+        "size": (400, 300),
+        "params": {"icon": "emoji", "title": "str", "description": "str", "bg_color": "color?",
+                   "accent_color": "color?"},
+        "assets": {"fonts": {"Inter": [400, 600, 700]}, "emoji": ["icon"], "remote": []},
+        "effects": 1,
+    },
+    "generate_cashback_banner": {
+        "module": "banner_generator",
+        "size": (800, 400),
+        "params": {"percentage": "str?", "title": "str?", "subtitle": "str?"},
+        "assets": {"fonts": {"Playfair Display": [700], "Inter": [400, 600, 700]},
+                   "emoji": ["💰"], "remote": []},
+        "effects": 2,
+    },
+    "generate_brand_highlight": {
+        "module": "banner_generator",
+        "size": (350, 200),
+        "params": {"brand_name": "str", "tagline": "str?", "logo_url": "url?", "bg_color": "color?",
+                   "text_color": "color?"},
+        "assets": {"fonts": {"Inter": [400, 600, 700]}, "emoji": [], "remote": ["logo_url"]},
+        "effects": 2,
+    },
+    "generate_sustainability_banner": {
+        "module": "banner_generator",
+        "size": (800, 400),
+        "params": {"stat_number": "str?", "stat_label": "str?", "title": "str?", "subtitle": "str?"},
+        "assets": {"fonts": {"Playfair Display": [600], "Inter": [400, 500, 600]},
+                   "emoji": ["🌱", "🌿"], "remote": []},
+        "effects": 6,
+    },
+    "generate_product_showcase": {
+        "module": "advanced_templates",
+        "size": (800, 500),
+        "params": {"product_name": "str", "brand": "str", "original_price": "str", "sale_price": "str",
+                   "discount_percent": "str", "image_url": "url?", "product_name_size": "int?",
+                   "gradient_colors": "colors?"},
+        "assets": {"fonts": {"Playfair Display": [600, 700], "Inter": [400, 500, 600, 700]},
+                   "emoji": ["✓", "👗", "🚚"], "remote": ["image_url"]},
+        "effects": 6,
+    },
+    "generate_testimonial_banner": {
+        "module": "advanced_templates",
+        "size": (800, 350),
+        "params": {"quote": "str", "author_name": "str", "author_location": "str?", "rating": "int?",
+                   "avatar_url": "url?", "quote_size": "int?"},
+        "assets": {"fonts": {"Playfair Display": [400, 600, "400i"], "Inter": [400, 500, 600]},
+                   "emoji": ["⭐"], "remote": ["avatar_url"]},
+        "effects": 3,
+    },
+    "generate_collection_banner": {
+        "module": "advanced_templates",
+        "size": (800, 400),
+        "params": {"collection_name": "str", "item_count": "int", "description": "str",
+                   "gradient_colors": "colors?", "accent_color": "color?", "collection_name_size": "int?"},
+        "assets": {"fonts": {"Playfair Display": [400, 600, 700], "Inter": [400, 500, 600]},
+                   "emoji": [], "remote": []},
+        "effects": 4,
+    },
+    "generate_flash_sale_banner": {
+        "module": "advanced_templates",
+        "size": (800, 300),
+        "params": {"hours": "int?", "minutes": "int?", "seconds": "int?", "discount": "str?"},
+        "assets": {"fonts": {"Inter": [400, 600, 700, 800]}, "emoji": ["⚡"], "remote": []},
+        "effects": 3,
+    },
+    "generate_seller_spotlight": {
+        "module": "advanced_templates",
+        "size": (800, 350),
+        "params": {"seller_name": "str", "rating": "float?", "sales_count": "int?", "items_count": "int?",
+                   "avatar_url": "url?", "gradient_colors": "colors?"},
+        "assets": {"fonts": {"Playfair Display": [600], "Inter": [400, 500, 600, 700]},
+                   "emoji": ["⭐"], "remote": ["avatar_url"]},
+        "effects": 3,
+    },
+}
+
+_PY_TYPES = {"str": str, "int": int, "float": (int, float), "color": str, "url": str, "emoji": str,
+             "colors": (list, tuple)}
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def spec(name: str) -> dict:
+    """Declared metadata of a template"""
+
+    try:
+        return TEMPLATES[name]
+    except KeyError:
+        raise KeyError(f"Unknown template: {name}") from None
+
+
+def names() -> list:
+    return list(TEMPLATES)
+
+
+def load(name: str):
+    """Template function, importing its module on first use"""
+
+    fn = _loaded.get(name)
+    if fn is None:
+        module_name = spec(name)["module"]
+        with _lock:
+            fn = _loaded[name] = getattr(importlib.import_module(module_name), name)
+    return fn
+
+
+def reset():
+    """Forget loaded functions, e.g. after the template modules were reloaded"""
+
+    with _lock:
+        _loaded.clear()
+
+
+def validate(name: str, params: dict) -> list:
+    """Problems with a job's params against the declared schema (empty if fine)"""
+
+    schema = spec(name)["params"]
+    problems = []
+    for param, kind in schema.items():
+        if not kind.endswith("?") and param not in params:
+            problems.append(f"{name}: missing {param}")
+    for param, value in params.items():
+        if param == "filename":
+            continue
+        kind = schema.get(param)
+        if kind is None:
+            problems.append(f"{name}: unknown param {param}")
+        elif value is not None and not isinstance(value, _PY_TYPES[kind.rstrip("?")]):
+            problems.append(f"{name}: {param} should be {kind.rstrip('?')}, got {type(value).__name__}")
+    return problems
+
+
+def remote_params(name: str) -> list:
+    return spec(name)["assets"]["remote"]
+
+
+def plan(jobs: list) -> list:
+    """Viewport groups with job counts, pixel area and effect load, from metadata only"""
+
+    groups = {}
+    for job in jobs:
+        s = spec(job["template"])
+        group = groups.setdefault(s["size"], {"size": s["size"], "jobs": 0, "templates": set(),
+                                              "effects": 0, "remote": 0, "fonts": set()})
+        group["jobs"] += 1
+        group["templates"].add(job["template"])
+        group["effects"] += s["effects"]
+        group["remote"] += sum(1 for p in s["assets"]["remote"] if job["params"].get(p))
+        for family, weights in s["assets"]["fonts"].items():
+            group["fonts"].update(f"{family} {w}" for w in weights)
+    return list(groups.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect templates and plan batches without loading them")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="list registered templates")
+    p_plan = sub.add_parser("plan", help="plan a manifest by viewport")
+    p_plan.add_argument("--manifest", default=str(MANIFEST_PATH))
+    p_check = sub.add_parser("validate", help="check manifest params against the schemas")
+    p_check.add_argument("--manifest", default=str(MANIFEST_PATH))
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for name, s in TEMPLATES.items():
+            w, h = s["size"]
+            required = [p for p, k in s["params"].items() if not k.endswith("?")]
+            print(f"{name:32} {w}x{h:<4} effects={s['effects']:<2} {s['module']:20} requires {', '.join(required) or '-'}")
+    elif args.command == "plan":
+        jobs = load_manifest(args.manifest)
+        print("=" * 50)
+        print(f"[*] {len(jobs)} jobs in {len(plan(jobs))} viewport groups")
+        print("=" * 50)
+        for group in plan(jobs):
+            w, h = group["size"]
+            print(f"  {w}x{h}: {group['jobs']} jobs, {len(group['templates'])} templates, "
+                  f"effects={group['effects']}, remote={group['remote']}, fonts={len(group['fonts'])}")
+    else:
+        problems = [p for job in load_manifest(args.manifest) for p in validate(job["template"], job["params"])]
+        for problem in problems:
+            print(f"[!] {problem}")
+        if problems:
+            raise SystemExit(1)
+        print("[OK] Manifest matches template schemas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The tools import each other as flat modules from banner-generator/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
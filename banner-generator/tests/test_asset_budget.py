@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+import asset_budget
+import backgrounds
+from manifest import load_manifest
+from template_registry import TEMPLATES
+
+
+def _banner_like(path, size):
+    """Stand-in render: brand gradient with a grid overlay, optimized like the pipeline"""
+
+    arr = backgrounds.linear_gradient(backgrounds.canvas(*size), ("#2D2D2D", "#D4A574"), 135)
+    backgrounds.grid(arr, "rgba(255,255,255,0.03)", 40, 1)
+    backgrounds.to_image(arr).convert("RGB").save(path, optimize=True)
+
+
+@pytest.fixture
+def outputs(tmp_path):
+    """The shipped renders, or stand-ins at each template's viewport in a clean checkout"""
+
+    jobs = load_manifest()
+    if asset_budget.report(jobs, asset_budget.OUTPUT_DIR):
+        return jobs, asset_budget.OUTPUT_DIR
+    for job in jobs:
+        _banner_like(tmp_path / job["params"]["filename"], TEMPLATES[job["template"]]["size"])
+    return jobs, tmp_path
+
+
+def test_manifest_outputs_within_budget(outputs):
+    rows = asset_budget.report(*outputs)
+    assert len(rows) == len(outputs[0])
+    failed = asset_budget.failures(rows)
+    assert not failed, [(r["file"], r["problems"]) for r in failed]
+
+
+def test_budget_follows_shown_pixels():
+    slot = asset_budget.SLOTS["collection"]
+    # 160x200dp at 2x, covered by an 800x400 banner: it needs all 800x400 pixels
+    assert asset_budget.max_bytes(slot, 800, 400) == 800 * 400 * asset_budget.BYTES_PER_PIXEL
+
+
+def test_heavy_and_oversized_assets_fail(tmp_path):
+    noise = np.random.default_rng(0).integers(0, 256, (400, 800, 3), dtype=np.uint8)
+    Image.fromarray(noise).save(tmp_path / "noisy.png")
+    Image.new("RGB", (1000, 1000), "#D4A574").save(tmp_path / "huge.png")
+
+    noisy = asset_budget.inspect_asset(tmp_path / "noisy.png", "generate_collection_banner")
+    huge = asset_budget.inspect_asset(tmp_path / "huge.png", "generate_category_card")
+
+    assert any("encoded" in p for p in noisy["problems"])
+    assert any("pixels shown" in p for p in huge["problems"])
+    assert asset_budget.failures([noisy, huge]) == [noisy, huge]
@@ -0,0 +1,81 @@
+import re
+
+import numpy as np
+import pytest
+
+import backgrounds
+import banner_generator
+from renderer import capture_html
+
+# (template call, background builder, undecorated base of that background)
+CASES = {
+    "hero": (
+        lambda: banner_generator.generate_hero_banner("T", "S"),
+        backgrounds.hero_background,
+        lambda: backgrounds.linear_gradient(backgrounds.canvas(800, 400), ("#D4A574", "#8B7355"), 135),
+    ),
+    "promo": (
+        lambda: banner_generator.generate_promo_banner("50%", "T"),
+        backgrounds.promo_background,
+        lambda: backgrounds.stripes(backgrounds.canvas(800, 400, color="#1A1A1A"),
+                                    "rgba(255,255,255,0.02)", 45, 35, 70, 70),
+    ),
+    "cashback": (
+        lambda: banner_generator.generate_cashback_banner(),
+        backgrounds.cashback_background,
+        lambda: backgrounds.linear_gradient(backgrounds.canvas(800, 400), ("#4CAF50", "#2E7D32"), 135),
+    ),
+}
+
+
+def _px(style: str, prop: str):
+    match = re.search(rf"(?<![-\w]){prop}:\s*(-?[\d.]+)(px|%)", style)
+    return (float(match.group(1)), match.group(2)) if match else None
+
+
+def css_circles(html: str, width: int = 800, height: int = 400) -> list:
+    """(cx, cy, inner radius, outer radius) of the round absolute boxes in a template"""
+
+    circles = []
+    for style in re.findall(r'<div style="([^"]*)"', html):
+        if "position: absolute" not in style or "border-radius: 50%" not in style:
+            continue
+        size = _px(style, "width")[0]
+        border = re.search(r"border:\s*([\d.]+)px solid", style)
+        border = float(border.group(1)) if border else 0
+        outer = size + 2 * border
+        if "translate(-50%, -50%)" in style:
+            cx = _px(style, "left")[0] / 100 * width
+            cy = _px(style, "top")[0] / 100 * height
+        else:
+            left, right = _px(style, "left"), _px(style, "right")
+            top, bottom = _px(style, "top"), _px(style, "bottom")
+            cx = left[0] + outer / 2 if left else width - right[0] - outer / 2
+            cy = top[0] + outer / 2 if top else height - bottom[0] - outer / 2
+        # A border is a ring around the content box; a filled box has no hole
+        circles.append((cx, cy, size / 2 if border else 0, size / 2 + border))
+    return circles
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_decorations_match_template_geometry(name):
+    template, build, base = CASES[name]
+    with capture_html() as pages:
+        template()
+    circles = css_circles(pages[0][0])
+    assert circles
+
+    y, x = np.mgrid[0:400, 0:800] + 0.5
+    expected = np.zeros((400, 800), bool)
+    for cx, cy, inner, outer in circles:
+        dist = np.hypot(x - cx, y - cy)
+        expected |= (dist >= inner) & (dist <= outer)
+    drawn = np.abs(build() - base()).max(-1) > 1e-4
+
+    # Only anti-aliased edge pixels may disagree; a 1px shift of a ring or a
+    # moved circle leaves most of the shape unmatched
+    edge = np.zeros_like(expected)
+    for cx, cy, inner, outer in circles:
+        dist = np.hypot(x - cx, y - cy)
+        edge |= (np.abs(dist - outer) < 1) | ((np.abs(dist - inner) < 1) & (inner > 0))
+    assert not (expected ^ drawn)[~edge].any()
@@ -0,0 +1,43 @@
+import os
+import stat
+
+from PIL import Image
+
+import change_detect
+from blob_store import BlobStore, file_hash
+
+
+def _png(path, color):
+    Image.new("RGB", (8, 8), color).save(path)
+    return path
+
+
+def test_committed_outputs_stay_writable(tmp_path):
+    output = tmp_path / "output"
+    output.mkdir()
+    _png(output / "a.png", "red")
+    store = BlobStore(tmp_path / "store")
+    digest = store.commit("build1", output)["files"]["a.png"]
+
+    # Write permission is what a non-root user needs to replace or rewrite them
+    assert os.stat(output / "a.png").st_mode & stat.S_IWUSR
+    assert os.stat(store.blob_path(digest)).st_mode & stat.S_IWUSR
+    assert os.path.samefile(output / "a.png", store.blob_path(digest))
+
+
+def test_rewriting_linked_files_leaves_blobs_intact(tmp_path):
+    output, baseline = tmp_path / "output", tmp_path / "baseline"
+    output.mkdir()
+    _png(output / "a.png", "red")
+    store = BlobStore(tmp_path / "store")
+    digest = store.commit("build1", output)["files"]["a.png"]
+    # Baseline files linked into the store too, as after a checkout
+    store.checkout("build1", baseline)
+
+    _png(tmp_path / "new.png", "blue")
+    change_detect.restore(tmp_path / "new.png", output / "a.png")
+    change_detect.snapshot(output, baseline)
+
+    assert file_hash(store.blob_path(digest)) == digest
+    assert file_hash(baseline / "a.png") == file_hash(tmp_path / "new.png")
+    assert not os.path.samefile(baseline / "a.png", store.blob_path(digest))
@@ -0,0 +1,75 @@
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from event_listener import BannerListener, serve_webhook
+
+
+class FakeQueue:
+    def __init__(self):
+        self.submitted = []
+        self.closed = False
+
+    def submit(self, template, priority, **params):
+        if self.closed:
+            raise RuntimeError("RenderQueue is closed")
+        self.submitted.append(params["filename"])
+        future = Future()
+        future.set_result(params["filename"])
+        return future
+
+
+@pytest.fixture
+def listener(tmp_path):
+    queue = FakeQueue()
+    listener = BannerListener(queue, quiet=0.02, max_wait=0.05, state_path=tmp_path / "state.json")
+    yield listener
+    listener.close()
+
+
+def _settle(listener):
+    deadline = time.monotonic() + 2
+    while listener.debouncer.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+
+
+def test_failing_events_do_not_stop_later_ones(listener):
+    listener.handle({"type": "product.updated", "id": 1, "fields": {"price": None}})
+    _settle(listener)
+    listener.queue.closed = True
+    listener.handle({"type": "product.updated", "id": 2, "fields": {"price": 10}})
+    _settle(listener)
+    listener.queue.closed = False
+    listener.handle({"type": "product.updated", "id": 3, "fields": {"price": 10}})
+    _settle(listener)
+
+    assert listener.debouncer.thread.is_alive()
+    assert listener.queue.submitted == ["product_showcase_3.png"]
+
+
+@pytest.mark.parametrize("payload, status", [
+    ({"type": "promo.updated", "id": 7, "fields": {"title": "x"}}, 202),
+    ({"type": "promo.updated"}, 400),
+    ({"type": None, "id": 7}, 400),
+    ([{"type": "promo.updated", "id": 7}, "promo"], 400),
+])
+def test_webhook_validates_event_shape(listener, payload, status):
+    server = serve_webhook(listener, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+        body = json.dumps(payload)
+        conn.request("POST", "/events", body, {"Content-Length": str(len(body))})
+        assert conn.getresponse().status == status
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    # A rejected batch is not applied even partly
+    if status == 400:
+        assert not listener.debouncer.pending
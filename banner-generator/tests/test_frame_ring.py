@@ -0,0 +1,63 @@
+import os
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+import frame_ring
+import render_queue
+
+JOBS = [{"template": "fake", "params": {"filename": f"{name}.png"}}
+        for name in ("a", "b", "crash", "c", "d")]
+
+
+@pytest.fixture
+def fake_render(tmp_path, monkeypatch):
+    def render(template, params):
+        path = tmp_path / params["filename"]
+        Image.new("RGB", (40, 20), "red").save(path)
+        return str(path)
+
+    # Workers are forked, so they see the patched modules
+    monkeypatch.setattr(render_queue, "render_template", render)
+    monkeypatch.setattr(frame_ring, "RESULT_POLL", 0.1)
+    return tmp_path
+
+
+def _dies_on_crash(original, after: bool):
+    def publish(self, slot, width, height, meta):
+        crash = Path(meta["path"]).name == "crash.png"
+        if crash and not after:
+            os._exit(3)
+        original(self, slot, width, height, meta)
+        if crash:
+            os._exit(3)
+    return publish
+
+
+def _run(monkeypatch, after: bool):
+    monkeypatch.setattr(frame_ring.FrameRing, "publish", _dies_on_crash(frame_ring.FrameRing.publish, after))
+    return frame_ring.run_batch(JOBS, render_procs=1, post_procs=1, slots=2,
+                                post_process=lambda img, path: img.save(path))
+
+
+def _reported(result):
+    return sorted([Path(p).name for p in result["outputs"]] + [name for name, _ in result["errors"]])
+
+
+def test_renderer_dying_before_publish_fails_its_job(fake_render, monkeypatch):
+    result = _run(monkeypatch, after=False)
+    assert _reported(result) == sorted(j["params"]["filename"] for j in JOBS)
+    errors = dict(result["errors"])
+    assert "before publishing" in errors["crash.png"]
+    # The only render worker is gone, so the queued jobs behind it fail too
+    assert set(errors) == {"crash.png", "c.png", "d.png"}
+    assert not (fake_render / "crash.png").exists()
+
+
+def test_renderer_dying_after_publish_reports_the_frame_once(fake_render, monkeypatch):
+    result = _run(monkeypatch, after=True)
+    assert _reported(result) == sorted(j["params"]["filename"] for j in JOBS)
+    # The frame was published, so the post worker writes and reports it
+    assert "crash.png" in [Path(p).name for p in result["outputs"]]
+    assert (fake_render / "crash.png").exists()
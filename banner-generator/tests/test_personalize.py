@@ -0,0 +1,50 @@
+import http.client
+import threading
+
+import pytest
+from PIL import Image
+
+from personalize import Personalizer, serve
+from renderer import output_dir
+
+
+def fake_render(template, params):
+    path = output_dir() / params["filename"]
+    Image.new("RGBA", (800, 400), "#4CAF50").save(path)
+    return str(path)
+
+
+@pytest.fixture
+def server(tmp_path):
+    personalizer = Personalizer(render=fake_render, base_dir=tmp_path, allow_default_font=True)
+    server = serve(personalizer, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("query, status", [
+    ("first_name=Ana&cashback_balance=12.5", 200),
+    ("first_name=Ana", 400),
+    ("first_name=Ana&cashback_balance=", 400),
+    ("first_name=Ana&cashback_balance=doze", 400),
+    ("first_name=Ana&cashback_balance=nan", 400),
+    ("first_name=Ana&cashback_balance=-3", 400),
+])
+def test_cashback_balance_is_validated(server, query, status):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=10)
+    conn.request("GET", f"/cashback.png?{query}")
+    resp = conn.getresponse()
+    body = resp.read()
+    conn.close()
+    assert resp.status == status
+    if status == 200:
+        assert body.startswith(b"\x89PNG")
+
+
+def test_hero_needs_no_balance(server):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=10)
+    conn.request("GET", "/hero.png?first_name=Ana")
+    assert conn.getresponse().status == 200
+    conn.close()
@@ -0,0 +1,72 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import publish
+
+
+@pytest.fixture
+def builds_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(publish, "BUILDS_DIR", tmp_path)
+    monkeypatch.setattr(publish, "CURRENT_LINK", tmp_path / "current")
+    monkeypatch.setattr(publish, "HISTORY_PATH", tmp_path / "history.json")
+    return tmp_path
+
+
+def _complete(builds_dir, name):
+    (builds_dir / name).mkdir()
+    (builds_dir / name / publish.BUILD_INFO).write_text(json.dumps({"name": name}))
+    return name
+
+
+def _dead_pid():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def test_repeated_rollbacks_walk_back_through_history(builds_dir):
+    for name in ("b1", "b2", "b3"):
+        publish.switch(_complete(builds_dir, name))
+
+    assert publish.rollback() == "b2"
+    # A second rollback must not re-publish the bad b3
+    assert publish.rollback() == "b1"
+    assert publish.current_build() == "b1"
+    with pytest.raises(ValueError):
+        publish.rollback()
+
+
+def test_publishing_after_rollback_drops_the_rolled_back_entries(builds_dir):
+    for name in ("b1", "b2", "b3"):
+        publish.switch(_complete(builds_dir, name))
+    publish.rollback()
+    publish.switch(_complete(builds_dir, "b4"))
+
+    assert publish.rollback() == "b2"
+    assert publish.rollback() == "b1"
+
+
+def test_rollback_skips_pruned_builds(builds_dir):
+    for name in ("b1", "b2", "b3"):
+        publish.switch(_complete(builds_dir, name))
+    (builds_dir / "b2" / publish.BUILD_INFO).unlink()
+
+    assert publish.rollback() == "b1"
+
+
+def test_prune_removes_abandoned_builds_only(builds_dir):
+    publish.switch(_complete(builds_dir, "b1"))
+    abandoned = builds_dir / f"20260101-000000-{_dead_pid()}"
+    in_progress = builds_dir / f"20260101-000001-{os.getpid()}"
+    for path in (abandoned, in_progress):
+        path.mkdir()
+        (path / "hero.png").write_bytes(b"partial")
+
+    assert publish.prune(keep=5) == [abandoned.name]
+    assert in_progress.exists()
+    assert publish.current_build() == "b1"
+    assert publish.builds() == ["b1"]
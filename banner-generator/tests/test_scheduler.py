@@ -0,0 +1,41 @@
+from pathlib import Path
+
+import scheduler
+from manifest import load_manifest
+from renderer import output_to
+
+
+class FakePage:
+    def __init__(self, size):
+        self.size = size
+        self.loads = []
+
+    def load(self, html):
+        self.loads.append(html)
+
+    def screenshot(self, path):
+        Path(path).write_bytes(b"png")
+        return str(path)
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.pages = []
+
+    def new_page(self, size, scale=1.0):
+        self.pages.append(FakePage(size))
+        return self.pages[-1]
+
+
+def test_one_warm_page_per_viewport(tmp_path):
+    jobs = load_manifest()
+    browser = FakeBrowser()
+    with output_to(tmp_path):
+        stats = scheduler.run_batch(jobs, browser=browser)
+
+    sizes = [page.size for page in browser.pages]
+    assert sorted(sizes) == sorted({scheduler.viewport_of(job) for job in jobs})
+    assert sum(len(page.loads) for page in browser.pages) == len(jobs)
+    assert len(stats["outputs"]) == len(jobs)
+    assert all(Path(path).parent == tmp_path for path in stats["outputs"])
+    assert sum(t["jobs"] for t in stats["timings"]) == len(jobs)
@@ -0,0 +1,81 @@
+import http.client
+import threading
+
+import pytest
+
+from storage_sinks import (
+    CACHE_CONTROL, HASH_HEADER, FilesystemSink, HttpObjectStoreSink, file_hash, publish, serve_local_store,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    server = serve_local_store(tmp_path / "store", port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def banners(tmp_path):
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"banner_{i}.png"
+        path.write_bytes(b"\x89PNG\r\n\x1a\n" + bytes([i]) * 2048)
+        paths.append(path)
+    return paths
+
+
+def _fetch(server, method: str, key: str):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=10)
+    try:
+        conn.request(method, f"/campaign/{key}")
+        resp = conn.getresponse()
+        return resp, resp.read()
+    finally:
+        conn.close()
+
+
+def test_http_sink_round_trip(store, banners):
+    sink = HttpObjectStoreSink(f"http://127.0.0.1:{store.server_address[1]}/campaign", pool_size=4)
+    try:
+        stats = publish(sink, banners, workers=4)
+        assert stats["uploaded"] == len(banners) and stats["failed"] == 0, stats["errors"]
+
+        for path in banners:
+            head, body = _fetch(store, "HEAD", path.name)
+            assert head.status == 200 and body == b""
+            assert head.getheader(HASH_HEADER) == file_hash(path)
+            assert int(head.getheader("Content-Length")) == path.stat().st_size
+
+            resp, body = _fetch(store, "GET", path.name)
+            assert resp.status == 200
+            assert body == path.read_bytes()
+            assert resp.getheader("Content-Type") == "image/png"
+            assert resp.getheader("Cache-Control") == CACHE_CONTROL
+
+        # Same content again is skipped on the HEAD hash; changed content is re-uploaded
+        banners[0].write_bytes(banners[0].read_bytes() + b"changed")
+        again = publish(sink, banners, workers=4)
+        assert (again["uploaded"], again["skipped"]) == (1, len(banners) - 1)
+        assert _fetch(store, "GET", banners[0].name)[1] == banners[0].read_bytes()
+        # Keep-alive connections are reused instead of one per request
+        assert sink.created <= 4
+    finally:
+        sink.close()
+
+
+def test_missing_object_is_404(store):
+    resp, _ = _fetch(store, "HEAD", "nope.png")
+    assert resp.status == 404
+
+
+def test_filesystem_sink_round_trip(tmp_path, banners):
+    sink = FilesystemSink(tmp_path / "copy")
+    stats = publish(sink, banners, prefix="campaign", workers=2)
+    assert stats["uploaded"] == len(banners)
+    for path in banners:
+        assert (tmp_path / "copy" / "campaign" / path.name).read_bytes() == path.read_bytes()
+    assert publish(sink, banners, prefix="campaign", workers=2)["skipped"] == len(banners)
@@ -0,0 +1,28 @@
+import text_fit
+from text_fit import SLOTS, estimate_advances, fit_size, measure
+
+LONG_NAME = "Vestido Longo Estampado de Seda com Amarração"
+
+
+def test_long_names_shrink_without_font_files(monkeypatch):
+    monkeypatch.setattr(text_fit, "_has_font", lambda *key: False)
+    slot = SLOTS["product_showcase.product_name"]
+
+    assert fit_size("product_showcase.product_name", "Vestido Midi Floral") == slot["max_size"]
+    size = fit_size("product_showcase.product_name", LONG_NAME)
+    assert slot["min_size"] <= size < slot["max_size"]
+    # At the chosen size the estimate wraps into the slot's lines
+    assert len(text_fit.wrap(LONG_NAME, slot, size)) <= slot["max_lines"]
+
+
+def test_estimate_is_wider_for_bolder_and_upper_case():
+    lower = sum(estimate_advances("moda", "Playfair Display", 400, 20))
+    assert sum(estimate_advances("moda", "Playfair Display", 700, 20)) > lower
+    assert sum(estimate_advances("MODA", "Playfair Display", 400, 20)) > lower
+
+
+def test_markup_keeps_the_default_size(monkeypatch):
+    monkeypatch.setattr(text_fit, "_has_font", lambda *key: False)
+    slot = SLOTS["collection.collection_name"]
+    assert fit_size("collection.collection_name", "Festa<br>" + LONG_NAME) == slot["max_size"]
+    assert measure("Festa", slot, 56) > 0
@@ -0,0 +1,25 @@
+from renderer import capture_html
+from variants import VariantPage, render_variants
+
+BASE = {"discount": "50%", "title": "BLACK FRIDAY", "filename": "promo.png"}
+
+
+def test_axis_absent_from_base_params_uses_template_default():
+    page = VariantPage("generate_promo_banner", BASE, ["accent_color"])
+
+    assert page.colors == ["accent_color"]
+    assert page.base_params["accent_color"] == "#D4A574"
+    html = page.substitute({**page.base_params, "accent_color": "#E8B4B8"})
+    assert "#E8B4B820" in html and "#D4A574" not in html
+
+
+def test_variants_render_with_defaulted_axis():
+    variants = [{"accent_color": "#E8B4B8", "filename": "promo_rose.png"},
+                {"badge_text": "SÓ HOJE", "filename": "promo_today.png"}]
+    with capture_html() as pages:
+        render_variants("generate_promo_banner", BASE, variants, browser=None)
+
+    rose, today = (html for html, _, _ in pages)
+    assert "#E8B4B8" in rose and "OFERTA ESPECIAL" in rose
+    # Keys a variant leaves out fall back to the template defaults
+    assert "SÓ HOJE" in today and "#D4A574" in today
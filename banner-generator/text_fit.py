@@ -0,0 +1,149 @@
+"""
+Text fitting for Apega Desapega banner templates
+Picks the largest font size at which a text wraps into its slot, using the
+cached glyph-advance tables in fonts.py, so no trial renders are needed
+"""
+
+import argparse
+import functools
+
+from fonts import advances, font_path
+
+# Configuration
+# Measured widths are padded slightly: the browser applies kerning and
+# hinting that a plain advance sum does not see
+SAFETY = 1.03
+# Without the TTFs in assets/fonts, advances are estimated per character
+# class in em at weight 400, rounded up from the faces' widest glyphs of
+# each class so that a fitted text may wrap early but never overflows
+ESTIMATE_EM = {
+    "Playfair Display": {"upper": 0.78, "lower": 0.58, "digit": 0.62, "space": 0.26, "other": 0.62},
+    "Inter": {"upper": 0.76, "lower": 0.6, "digit": 0.64, "space": 0.28, "other": 0.64},
+}
+# Each 100 units of weight above 400 widens the estimate by this fraction
+ESTIMATE_BOLDER = 0.04
+
+# Text boxes from the template CSS; width/height in CSS px
+SLOTS = {
+    "product_showcase.product_name": {
+        "family": "Playfair Display", "weight": 600, "max_size": 32, "min_size": 18,
+        "width": 320, "max_lines": 2, "line_height": 1.3,
+    },
+    "testimonial.quote": {
+        "family": "Playfair Display", "weight": 400, "italic": True, "max_size": 24, "min_size": 15,
+        "width": 600, "max_lines": 3, "line_height": 1.6, "wrap": ('"', '"'),
+    },
+    "collection.collection_name": {
+        "family": "Playfair Display", "weight": 700, "max_size": 56, "min_size": 28,
+        "width": 640, "max_lines": 2, "line_height": 1.333, "height": 96, "letter_spacing": 2,
+    },
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _has_font(family: str, weight: int, italic: bool) -> bool:
+    return font_path(family, weight, italic) is not None
+
+
+def estimate_advances(text: str, family: str, weight: int = 400, size: int = 16) -> list:
+    """Upper-bound advance width of every character when the font file is missing"""
+
+    em = ESTIMATE_EM.get(family, ESTIMATE_EM["Inter"])
+    scale = size * (1 + max(weight - 400, 0) / 100 * ESTIMATE_BOLDER)
+    widths = []
+    for ch in text:
+        if ch.isspace():
+            kind = "space"
+        elif ch.isdigit():
+            kind = "digit"
+        elif ch.isupper():
+            kind = "upper"
+        elif ch.isalpha():
+            kind = "lower"
+        else:
+            kind = "other"
+        widths.append(em[kind] * scale)
+    return widths
+
+
+def measure(text: str, slot: dict, size: int) -> float:
+    """Rendered width of one line of text at a size, in CSS px"""
+
+    family, weight, italic = slot["family"], slot["weight"], slot.get("italic", False)
+    if _has_font(family, weight, italic):
+        widths = advances(text, family, weight, size, italic)
+    else:
+        # Pillow's fallback face has nothing to do with the browser's font
+        widths = estimate_advances(text, family, weight, size)
+    return (sum(widths) + slot.get("letter_spacing", 0) * len(text)) * SAFETY
+
+
+def wrap(text: str, slot: dict, size: int):
+    """Greedy line breaking at spaces; None if a single word is too wide"""
+
+    lines, current = [], ""
+    for word in text.split():
+        candidate = f"{current} {word}" if current else word
+        if measure(candidate, slot, size) <= slot["width"]:
+            current = candidate
+            continue
+        if not current or measure(word, slot, size) > slot["width"]:
+            return None
+        lines.append(current)
+        current = word
+    if current:
+        lines.append(current)
+    return lines
+
+
+def fit_text(text: str, slot: dict) -> dict:
+    """Largest size whose wrapped text fits the slot's lines and height
+
+    Falls back to the minimum size with the text wrapped as well as it can be.
+    """
+
+    before, after = slot.get("wrap", ("", ""))
+    full = f"{before}{text}{after}"
+    for size in range(slot["max_size"], slot["min_size"] - 1, -1):
+        lines = wrap(full, slot, size)
+        if lines is None or len(lines) > slot["max_lines"]:
+            continue
+        if "height" in slot and len(lines) * size * slot["line_height"] > slot["height"]:
+            continue
+        return {"size": size, "lines": lines, "fits": True}
+    size = slot["min_size"]
+    return {"size": size, "lines": wrap(full, slot, size) or [full], "fits": False}
+
+
+def fit_size(name: str, text: str) -> int:
+    """Font size for a template slot; the template's CSS does the line breaking
+
+    Keeps the slot's default size when the text contains markup. Without the
+    font files the widths are conservative estimates, so the size may come
+    out smaller than the real face would need, but not larger.
+    """
+
+    slot = SLOTS[name]
+    if "<" in text:
+        return slot["max_size"]
+    fitted = fit_text(text, slot)
+    if not fitted["fits"]:
+        print(f"[!] {name}: text does not fit even at {fitted['size']}px: {text[:40]}")
+    return fitted["size"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit text into a template slot")
+    parser.add_argument("slot", choices=list(SLOTS))
+    parser.add_argument("text")
+    args = parser.parse_args()
+
+    fitted = fit_text(args.text, SLOTS[args.slot])
+    status = "[OK]" if fitted["fits"] else "[!] does not fit,"
+    print(f"{status} {fitted['size']}px, {len(fitted['lines'])} lines")
+    for line in fitted["lines"]:
+        print(f"  | {line}")
+
+
+if __name__ == "__main__":
+    main()
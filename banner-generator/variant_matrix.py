@@ -0,0 +1,235 @@
+"""
+A/B variant matrices for Apega Desapega banners
+Expands parameter axes (copy x gradient x CTA x badge) into a full or sampled
+set of variants with deterministic IDs, renders them in one batch on shared
+warm pages and writes a CSV mapping variant IDs to parameters
+"""
+
+import argparse
+import csv
+import json
+import random
+import time
+from pathlib import Path
+
+from render_queue import job_key, render_template
+from renderer import output_dir
+from variants import UnpatchableParam, render_variants
+from warm_page import WarmBrowser, playwright_available
+
+# Example experiment: every axis value is either a value for the parameter
+# named like the axis, or a dict of several parameters set together
+DEFAULT_EXPERIMENT = {
+    "experiment": "home_carousel",
+    "templates": [
+        {
+            "template": "generate_hero_banner",
+            "params": {"title": "Moda Circular", "subtitle": "Renove seu guarda-roupa com peças únicas e sustentáveis"},
+            "axes": {
+                "copy": [
+                    {"title": "Moda Circular", "subtitle": "Renove seu guarda-roupa com peças únicas e sustentáveis"},
+                    {"title": "Novidades da Semana", "subtitle": "Descubra as peças mais desejadas que acabaram de chegar"},
+                    {"title": "Peças Premium", "subtitle": "Seleção especial de marcas renomadas com até 70% off"},
+                ],
+                "gradient_colors": [
+                    ["#D4A574", "#8B7355"],
+                    ["#B8A9C9", "#8E7BA8"],
+                    ["#1A1A1A", "#3D3D3D"],
+                    ["#9CAF88", "#6B8E5C"],
+                ],
+                "cta_text": ["EXPLORAR", "VER AGORA", "CONFERIR"],
+            },
+        },
+        {
+            "template": "generate_promo_banner",
+            "params": {"discount": "30%", "title": "PRIMEIRA COMPRA", "subtitle": "Use o cupom BEMVINDA"},
+            "axes": {
+                "title": ["PRIMEIRA COMPRA", "BLACK FRIDAY", "SÓ HOJE"],
+                "badge_text": ["OFERTA ESPECIAL", "EXCLUSIVO", "OFERTA LIMITADA"],
+                "accent_color": ["#D4A574", "#E8B4B8", "#FFD700"],
+            },
+        },
+    ],
+}
+
+
+def _label(value) -> str:
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False, sort_keys=True)
+    if isinstance(value, (list, tuple)):
+        return "|".join(str(v) for v in value)
+    return str(value)
+
+
+class VariantMatrix:
+    """Cartesian product of parameter axes for one template"""
+
+    def __init__(self, template: str, base_params: dict, axes: dict):
+        self.template = template
+        self.base_params = dict(base_params)
+        self.axes = {name: list(values) for name, values in axes.items()}
+
+    def __len__(self):
+        total = 1
+        for values in self.axes.values():
+            total *= len(values)
+        return total
+
+    def _levels(self, index: int) -> tuple:
+        """Mixed-radix decoding of a product index into one level per axis"""
+
+        levels = []
+        for values in reversed(list(self.axes.values())):
+            index, level = divmod(index, len(values))
+            levels.append(level)
+        return tuple(reversed(levels))
+
+    def full(self) -> list:
+        return [self._levels(i) for i in range(len(self))]
+
+    def sample(self, n: int, method: str = "random", seed: int = 0) -> list:
+        """n distinct level combinations, uniformly or by Latin hypercube"""
+
+        rng = random.Random(seed)
+        total = len(self)
+        if n >= total:
+            return self.full()
+        if method == "random":
+            return [self._levels(i) for i in sorted(rng.sample(range(total), n))]
+        if method != "lhs":
+            raise ValueError(f"Unknown sampling method: {method}")
+
+        # Each axis is cut into n strata, one sample per stratum, strata
+        # shuffled independently per axis so every level appears evenly
+        columns = []
+        for values in self.axes.values():
+            strata = list(range(n))
+            rng.shuffle(strata)
+            columns.append([int((s + rng.random()) * len(values) / n) for s in strata])
+        picked, seen = [], set()
+        for levels in zip(*columns):
+            if levels not in seen:
+                seen.add(levels)
+                picked.append(levels)
+        # Stratified draws can collide on small axes; top up at random
+        while len(picked) < n:
+            levels = self._levels(rng.randrange(total))
+            if levels not in seen:
+                seen.add(levels)
+                picked.append(levels)
+        return picked
+
+    def variant(self, levels: tuple) -> dict:
+        """Params, axis labels and deterministic ID/filename for one combination"""
+
+        params, labels = dict(self.base_params), {}
+        for (name, values), level in zip(self.axes.items(), levels):
+            value = values[level]
+            params.update(value if isinstance(value, dict) else {name: value})
+            labels[name] = _label(value)
+        variant_id = job_key(self.template, params)[:10]
+        prefix = self.template.removeprefix("generate_")
+        params["filename"] = f"{prefix}_{variant_id}.png"
+        return {"id": variant_id, "template": self.template, "params": params, "axes": labels}
+
+
+def expand(experiment: dict, sample: int = None, method: str = "random", seed: int = 0) -> list:
+    """All variants of an experiment, optionally sampled per template"""
+
+    variants = []
+    for spec in experiment["templates"]:
+        matrix = VariantMatrix(spec["template"], spec.get("params", {}), spec["axes"])
+        combos = matrix.sample(sample, method, seed) if sample else matrix.full()
+        variants.extend(matrix.variant(levels) for levels in combos)
+    return variants
+
+
+def render_matrix(variants: list, browser: WarmBrowser = None) -> list:
+    """Render variants grouped by template, one warm page per template
+
+    Templates whose varying params cannot be patched in-page (numbers the
+    template formats, image URLs) fall back to a full render per variant.
+    """
+
+    by_template = {}
+    for v in variants:
+        by_template.setdefault(v["template"], []).append(v["params"])
+
+    own_browser = browser is None and playwright_available()
+    if own_browser:
+        browser = WarmBrowser()
+    paths = []
+    try:
+        for template, params_list in by_template.items():
+            # Params identical across the group are the page; the rest vary
+            base = {k: v for k, v in params_list[0].items()
+                    if k != "filename" and all(p.get(k) == v for p in params_list)}
+            changed = [{k: v for k, v in p.items() if k not in base} for p in params_list]
+            try:
+                paths.extend(render_variants(template, {**params_list[0], **base}, changed, browser))
+            except UnpatchableParam as exc:
+                print(f"[!] {exc}; rendering {len(params_list)} variants one by one")
+                paths.extend(render_template(template, params) for params in params_list)
+    finally:
+        if own_browser:
+            browser.close()
+    return paths
+
+
+def write_csv(variants: list, path, experiment: str = ""):
+    """variant_id, experiment, template, filename and one column per axis"""
+
+    axis_names = []
+    for v in variants:
+        for name in v["axes"]:
+            if name not in axis_names:
+                axis_names.append(name)
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["variant_id", "experiment", "template", "filename", *axis_names])
+        for v in variants:
+            writer.writerow([v["id"], experiment, v["template"], v["params"]["filename"],
+                             *(v["axes"].get(name, "") for name in axis_names)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render an A/B variant matrix")
+    parser.add_argument("spec", nargs="?", help="experiment JSON (default: built-in home carousel)")
+    parser.add_argument("--sample", type=int, help="variants per template instead of the full product")
+    parser.add_argument("--method", choices=["random", "lhs"], default="random")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", help="mapping CSV path (default: output/<experiment>_variants.csv)")
+    parser.add_argument("--dry-run", action="store_true", help="write the CSV without rendering")
+    args = parser.parse_args()
+
+    if args.spec:
+        with open(args.spec, encoding="utf-8") as f:
+            experiment = json.load(f)
+    else:
+        experiment = DEFAULT_EXPERIMENT
+
+    variants = expand(experiment, args.sample, args.method, args.seed)
+    name = experiment.get("experiment", "experiment")
+    csv_path = Path(args.csv) if args.csv else output_dir() / f"{name}_variants.csv"
+
+    print("=" * 50)
+    print(f"[*] Variant matrix: {name}")
+    print("=" * 50)
+    for spec in experiment["templates"]:
+        matrix = VariantMatrix(spec["template"], spec.get("params", {}), spec["axes"])
+        dims = " x ".join(f"{axis}({len(values)})" for axis, values in matrix.axes.items())
+        print(f"  {spec['template']}: {dims} = {len(matrix)}")
+    print(f"  selected: {len(variants)}")
+
+    if not args.dry_run:
+        started = time.perf_counter()
+        render_matrix(variants)
+        print(f"\n[+] Rendered {len(variants)} variants in {time.perf_counter() - started:.1f}s")
+
+    write_csv(variants, csv_path, name)
+    print(f"[OK] Mapping: {csv_path}")
+
+
+if __name__ == "__main__":
+    main()
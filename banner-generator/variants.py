@@ -0,0 +1,193 @@
+"""
+In-page variant rendering for Apega Desapega banners
+Loads a template once with CSS custom properties and data slots in place of
+the parameters that vary, then re-themes and re-texts it per variant in the
+warm page instead of navigating and loading fonts again
+"""
+
+import argparse
+import inspect
+import itertools
+import json
+import re
+import time
+
+from render_queue import resolve_template
+from renderer import capture_html, output_dir, render_html
+from warm_page import WarmBrowser, playwright_available
+
+# Configuration
+COLOR_RE = re.compile(r"^#[0-9A-Fa-f]{3,8}$")
+# Templates append hex alpha to colors (e.g. {accent_color}20)
+ALPHA_SUFFIX_RE = re.compile(r"var\((--[\w-]+)\)([0-9A-Fa-f]{2})\b")
+
+
+class UnpatchableParam(ValueError):
+    """A varying param the template formats or uses in a way CSS/slots cannot reproduce"""
+
+
+def _is_color(value) -> bool:
+    if isinstance(value, (list, tuple)):
+        return bool(value) and all(_is_color(v) for v in value)
+    return isinstance(value, str) and bool(COLOR_RE.match(value))
+
+
+def template_defaults(template: str) -> dict:
+    """Default value of every template parameter that has one"""
+
+    parameters = inspect.signature(resolve_template(template)).parameters
+    return {name: p.default for name, p in parameters.items() if p.default is not inspect.Parameter.empty}
+
+
+class VariantPage:
+    """A template's HTML with the varying params turned into variables and slots"""
+
+    def __init__(self, template: str, base_params: dict, keys: list):
+        self.template = template
+        self.keys = list(keys)
+        # Axes may vary a param the base leaves at the template default
+        defaults = template_defaults(template)
+        missing = [k for k in self.keys if k not in base_params and k not in defaults]
+        if missing:
+            raise ValueError(f"{template}: no base value or default for {', '.join(missing)}")
+        base_params = {**{k: defaults[k] for k in self.keys if k not in base_params}, **base_params}
+        self.base_params = base_params
+        self.colors = [k for k in self.keys if _is_color(base_params[k])]
+
+        page_params = dict(base_params, filename=f"{template}_variants.png")
+        for key in self.keys:
+            value = base_params[key]
+            if key in self.colors:
+                if isinstance(value, (list, tuple)):
+                    page_params[key] = tuple(f"var(--{key}-{i})" for i in range(len(value)))
+                else:
+                    page_params[key] = f"var(--{key})"
+            elif key.endswith("_url") or not isinstance(value, str):
+                raise UnpatchableParam(f"{template}: {key} cannot be patched in-page")
+            else:
+                page_params[key] = f'<span data-slot="{key}"></span>'
+
+        with capture_html() as pages:
+            resolve_template(template)(**page_params)
+        html, _, self.size = pages[0]
+
+        self.alphas = {}
+        for name, alpha in ALPHA_SUFFIX_RE.findall(html):
+            self.alphas.setdefault(name, set()).add(alpha)
+        self.html = ALPHA_SUFFIX_RE.sub(r"var(\1-a\2)", html)
+
+        for key in self.keys:
+            if key not in self.colors and f'data-slot="{key}"' not in self.html:
+                raise UnpatchableParam(f"{template}: {key} is transformed by the template, cannot slot it")
+
+    def values(self, params: dict) -> tuple:
+        """CSS variables and slot contents for one variant"""
+
+        css_vars, slots = {}, {}
+        for key in self.keys:
+            value = params[key]
+            if key in self.colors:
+                names = [f"--{key}-{i}" for i in range(len(value))] if isinstance(value, (list, tuple)) else [f"--{key}"]
+                values = value if isinstance(value, (list, tuple)) else [value]
+                for name, color in zip(names, values):
+                    css_vars[name] = color
+                    for alpha in self.alphas.get(name, ()):
+                        css_vars[f"{name}-a{alpha}"] = color + alpha
+            else:
+                slots[key] = value
+        return css_vars, slots
+
+    def substitute(self, params: dict) -> str:
+        """Standalone HTML for one variant, for renderers without a warm page"""
+
+        css_vars, slots = self.values(params)
+        html = self.html
+        for name, value in css_vars.items():
+            html = html.replace(f"var({name})", value)
+        for key, value in slots.items():
+            html = html.replace(f'<span data-slot="{key}"></span>', value)
+        return html
+
+
+def render_variants(template: str, base_params: dict, variants: list, browser: WarmBrowser = None,
+                    scale: float = 1.0) -> list:
+    """Render variants (dicts of changed params plus filename) of one template
+
+    Uses one warm page when Playwright is available, otherwise renders each
+    substituted page through the regular html2image renderer.
+    """
+
+    keys = sorted({k for v in variants for k in v if k != "filename"})
+    page = VariantPage(template, base_params, keys)
+    out = output_dir()
+    paths = []
+
+    if browser is None and not playwright_available():
+        print("[!] Playwright not installed, rendering variants without a warm page")
+        for variant in variants:
+            params = {**page.base_params, **variant}
+            paths.append(render_html(page.substitute(params), variant["filename"], page.size))
+        return paths
+
+    own_browser = browser is None
+    browser = browser or WarmBrowser()
+    try:
+        warm = browser.new_page(page.size, scale)
+        warm.load(page.html)
+        for variant in variants:
+            warm.patch(*page.values({**page.base_params, **variant}))
+            paths.append(warm.screenshot(out / variant["filename"]))
+            print(f"Generated: {out / variant['filename']}")
+    finally:
+        if own_browser:
+            browser.close()
+    return paths
+
+
+def gradient_pairs(palette: dict = None) -> list:
+    """Every unordered pair of distinct brand colors as ((name, hex), (name, hex))"""
+
+    if palette is None:
+        from banner_generator import COLORS as palette
+
+    unique = {}
+    for name, color in palette.items():
+        unique.setdefault(color.upper(), name)
+    return list(itertools.combinations([(name, color) for color, name in unique.items()], 2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render many color/copy variants of a template from one page")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_hero = sub.add_parser("hero-gradients", help="hero banner in every brand gradient pair")
+    p_hero.add_argument("--title", default="Moda Circular")
+    p_hero.add_argument("--subtitle", default="Renove seu guarda-roupa com peças únicas e sustentáveis")
+    p_hero.add_argument("--limit", type=int)
+
+    p_run = sub.add_parser("run", help="render variants from a JSON spec {template, params, variants}")
+    p_run.add_argument("spec")
+
+    args = parser.parse_args()
+
+    if args.command == "hero-gradients":
+        template = "generate_hero_banner"
+        base = {"title": args.title, "subtitle": args.subtitle, "gradient_colors": ("#D4A574", "#8B7355")}
+        pairs = gradient_pairs()[:args.limit]
+        variants = [
+            {"gradient_colors": (a[1], b[1]), "filename": f"hero_gradient_{a[0]}_{b[0]}.png"}
+            for a, b in pairs
+        ]
+    else:
+        with open(args.spec, encoding="utf-8") as f:
+            spec = json.load(f)
+        template, base, variants = spec["template"], spec["params"], spec["variants"]
+
+    started = time.perf_counter()
+    paths = render_variants(template, base, variants)
+    elapsed = time.perf_counter() - started
+    print(f"\n[+] {len(paths)} variants of {template} in {elapsed:.1f}s ({elapsed / max(len(paths), 1):.2f}s each)")
+
+
+if __name__ == "__main__":
+    main()
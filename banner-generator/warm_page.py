@@ -0,0 +1,95 @@
+"""
+Warm browser pages for Apega Desapega banners
+Keeps Chromium and its pages alive between screenshots (via Playwright,
+optional) so a loaded template can be patched and captured repeatedly
+"""
+
+import os
+import threading
+from pathlib import Path
+
+# Applies CSS custom properties and slot contents, then waits for fonts and
+# one painted frame so the screenshot reflects the update
+PATCH_JS = """
+async ({vars, slots}) => {
+    const root = document.documentElement.style;
+    for (const [name, value] of Object.entries(vars)) root.setProperty(name, value);
+    for (const [name, html] of Object.entries(slots))
+        for (const el of document.querySelectorAll(`[data-slot="${name}"]`)) el.innerHTML = html;
+    await document.fonts.ready;
+    await new Promise(resolve => requestAnimationFrame(() => requestAnimationFrame(resolve)));
+}
+"""
+
+
+def playwright_available() -> bool:
+    try:
+        import playwright.sync_api  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class WarmPage:
+    """A loaded page that can be patched and screenshotted many times"""
+
+    def __init__(self, page, size: tuple):
+        self.page = page
+        self.size = tuple(size)
+        self.loads = 0
+        self.shots = 0
+
+    def load(self, html: str):
+        """Navigate once; waits for stylesheets, web fonts and images"""
+
+        self.page.set_content(html, wait_until="networkidle")
+        self.page.evaluate("document.fonts.ready.then(() => true)")
+        self.loads += 1
+
+    def patch(self, css_vars: dict = None, slots: dict = None):
+        self.page.evaluate(PATCH_JS, {"vars": css_vars or {}, "slots": slots or {}})
+
+    def screenshot(self, path) -> str:
+        """Capture the viewport to path via a temp name and rename"""
+
+        path = Path(path)
+        tmp = path.with_name(f".{os.getpid()}-{threading.get_ident()}-{path.name}")
+        self.page.screenshot(path=str(tmp))
+        os.replace(tmp, path)
+        self.shots += 1
+        return str(path)
+
+    def close(self):
+        self.page.close()
+
+
+class WarmBrowser:
+    """One Chromium instance handing out pages per viewport and scale"""
+
+    def __init__(self):
+        from playwright.sync_api import sync_playwright
+
+        self._playwright = sync_playwright().start()
+        self.browser = self._playwright.chromium.launch()
+        self.pages = []
+
+    def new_page(self, size: tuple, scale: float = 1.0) -> WarmPage:
+        page = self.browser.new_page(
+            viewport={"width": size[0], "height": size[1]},
+            device_scale_factor=scale,
+        )
+        warm = WarmPage(page, size)
+        self.pages.append(warm)
+        return warm
+
+    def close(self):
+        for warm in self.pages:
+            warm.close()
+        self.browser.close()
+        self._playwright.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
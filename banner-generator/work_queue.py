@@ -0,0 +1,339 @@
+"""
+Durable Work Queue for Apega Desapega banners
+SQLite-backed job queue with leases so many workers (processes on one host,
+or hosts sharing a filesystem with working file locks) can split a render batch
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from manifest import MANIFEST_PATH, load_manifest
+from render_queue import PRIORITY_BULK, job_key
+
+# Configuration
+CACHE_DIR = Path(__file__).parent / ".cache"
+QUEUE_DB = CACHE_DIR / "work_queue.db"
+OUTPUT_DIR = Path(__file__).parent / "output"
+LEASE_SECONDS = 120
+MAX_ATTEMPTS = 3
+TEMP_PREFIX = ".wq-"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_key TEXT NOT NULL UNIQUE,
+    template TEXT NOT NULL,
+    params TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 10,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_token TEXT,
+    lease_expires REAL,
+    output TEXT,
+    error TEXT,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, priority, id);
+"""
+
+
+def connect(db_path=QUEUE_DB, shared: bool = False) -> sqlite3.Connection:
+    """Open the queue database, creating it if needed
+
+    WAL needs shared memory between the processes, so it is only used on
+    one host; a queue on a network mount (shared=True) uses a rollback
+    journal that relies on file locks alone.
+    """
+
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path), timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA journal_mode={'DELETE' if shared else 'WAL'}")
+    conn.execute("PRAGMA busy_timeout=30000")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def enqueue(conn, template: str, params: dict, priority: int = PRIORITY_BULK) -> int:
+    """Add a job; re-queues it if a previous run already finished it"""
+
+    key = job_key(template, params)
+    conn.execute(
+        """
+        INSERT INTO jobs (job_key, template, params, priority, updated)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(job_key) DO UPDATE SET
+            state = 'queued', attempts = 0, available_at = 0,
+            priority = excluded.priority, error = NULL, updated = excluded.updated
+        WHERE jobs.state IN ('done', 'failed')
+        """,
+        (key, template, json.dumps(params, ensure_ascii=False), priority, time.time()),
+    )
+    return conn.execute("SELECT id FROM jobs WHERE job_key = ?", (key,)).fetchone()["id"]
+
+
+def claim(conn, worker_id: str, lease_seconds: int = LEASE_SECONDS, max_attempts: int = MAX_ATTEMPTS):
+    """Lease the next ready job, reclaiming jobs whose lease has expired"""
+
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Jobs whose worker died mid-render and ran out of attempts
+        conn.execute(
+            """
+            UPDATE jobs SET state = 'failed', error = 'lease expired', updated = ?
+            WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?
+            """,
+            (now, now, max_attempts),
+        )
+        row = conn.execute(
+            """
+            SELECT * FROM jobs
+            WHERE (state = 'queued' AND available_at <= ?)
+               OR (state = 'leased' AND lease_expires < ?)
+            ORDER BY priority, id
+            LIMIT 1
+            """,
+            (now, now),
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+
+        token = uuid.uuid4().hex
+        conn.execute(
+            """
+            UPDATE jobs SET state = 'leased', attempts = attempts + 1,
+                lease_owner = ?, lease_token = ?, lease_expires = ?, updated = ?
+            WHERE id = ?
+            """,
+            (worker_id, token, now + lease_seconds, now, row["id"]),
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+    return {
+        "id": row["id"],
+        "template": row["template"],
+        "params": json.loads(row["params"]),
+        "token": token,
+        "attempt": row["attempts"] + 1,
+    }
+
+
+def heartbeat(conn, job: dict, lease_seconds: int = LEASE_SECONDS) -> bool:
+    """Extend a lease; False means the job was reclaimed by another worker"""
+
+    cur = conn.execute(
+        "UPDATE jobs SET lease_expires = ? WHERE id = ? AND state = 'leased' AND lease_token = ?",
+        (time.time() + lease_seconds, job["id"], job["token"]),
+    )
+    return cur.rowcount == 1
+
+
+def ack(conn, job: dict, temp_path, final_path) -> bool:
+    """Publish a rendered file and mark the job done, exactly once
+
+    The rename happens while holding the database write lock and only if
+    this worker still owns the lease, so a stale worker can never publish
+    over a newer result. A crash between rename and commit re-runs the job,
+    which replaces the file with identical content under the same name.
+    """
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT state, lease_token FROM jobs WHERE id = ?", (job["id"],)
+        ).fetchone()
+        if row is None or row["state"] != "leased" or row["lease_token"] != job["token"]:
+            conn.execute("ROLLBACK")
+            Path(temp_path).unlink(missing_ok=True)
+            return False
+
+        os.replace(temp_path, final_path)
+        conn.execute(
+            """
+            UPDATE jobs SET state = 'done', output = ?, error = NULL,
+                lease_token = NULL, lease_expires = NULL, updated = ?
+            WHERE id = ?
+            """,
+            (str(final_path), time.time(), job["id"]),
+        )
+        conn.execute("COMMIT")
+        return True
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def fail(conn, job: dict, error: str, max_attempts: int = MAX_ATTEMPTS, backoff: float = 5.0):
+    """Release a failed job for retry with backoff, or mark it failed"""
+
+    conn.execute(
+        """
+        UPDATE jobs SET
+            state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+            available_at = ?, error = ?, lease_token = NULL, lease_expires = NULL, updated = ?
+        WHERE id = ? AND lease_token = ?
+        """,
+        (max_attempts, time.time() + backoff * job["attempt"], error, time.time(),
+         job["id"], job["token"]),
+    )
+
+
+def status(conn) -> dict:
+    """Count jobs per state"""
+
+    rows = conn.execute("SELECT state, COUNT(*) AS n FROM jobs GROUP BY state")
+    return {row["state"]: row["n"] for row in rows}
+
+
+def sweep_temp_files(conn, output_dir=OUTPUT_DIR) -> int:
+    """Remove temp renders left behind by crashed workers"""
+
+    live = {
+        row["lease_token"]
+        for row in conn.execute(
+            "SELECT lease_token FROM jobs WHERE state = 'leased' AND lease_expires >= ?",
+            (time.time(),),
+        )
+    }
+    removed = 0
+    for path in Path(output_dir).glob(f"{TEMP_PREFIX}*"):
+        token = path.name[len(TEMP_PREFIX):].split("-", 1)[0]
+        if token not in live:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+def _keep_alive(db_path, job, lease_seconds, stop, shared):
+    conn = connect(db_path, shared)
+    try:
+        while not stop.wait(lease_seconds / 3):
+            if not heartbeat(conn, job, lease_seconds):
+                return
+    finally:
+        conn.close()
+
+
+def run_worker(
+    db_path=QUEUE_DB,
+    worker_id: str = None,
+    lease_seconds: int = LEASE_SECONDS,
+    wait: bool = False,
+    poll: float = 1.0,
+    output_dir=OUTPUT_DIR,
+    shared: bool = False,
+):
+    """Claim, render and acknowledge jobs until the queue is empty"""
+
+    from render_queue import render_template
+    from renderer import output_to
+
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    conn = connect(db_path, shared)
+    sweep_temp_files(conn, output_dir)
+    done = 0
+
+    while True:
+        job = claim(conn, worker_id, lease_seconds)
+        if job is None:
+            if not wait:
+                break
+            time.sleep(poll)
+            continue
+
+        params = dict(job["params"])
+        filename = params.get("filename")
+        if not filename:
+            fail(conn, job, "job has no filename", max_attempts=0)
+            continue
+
+        # Render under a private name; ack() publishes it atomically
+        params["filename"] = f"{TEMP_PREFIX}{job['token']}-{filename}"
+        stop = threading.Event()
+        keeper = threading.Thread(
+            target=_keep_alive, args=(db_path, job, lease_seconds, stop, shared), daemon=True
+        )
+        keeper.start()
+        try:
+            with output_to(output_dir):
+                temp_path = render_template(job["template"], params)
+        except Exception as exc:
+            fail(conn, job, repr(exc))
+            print(f"[!] {worker_id} failed {filename}: {exc}")
+            continue
+        finally:
+            stop.set()
+            keeper.join()
+
+        final_path = Path(temp_path).with_name(filename)
+        if ack(conn, job, temp_path, final_path):
+            done += 1
+            print(f"[+] {worker_id} published {final_path.name}")
+        else:
+            print(f"[!] {worker_id} lost lease on {filename}, result discarded")
+
+    conn.close()
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Durable banner render queue")
+    parser.add_argument("--db", default=str(QUEUE_DB))
+    parser.add_argument("--shared", action="store_true",
+                        help="the queue file is on a network mount used by several hosts")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_enqueue = sub.add_parser("enqueue", help="enqueue every job in a manifest")
+    p_enqueue.add_argument("--manifest", default=str(MANIFEST_PATH))
+    p_enqueue.add_argument("--priority", type=int, default=PRIORITY_BULK)
+
+    p_worker = sub.add_parser("worker", help="run render workers")
+    p_worker.add_argument("--processes", type=int, default=1)
+    p_worker.add_argument("--lease", type=int, default=LEASE_SECONDS)
+    p_worker.add_argument("--wait", action="store_true", help="keep polling when idle")
+    p_worker.add_argument("--output-dir", default=str(OUTPUT_DIR))
+
+    sub.add_parser("status", help="show job counts per state")
+
+    args = parser.parse_args()
+
+    if args.command == "enqueue":
+        conn = connect(args.db, args.shared)
+        jobs = load_manifest(args.manifest)
+        for job in jobs:
+            enqueue(conn, job["template"], job["params"], args.priority)
+        print(f"[+] Enqueued {len(jobs)} jobs")
+    elif args.command == "worker":
+        procs = [
+            multiprocessing.Process(
+                target=run_worker,
+                kwargs={"db_path": args.db, "lease_seconds": args.lease, "wait": args.wait,
+                        "output_dir": args.output_dir, "shared": args.shared},
+            )
+            for _ in range(args.processes)
+        ]
+        for proc in procs:
+            proc.start()
+        for proc in procs:
+            proc.join()
+    else:
+        print(status(connect(args.db, args.shared)))
+
+
+if __name__ == "__main__":
+    main()